@@ -3,6 +3,11 @@ JID×QUEST - ゲーム設定定数
 スーパーファミコン風RPGの基本設定
 """
 
+import os
+
+# 開発モード（環境変数 JIDQUEST_DEV=1 で有効。シナリオ執筆用の機能を使う）
+DEV_MODE = os.environ.get('JIDQUEST_DEV', '') not in ('', '0')
+
 # 画面設定 (HD-2D風 - フルHD)
 SCREEN_WIDTH = 1920  # フルHD解像度 (16:9)
 SCREEN_HEIGHT = 1080
@@ -41,16 +46,64 @@ MESSAGE_SPEED = 2  # 文字表示速度（フレーム数）
 
 # プレイヤー設定
 PLAYER_SPEED = 2
+MAX_LEVEL = 99  # 最大レベル（成長テーブルの上限）
 
 # バトル設定
 BATTLE_TRANSITION_FRAMES = 30
 DAMAGE_VARIANCE = 0.1  # ダメージの乱数幅 (±10%)
+CRITICAL_RATE = 0.05  # クリティカル発生率 (5%)
+CRITICAL_MULTIPLIER = 1.5  # クリティカル時のダメージ倍率
+ATB_GAUGE_MAX = 1000  # ATBゲージの満タン値（素早さ1あたり1ティックで溜まる）
+BATTLE_MAX_TURNS = 500  # シミュレーションの打ち切りターン数
+
+# 画面切り替え設定
+ENCOUNTER_TRANSITION_FRAMES = 40  # エンカウント演出（フィールド側）のフレーム数
+MAP_TRANSITION_FRAMES = 12  # マップ切り替えのフェードのフレーム数（片道）
+TITLE_TRANSITION_FRAMES = 20  # タイトルからゲーム開始までのフェードのフレーム数（片道）
+TRANSITION_MOSAIC_MAX_BLOCK = 32  # モザイクの最大ブロックサイズ（ピクセル）
+TRANSITION_SWIRL_SCALE = 8  # 渦巻きを計算する縮小バッファの縮小率
+TRANSITION_SWIRL_TURNS = 3.0  # 渦巻きの最大回転数
+
+# 敵AI設定
+ENEMY_AI_TIME_BUDGET = 0.002  # 1回の行動決定に使える時間（秒）
+ENEMY_AI_MAX_DEPTH = 8  # 反復深化の最大探索深さ（ターン数）
+ENEMY_AI_MEMO_SIZE = 200000  # 評価メモの最大エントリ数
+
+# セーブ設定
+SAVE_FORMAT = 'binary'  # 'binary'（.sav）または 'json'（.json）
+SAVE_COMPRESS = True  # バイナリセーブの各セクションをzlib圧縮する
+
+# イベントスクリプト設定
+SCRIPT_INSTRUCTION_BUDGET = 64  # 1フレームに実行できる待ちのない命令の数（全スクリプト合計）
+
+# 探索設定
+EXPLORE_VISION_RADIUS = 3  # 1歩ごとに探索済みにする範囲（壁で遮られる歩数）
+
+# 会話グラフ設定
+DIALOGUE_HOT_RELOAD = DEV_MODE  # 会話グラフのファイルが更新されたら読み直す（開発モードのみ）
+DIALOGUE_RELOAD_INTERVAL = 1.0  # 会話グラフの更新を確認する間隔（秒）
+
+# オートセーブ設定
+AUTOSAVE_SLOT = 'auto'  # 書き込み先スロット（save_auto.sav）
+AUTOSAVE_MIN_INTERVAL = 30.0  # 書き込みの最小間隔（秒）
+AUTOSAVE_QUIET_TIME = 2.0  # 最後の変化からこの秒数たってから書き込む
+AUTOSAVE_MAX_STALENESS = 120.0  # 最初の変化からこの秒数たったら変化が続いていても書き込む
+
+# 巻き戻し設定
+REWIND_SECONDS = 30  # フィールドでさかのぼれる秒数
+REWIND_KEYFRAME_INTERVAL = 60  # キーフレームを置く間隔（記録ステップ数）
+REWIND_SCRUB_SPEED = 4  # 巻き戻しキーを押している間、1フレームでさかのぼるステップ数
+REWIND_BATTLE_STEPS = 128  # バトルで記録する行動数
 
 # ゲームパス
 SAVE_FILE = 'data/save_data.json'
 CHARACTERS_DATA = 'data/game_data/characters.json'
+SKILLS_DATA = 'data/game_data/skills.json'
 MAPS_DIR = 'data/maps/'
 DIALOGUES_DIR = 'data/dialogues/'
+ENCOUNTER_TABLES_DATA = 'data/encounters/encounter_tables.json'
+NPC_DIALOGUES_DATA = 'data/dialogues/npcs.json'
+DIALOGUE_GRAPHS_DIR = 'data/dialogues/graphs/'
 
 # ゲーム状態
 class GameState:
@@ -73,11 +126,20 @@ RANK_LEVELS = {
     81: "役員",
 }
 
+def _build_rank_table(max_level):
+    """レベル -> 役職名の対応表を作成"""
+    table = []
+    rank = "アドバイザー"
+    for level in range(max_level + 1):
+        rank = RANK_LEVELS.get(level, rank)
+        table.append(rank)
+    return table
+
+
+# 役職名テーブル（インデックス = レベル）
+RANK_NAME_TABLE = _build_rank_table(MAX_LEVEL)
+
+
 def get_rank_name(level):
     """レベルから役職名を取得"""
-    rank = "アドバイザー"
-    for req_level, rank_name in sorted(RANK_LEVELS.items(), reverse=True):
-        if level >= req_level:
-            rank = rank_name
-            break
-    return rank
+    return RANK_NAME_TABLE[max(0, min(level, MAX_LEVEL))]
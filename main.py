@@ -7,6 +7,9 @@ import pygame
 import sys
 from config import *
 from src.game_states.field_map import FieldMapState
+from src.ui.transition import ScreenTransition
+from src.utils.save_writer import SaveWriter, SAVE_COMPLETE_EVENT
+from src.utils.autosave import AutosaveScheduler
 
 class Game:
     """メインゲームクラス"""
@@ -64,6 +67,15 @@ class Game:
         # セーブ/ロードマネージャー
         from src.utils.save_load import SaveLoadManager
         self.save_manager = SaveLoadManager()
+        self.save_writer = SaveWriter(self.save_manager)
+        self.autosave = AutosaveScheduler(self.save_writer)
+
+        # バトル画面プール（フィールド移動中に事前準備する）
+        from src.game_states.battle_pool import BattleStatePool
+        self.battle_pool = BattleStatePool(self)
+
+        # 画面切り替え演出（タイトル・フィールド・バトルで共有）
+        self.transitions = ScreenTransition(self.screen)
 
     def handle_events(self):
         """イベント処理"""
@@ -72,7 +84,14 @@ class Game:
         for event in events:
             if event.type == pygame.QUIT:
                 self.running = False
+            elif event.type == SAVE_COMPLETE_EVENT:
+                self.on_save_complete(event)
+
+        # 画面切り替え中は入力を受け付けない
+        if self.transitions.is_active:
+            return
 
+        for event in events:
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     if self.state == GameState.FIELD:
@@ -99,14 +118,29 @@ class Game:
         if self.state == GameState.BATTLE and self.battle_state:
             self.battle_state.handle_events(events)
 
+    def on_save_complete(self, event):
+        """
+        バックグラウンドセーブの完了通知
+
+        Args:
+            event: SAVE_COMPLETE_EVENT
+        """
+        self.save_writer.on_complete(event)
+        if event.slot == AUTOSAVE_SLOT:
+            self.autosave.on_complete(event)
+        elif self.field_state:
+            self.field_state.menu_window.show_save_result(event.success)
+            if event.success:
+                self.field_state.quest_system.record_action('action', 'save')
+
     def select_title_menu(self):
         """タイトルメニューの選択処理"""
         selected = self.title_menu_items[self.title_selected_index]
 
         if selected == 'はじめから':
-            self.start_new_game()
+            self.transitions.start('fade', TITLE_TRANSITION_FRAMES, on_switch=self.start_new_game)
         elif selected == 'つづきから':
-            self.show_load_menu()
+            self.transitions.start('fade', TITLE_TRANSITION_FRAMES, on_switch=self.show_load_menu)
         elif selected == 'おわる':
             self.running = False
 
@@ -114,6 +148,7 @@ class Game:
         """新しいゲームを開始"""
         print("ゲーム開始！")
         self.field_state = FieldMapState(self)
+        self.autosave.reset()
         self.state = GameState.FIELD
 
     def start_game(self):
@@ -122,8 +157,9 @@ class Game:
 
     def show_load_menu(self):
         """ロードメニューを表示（簡易版）"""
-        # スロット1からロードを試みる
-        save_data = self.save_manager.load_game(slot=1)
+        # 一番新しいセーブ（オートセーブを含む）からロードを試みる
+        saves = self.save_manager.list_saves()
+        save_data = self.save_manager.load_game(slot=saves[0]['slot']) if saves else None
         if save_data:
             self.load_game(save_data)
         else:
@@ -144,8 +180,10 @@ class Game:
         # フィールド状態を作成
         self.field_state = FieldMapState(self, map_path)
 
-        # プレイヤーデータを適用
-        self.save_manager.apply_save_data(self.field_state.player, save_data)
+        # セーブデータの状態（プレイヤー・フラグ・クエスト・乱数など）を復元
+        from src.utils.snapshot import GameSnapshot, restore_snapshot
+        restore_snapshot(self.field_state, GameSnapshot.from_dict(save_data))
+        self.autosave.reset()
 
         # ゲーム状態をフィールドに
         self.state = GameState.FIELD
@@ -154,6 +192,11 @@ class Game:
 
     def update(self):
         """ゲームロジックの更新"""
+        # 画面切り替え中は各画面の更新を止める
+        if self.transitions.is_active:
+            self.transitions.update()
+            return
+
         if self.state == GameState.TITLE:
             self.update_title()
         elif self.state == GameState.FIELD:
@@ -224,6 +267,9 @@ class Game:
             if self.battle_state:
                 self.battle_state.draw(self.screen)
 
+        # 画面切り替え演出を重ねる
+        self.transitions.draw(self.screen)
+
         # 3倍拡大して表示
         scaled_screen = pygame.transform.scale(self.screen,
                                               (DISPLAY_WIDTH, DISPLAY_HEIGHT))
@@ -464,6 +510,17 @@ class Game:
             self.draw()
             self.clock.tick(FPS)
 
+        # まだ書き込んでいない変化をオートセーブし、書き込み中のセーブを書き終えてから終了
+        if self.field_state and self.autosave.is_dirty():
+            self.autosave.flush(self.field_state)
+        metrics = self.autosave.get_metrics()
+        print(f"オートセーブ統計: 変化{metrics['marks']}回 書き込み{metrics['writes']}回 "
+              f"(省略{metrics['writes_avoided']}回) 平均{metrics['latency_avg_ms']:.1f}ms 最大{metrics['latency_max_ms']:.1f}ms")
+        stats = self.battle_pool.get_stats()
+        if stats['count']:
+            print(f"エンカウント→初回描画: {stats['count']}回 平均{stats['average_ms']:.2f}ms "
+                  f"最大{stats['max_ms']:.2f}ms (1フレーム超過{stats['over_frame']}回)")
+        self.save_writer.close()
         pygame.quit()
         sys.exit()
 
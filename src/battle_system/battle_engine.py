@@ -0,0 +1,580 @@
+"""
+JID×QUEST - バトルエンジン
+パーティ対敵グループのバトル中核（行動順スケジューラ＋データ駆動の行動パイプライン）
+"""
+
+import random
+from config import *
+from src.battle_system.damage_calc import calculate_damage, check_escape_success
+from src.battle_system.effects import TARGET_SELF
+from src.battle_system.enemy_ai import BattleSnapshot, create_enemy_ai
+from src.battle_system.progression import get_progression_table
+from src.battle_system.status_effects import (
+    STATUS_DEFEND, StatusSet, apply_damage_taken, get_status_definition, process_turn_start
+)
+from src.battle_system.turn_scheduler import TurnScheduler
+from src.utils.game_data import load_character_data, get_enemy_level_data
+
+
+# 陣営
+PARTY = 'party'
+ENEMIES = 'enemies'
+
+
+class Combatant:
+    """ヘッドレス用の戦闘者（pygameに依存しないシミュレーション用）"""
+
+    def __init__(self, name, hp, mp, atk, defense, spd, ai=None, exp_reward=0, gold_reward=0):
+        """
+        戦闘者の初期化
+
+        Args:
+            name: 名前
+            hp: 最大HP
+            mp: 最大MP
+            atk: 攻撃力
+            defense: 防御力
+            spd: 素早さ
+            ai: 行動AI（EnemyAI）、Noneなら通常攻撃のみ
+            exp_reward: 倒された時の経験値
+            gold_reward: 倒された時のゴールド
+        """
+        self.name = name
+        self.max_hp = hp
+        self.hp = hp
+        self.max_mp = mp
+        self.mp = mp
+        self.atk = atk
+        self.defense = defense
+        self.spd = spd
+        self.ai = ai
+        self.exp_reward = exp_reward
+        self.gold_reward = gold_reward
+        self.statuses = StatusSet()
+
+    def reset(self):
+        """HP/MPを全回復し状態を解除（同じ戦闘者で繰り返しシミュレーションする場合）"""
+        self.hp = self.max_hp
+        self.mp = self.max_mp
+        self.statuses.clear()
+
+    @classmethod
+    def from_enemy(cls, enemy_type, level, character_data=None):
+        """
+        敵データから戦闘者を生成
+
+        Args:
+            enemy_type: 敵タイプ
+            level: 敵のレベル
+            character_data: キャラクターデータ（省略時はキャッシュを使用）
+
+        Returns:
+            Combatant: 戦闘者
+        """
+        data = get_enemy_level_data(enemy_type, level, character_data)
+        return cls(data['name'], data['hp'], data['mp'], data['atk'], data['def'], data['spd'],
+                   ai=create_enemy_ai(data.get('ai', 'basic')),
+                   exp_reward=data['exp'], gold_reward=data['gold'])
+
+    @classmethod
+    def from_player_class(cls, player_class, level=1, character_data=None):
+        """
+        プレイヤークラスの初期値と成長テーブルから戦闘者を生成
+
+        Args:
+            player_class: プレイヤークラス
+            level: レベル
+            character_data: キャラクターデータ（省略時はキャッシュを使用）
+
+        Returns:
+            Combatant: 戦闘者
+        """
+        if character_data is None:
+            character_data = load_character_data()
+
+        base = character_data['player_classes'][player_class]
+        gain = get_progression_table(player_class).stats_gain(1, level)
+        return cls(player_class,
+                   base['hp'] + gain['max_hp'],
+                   base['mp'] + gain['max_mp'],
+                   base['atk'] + gain['atk'],
+                   base['def'] + gain['defense'],
+                   base['spd'] + gain['spd'])
+
+
+class BattleUnit:
+    """バトル参加者（PlayerやEnemy、Combatantを包む）"""
+
+    __slots__ = ('entity', 'side', 'slot', 'alive', 'alive_index')
+
+    def __init__(self, entity, side, slot):
+        """
+        参加者の初期化
+
+        Args:
+            entity: 戦闘者（name, hp, max_hp, atk, defense, spdを持つオブジェクト）
+            side: 陣営（PARTY or ENEMIES）
+            slot: 陣営内の並び順
+        """
+        self.entity = entity
+        self.side = side
+        self.slot = slot
+        self.alive = entity.hp > 0
+        self.alive_index = -1
+
+    @property
+    def name(self):
+        return self.entity.name
+
+    @property
+    def spd(self):
+        return self.entity.spd
+
+    def take_damage(self, damage):
+        """
+        ダメージを受ける
+
+        Args:
+            damage: ダメージ量
+
+        Returns:
+            int: 実際に受けたダメージ
+        """
+        # 防御中などはダメージ軽減
+        actual_damage = apply_damage_taken(self.entity, max(0, damage))
+
+        self.entity.hp = max(0, self.entity.hp - actual_damage)
+        if self.entity.hp == 0:
+            self.alive = False
+            if hasattr(self.entity, 'is_alive'):
+                self.entity.is_alive = False
+
+        return actual_damage
+
+
+class ActionContext:
+    """行動パイプラインの各ステップが共有する作業領域"""
+
+    __slots__ = ('engine', 'actor', 'action', 'target', 'damage', 'is_critical')
+
+    def __init__(self, engine, actor, action):
+        self.engine = engine
+        self.actor = actor
+        self.action = action
+        self.target = action.get('target')
+        self.damage = 0
+        self.is_critical = False
+
+
+# ===== 行動パイプラインのステップ =====
+# 各ステップはActionContextを受け取り、Falseを返すとパイプラインを中断する
+
+def step_pick_target(ctx):
+    """対象が未指定または戦闘不能なら、敵陣営の生存者からランダムに選ぶ"""
+    if ctx.target is None or not ctx.target.alive:
+        ctx.target = ctx.engine.random_opponent(ctx.actor)
+    return ctx.target is not None
+
+
+def step_roll_damage(ctx):
+    """ダメージを計算"""
+    result = calculate_damage(ctx.actor.entity, ctx.target.entity)
+    ctx.damage = result['damage']
+    ctx.is_critical = result['is_critical']
+
+
+def step_apply_damage(ctx):
+    """ダメージを適用し、戦闘不能を判定"""
+    engine = ctx.engine
+    ctx.damage = ctx.target.take_damage(ctx.damage)
+
+    if ctx.is_critical:
+        engine.add_message(f"{ctx.actor.name}の攻撃！")
+        engine.add_message(f"会心の一撃！ {ctx.target.name}に{ctx.damage}のダメージ！")
+    else:
+        engine.add_message(f"{ctx.actor.name}の攻撃！ {ctx.target.name}に{ctx.damage}のダメージ！")
+
+    if not ctx.target.alive:
+        engine.handle_knockout(ctx.target)
+
+
+def step_set_defending(ctx):
+    """次の自分の行動まで防御（action['name']があれば「〇〇は△△！」と表示する）"""
+    name = ctx.action.get('name')
+    ctx.engine.apply_status(ctx.actor, get_status_definition(STATUS_DEFEND), announce=name is None)
+    if name is not None:
+        ctx.engine.add_message(f"{ctx.actor.name}は{name}！")
+
+
+def step_roll_escape(ctx):
+    """逃走判定（敵の最高素早さと比較）"""
+    engine = ctx.engine
+    if check_escape_success(ctx.actor.spd, engine.max_opponent_spd(ctx.actor)):
+        engine.add_message(f"{ctx.actor.name}は逃げ出した！")
+        engine.finish('escaped')
+    else:
+        engine.add_message("逃げられなかった！")
+
+
+def step_use_skill(ctx):
+    """スキル・アイテムの効果パイプラインを実行（action['skill']にEffectPipeline）"""
+    skill = ctx.action['skill']
+    entity = ctx.actor.entity
+    if skill.mp_cost > entity.mp:
+        ctx.engine.add_message("MPが足りない！")
+        return False
+
+    entity.mp -= skill.mp_cost
+    if skill.target == TARGET_SELF:
+        ctx.target = ctx.actor
+    elif step_pick_target(ctx) is False:
+        return False
+    skill.execute(ctx.engine, ctx.actor, ctx.target)
+
+    # 戦闘不能の判定は効果のメッセージの後で行う
+    if not ctx.target.alive and ctx.target.alive_index >= 0:
+        ctx.engine.handle_knockout(ctx.target)
+
+
+def step_use_item(ctx):
+    """アイテムの効果パイプラインを実行（action['item']にEffectPipeline、action['entry']に所持アイテム）"""
+    entry = ctx.action['entry']
+    if entry['count'] <= 0:
+        ctx.engine.add_message("アイテムがない！")
+        return False
+
+    entry['count'] -= 1
+    item = ctx.action['item']
+    if item.target == TARGET_SELF:
+        ctx.target = ctx.actor
+    elif step_pick_target(ctx) is False:
+        return False
+    item.execute(ctx.engine, ctx.actor, ctx.target)
+
+    if not ctx.target.alive and ctx.target.alive_index >= 0:
+        ctx.engine.handle_knockout(ctx.target)
+
+
+# ステップ名 -> 関数
+PIPELINE_STEPS = {
+    'pick_target': step_pick_target,
+    'roll_damage': step_roll_damage,
+    'apply_damage': step_apply_damage,
+    'set_defending': step_set_defending,
+    'roll_escape': step_roll_escape,
+    'use_skill': step_use_skill,
+    'use_item': step_use_item,
+}
+
+# 行動タイプ -> ステップ名の並び
+ACTION_PIPELINES = {
+    'attack': ('pick_target', 'roll_damage', 'apply_damage'),
+    'defend': ('set_defending',),
+    'escape': ('roll_escape',),
+    'skill': ('use_skill',),
+    'item': ('use_item',),
+    'skip': (),  # 行動不能（メッセージはターン開始時の状態処理で出す）
+}
+
+
+def compile_pipelines(pipelines=None):
+    """
+    行動パイプラインの定義を関数タプルに変換
+
+    Args:
+        pipelines: 行動タイプ -> ステップ名の並び（省略時はACTION_PIPELINES）
+
+    Returns:
+        dict: 行動タイプ -> ステップ関数のタプル
+    """
+    if pipelines is None:
+        pipelines = ACTION_PIPELINES
+    return {action_type: tuple(PIPELINE_STEPS[name] for name in steps)
+            for action_type, steps in pipelines.items()}
+
+
+COMPILED_PIPELINES = compile_pipelines()
+
+
+def auto_controller(engine, unit):
+    """
+    自動行動（AIを持つ戦闘者はAIで、それ以外は通常攻撃）
+
+    Args:
+        engine: BattleEngine
+        unit: 行動するBattleUnit
+
+    Returns:
+        dict: 行動情報
+    """
+    target = engine.random_opponent(unit)
+    ai = getattr(unit.entity, 'ai', None)
+    if ai is None or target is None:
+        return {'type': 'attack', 'target': target}
+    return {'type': ai.plan(BattleSnapshot(unit.entity, target.entity)), 'target': target}
+
+
+class BattleEngine:
+    """パーティ対敵グループのバトルエンジン"""
+
+    def __init__(self, party, enemies, mode='round', max_turns=BATTLE_MAX_TURNS,
+                 record_messages=True):
+        """
+        バトルエンジンの初期化
+
+        Args:
+            party: 味方の戦闘者リスト
+            enemies: 敵の戦闘者リスト
+            mode: ターン制御（'round' or 'atb'）
+            max_turns: 打ち切りターン数（Noneなら打ち切らない）
+            record_messages: Falseにするとメッセージを生成しない（大量シミュレーション用）
+        """
+        self.scheduler = TurnScheduler(mode)
+        self.units = []
+        self.alive_units = {PARTY: [], ENEMIES: []}
+        self.max_spd = {PARTY: 0, ENEMIES: 0}
+
+        for side, members in ((PARTY, party), (ENEMIES, enemies)):
+            for slot, entity in enumerate(members):
+                # 状態異常・バフはバトルごとに解除
+                entity.statuses.clear()
+                unit = BattleUnit(entity, side, slot)
+                self.units.append(unit)
+                self.max_spd[side] = max(self.max_spd[side], entity.spd)
+                if unit.alive:
+                    unit.alive_index = len(self.alive_units[side])
+                    self.alive_units[side].append(unit)
+                    self.scheduler.add(unit)
+
+        # 陣営ごとの行動決定関数（対話UIではPARTYを差し替える）
+        self.controllers = {PARTY: auto_controller, ENEMIES: auto_controller}
+        self.pipelines = COMPILED_PIPELINES
+
+        self.max_turns = max_turns
+        self.turn_count = 0
+        self.result = None  # victory, defeat, escaped, timeout
+        self.messages = [] if record_messages else None
+
+        if not self.alive_units[ENEMIES]:
+            self.finish('victory')
+        elif not self.alive_units[PARTY]:
+            self.finish('defeat')
+
+    def add_message(self, message):
+        """メッセージを記録"""
+        if self.messages is not None:
+            self.messages.append(message)
+
+    def opponent_side(self, unit):
+        """相手陣営"""
+        return ENEMIES if unit.side == PARTY else PARTY
+
+    def random_opponent(self, unit):
+        """相手陣営の生存者からランダムに1体選ぶ（O(1)）"""
+        candidates = self.alive_units[self.opponent_side(unit)]
+        if not candidates:
+            return None
+        return candidates[random.randrange(len(candidates))]
+
+    def max_opponent_spd(self, unit):
+        """相手陣営の最高素早さ（バトル開始時点）"""
+        return self.max_spd[self.opponent_side(unit)]
+
+    def get_entity(self, unit):
+        """効果の対象からステータスを持つオブジェクトを取得（効果パイプライン用）"""
+        return unit.entity
+
+    def deal_damage(self, unit, damage):
+        """
+        効果によるダメージを与える（効果パイプライン用）
+
+        Args:
+            unit: 対象のBattleUnit
+            damage: ダメージ量
+
+        Returns:
+            int: 実際に与えたダメージ
+        """
+        return unit.take_damage(damage)
+
+    def apply_status(self, unit, definition, announce=True):
+        """
+        状態異常・バフを付与（効果パイプライン用）
+
+        Args:
+            unit: 対象のBattleUnit
+            definition: StatusDefinition
+            announce: Trueなら付与メッセージを記録
+        """
+        unit.entity.statuses.add(definition)
+        if announce and definition.start_message:
+            self.add_message(definition.start_message.format(name=unit.name))
+
+    def handle_knockout(self, unit):
+        """戦闘不能になった参加者を生存者リストから外す（O(1)）"""
+        alive = self.alive_units[unit.side]
+        last = alive.pop()
+        if last is not unit:
+            alive[unit.alive_index] = last
+            last.alive_index = unit.alive_index
+        unit.alive_index = -1
+
+        self.add_message(f"{unit.name}を倒した！" if unit.side == ENEMIES else f"{unit.name}は力尽きた...")
+
+        if not alive:
+            self.finish('victory' if unit.side == ENEMIES else 'defeat')
+
+    def finish(self, result):
+        """バトルを終了"""
+        if self.result is None:
+            self.result = result
+
+    def is_battle_over(self):
+        """バトルが終了したか"""
+        return self.result is not None
+
+    def next_actor(self):
+        """
+        次の行動者を取り出す
+
+        Returns:
+            BattleUnit: 行動者、バトル終了時はNone
+        """
+        if self.result is not None:
+            return None
+
+        return self.scheduler.pop()
+
+    def perform(self, unit, action):
+        """
+        行動をパイプラインで解決
+
+        Args:
+            unit: 行動するBattleUnit
+            action: 行動情報 {'type': str, 'target': BattleUnit or None, ...}
+
+        Returns:
+            ActionContext: 解決結果
+        """
+        steps = self.pipelines.get(action['type'])
+        if steps is None:
+            raise ValueError(f"未定義の行動タイプ: {action['type']}")
+
+        ctx = ActionContext(self, unit, action)
+        for step in steps:
+            if step(ctx) is False or self.result is not None:
+                break
+
+        self.turn_count += 1
+        if self.result is None and self.max_turns is not None and self.turn_count >= self.max_turns:
+            self.finish('timeout')
+        return ctx
+
+    def step(self):
+        """
+        1ターン進める（行動者の陣営の行動決定関数で行動を選ぶ）
+
+        Returns:
+            ActionContext: 解決結果、バトル終了時はNone
+        """
+        unit = self.next_actor()
+        if unit is None:
+            return None
+
+        if self.begin_turn(unit):
+            action = self.controllers[unit.side](self, unit)
+        else:
+            action = {'type': 'skip'}
+        return self.perform(unit, action)
+
+    def begin_turn(self, unit):
+        """
+        行動者のターン開始時の状態処理（期限切れ・継続ダメージ・行動不能）
+
+        Args:
+            unit: 行動するBattleUnit
+
+        Returns:
+            bool: 行動できる場合True（継続ダメージで倒れた・行動不能ならFalse）
+        """
+        turn = process_turn_start(self, unit)
+        if unit.entity.hp <= 0:
+            unit.alive = False
+            self.handle_knockout(unit)
+            return False
+        return not turn['skip']
+
+    def get_state(self):
+        """
+        巻き戻し用にエンジンの状態をタプルで取得（戦闘者のHPなどは含まない）
+
+        Returns:
+            tuple: スケジューラ・ターン数・結果・生存状態・メッセージ
+        """
+        scheduler = self.scheduler
+        return (
+            tuple(scheduler.heap), scheduler.sequence, scheduler.current_time,
+            self.turn_count, self.result,
+            tuple((unit.alive, unit.alive_index) for unit in self.units),
+            tuple(self.alive_units[PARTY]), tuple(self.alive_units[ENEMIES]),
+            tuple(self.messages) if self.messages is not None else None
+        )
+
+    def set_state(self, state):
+        """
+        get_state()の状態に戻す
+
+        Args:
+            state: get_state()の結果
+        """
+        (heap, sequence, current_time, self.turn_count, self.result,
+         unit_states, party, enemies, messages) = state
+        scheduler = self.scheduler
+        scheduler.heap = list(heap)
+        scheduler.sequence = sequence
+        scheduler.current_time = current_time
+        for unit, (alive, alive_index) in zip(self.units, unit_states):
+            unit.alive = alive
+            unit.alive_index = alive_index
+        self.alive_units = {PARTY: list(party), ENEMIES: list(enemies)}
+        if messages is not None:
+            self.messages = list(messages)
+
+    def run(self):
+        """
+        決着まで自動で進める
+
+        Returns:
+            str: バトル結果
+        """
+        while self.result is None:
+            if self.step() is None:
+                break
+        return self.result
+
+
+def simulate_battle(party, enemies, mode='round', max_turns=BATTLE_MAX_TURNS):
+    """
+    メッセージを生成せずにバトルを1回シミュレーション
+
+    Args:
+        party: 味方の戦闘者リスト
+        enemies: 敵の戦闘者リスト
+        mode: ターン制御（'round' or 'atb'）
+        max_turns: 打ち切りターン数
+
+    Returns:
+        dict: {'result': str, 'turns': 行動回数,
+               'elapsed': 経過時間（roundは行動したラウンド数、atbは最後の行動のティック）}
+    """
+    engine = BattleEngine(party, enemies, mode, max_turns, record_messages=False)
+    result = engine.run()
+    # current_timeは最後の行動の開始時刻なので、ラウンド制では0始まりの番号を数に直す
+    elapsed = engine.scheduler.current_time
+    if mode == 'round' and engine.turn_count:
+        elapsed += 1
+    return {
+        'result': result,
+        'turns': engine.turn_count,
+        'elapsed': elapsed
+    }
@@ -2,17 +2,39 @@
 JID×QUEST - バトル管理システム
 """
 
+import random
 from config import *
-from src.battle_system.damage_calc import *
+from src.battle_system.battle_engine import BattleEngine, PARTY
+from src.battle_system.effects import get_item
+from src.battle_system.progression import apply_exp
+from src.utils.rewind import RewindBuffer
 
 
 class BattleManager:
-    """バトル管理クラス"""
+    """
+    バトル管理クラス（対話UI用）
+
+    行動順と行動の解決はBattleEngine（素早さ順のラウンド制）に任せる。
+    プレイヤーの番ではコマンド入力を待ち、敵の番ではメッセージを表示し終えてから行動させる。
+    """
 
     def __init__(self, player, enemy):
         """
         バトルマネージャーの初期化
 
+        Args:
+            player: プレイヤーオブジェクト
+            enemy: 敵オブジェクト
+        """
+        # 巻き戻し（行動ごとの状態を記録する）
+        self.rewind = RewindBuffer(REWIND_BATTLE_STEPS, keyframe_interval=16)
+
+        self.reset(player, enemy)
+
+    def reset(self, player, enemy):
+        """
+        バトルマネージャーを（再）初期化
+
         Args:
             player: プレイヤーオブジェクト
             enemy: 敵オブジェクト
@@ -20,24 +42,112 @@ class BattleManager:
         self.player = player
         self.enemy = enemy
 
+        # バトルエンジン（状態異常・バフの解除もここで行う）。対話バトルはターン数で打ち切らない
+        self.engine = BattleEngine([player], [enemy], mode='round', max_turns=None)
+        self.player_unit, self.enemy_unit = self.engine.units
+        self.current_unit = None  # 行動中の参加者
+
         # バトルの状態
         self.battle_phase = 'player_turn'  # player_turn, enemy_turn, victory, defeat, escaped
-        self.turn_count = 0
-
-        # メッセージキュー
-        self.message_queue = []
-        self.current_message = ""
-
-        # アクション処理用
-        self.action_delay = 0  # アクション間のディレイ
-        self.pending_actions = []  # 実行待ちアクション
+        self.levels_gained = 0
 
         # 開始メッセージ
         self.add_message(f"{self.enemy.name}が現れた！")
 
+        # 巻き戻しの記録をやり直し、最初の行動者の番にする
+        self.rewind.clear()
+        self.start_next_turn()
+
+    @property
+    def message_queue(self):
+        """表示待ちのメッセージ（エンジンが記録したもの）"""
+        return self.engine.messages
+
+    def capture_rewind_state(self):
+        """
+        巻き戻し用に状態をタプルで取得
+
+        Returns:
+            tuple: バトルの状態
+        """
+        player = self.player
+        enemy = self.enemy
+        return (
+            self.battle_phase, self.current_unit, self.engine.get_state(),
+            player.hp, player.mp, player.level, player.exp, player.next_level_exp,
+            player.max_hp, player.max_mp, player.atk, player.defense, player.spd,
+            tuple(item['count'] for item in player.items),
+            player.statuses.get_state(),
+            enemy.hp, enemy.is_alive, enemy.statuses.get_state(),
+            random.getstate()
+        )
+
+    def restore_rewind_state(self, state):
+        """
+        巻き戻し用のタプルから状態を復元
+
+        Args:
+            state: capture_rewind_state()の結果
+        """
+        player = self.player
+        enemy = self.enemy
+        (self.battle_phase, self.current_unit, engine_state,
+         player.hp, player.mp, player.level, player.exp, player.next_level_exp,
+         player.max_hp, player.max_mp, player.atk, player.defense, player.spd,
+         item_counts, player_statuses,
+         enemy.hp, enemy.is_alive, enemy_statuses, rng_state) = state
+
+        self.engine.set_state(engine_state)
+        for item, count in zip(player.items, item_counts):
+            item['count'] = count
+        player.statuses.set_state(player_statuses)
+        enemy.statuses.set_state(enemy_statuses)
+        random.setstate(rng_state)
+
+        # 先行していた敵の思考は巻き戻し前の局面のものなので考え直す
+        enemy.action = None
+        if self.battle_phase == 'enemy_turn':
+            enemy.plan_action(player)
+
+    def record_step(self):
+        """現在の状態を巻き戻し用に記録"""
+        self.rewind.record(self.capture_rewind_state())
+
+    def rewind_steps(self, steps):
+        """
+        行動をさかのぼって状態を戻す
+
+        Args:
+            steps: さかのぼる記録数
+
+        Returns:
+            bool: 巻き戻せた場合True
+        """
+        state = self.rewind.rewind(steps)
+        if state is None:
+            return False
+        self.restore_rewind_state(state)
+        return True
+
+    def rewind_to_previous_command(self):
+        """
+        1つ前のコマンド選択の時点まで巻き戻す
+
+        Returns:
+            bool: 巻き戻せた場合True
+        """
+        steps = 1
+        state = self.rewind.seek(steps)
+        while state is not None:
+            if state[0] == 'player_turn':
+                return self.rewind_steps(steps)
+            steps += 1
+            state = self.rewind.seek(steps)
+        return False
+
     def add_message(self, message):
         """メッセージをキューに追加"""
-        self.message_queue.append(message)
+        self.engine.add_message(message)
 
     def get_current_message(self):
         """現在表示中のメッセージを取得"""
@@ -54,121 +164,153 @@ class BattleManager:
         """表示待ちのメッセージがあるか"""
         return len(self.message_queue) > 0
 
-    def execute_player_attack(self):
-        """プレイヤーの通常攻撃を実行"""
-        result = calculate_damage(self.player, self.enemy)
-        damage = result['damage']
-        is_critical = result['is_critical']
-
-        self.enemy.take_damage(damage)
-
-        if is_critical:
-            self.add_message(f"{self.player.name}の攻撃！")
-            self.add_message(f"会心の一撃！ {damage}のダメージ！")
-        else:
-            self.add_message(f"{self.player.name}の攻撃！ {damage}のダメージ！")
+    def start_next_turn(self):
+        """
+        次の行動者の番にする（行動不能のターンはその場で飛ばす）
 
-        # 敵を倒した場合
-        if not self.enemy.is_alive:
-            self.handle_victory()
+        敵の番ならメッセージ表示中に敵AIの思考をワーカースレッドで進めておく
+        """
+        engine = self.engine
+        while True:
+            unit = engine.next_actor()
+            if unit is None:
+                self.finish_battle()
+                return
+
+            # 状態の期限切れ・継続ダメージ・行動不能
+            if engine.begin_turn(unit):
+                break
+            engine.perform(unit, {'type': 'skip'})
+            if engine.result is not None:
+                self.finish_battle()
+                return
+
+        self.current_unit = unit
+        if unit.side == PARTY:
+            self.battle_phase = 'player_turn'
+            self.record_step()
         else:
             self.battle_phase = 'enemy_turn'
+            self.record_step()
+            self.enemy.plan_action(self.player)
 
-    def execute_player_defend(self):
-        """プレイヤーの防御"""
-        self.add_message(f"{self.player.name}は身構えた！")
-        self.battle_phase = 'enemy_turn'
-
-    def execute_player_escape(self):
-        """プレイヤーの逃走"""
-        success = check_escape_success(self.player.spd, self.enemy.spd)
+    def perform_action(self, action):
+        """
+        行動中の参加者の行動をエンジンで解決し、決着か次の行動者の番にする
 
-        if success:
-            self.add_message(f"{self.player.name}は逃げ出した！")
-            self.battle_phase = 'escaped'
+        Args:
+            action: 行動情報 {'type': str, 'target': BattleUnit, ...}
+        """
+        self.engine.perform(self.current_unit, action)
+        if self.engine.result is not None:
+            self.finish_battle()
         else:
-            self.add_message(f"逃げられなかった！")
-            self.battle_phase = 'enemy_turn'
+            self.start_next_turn()
 
-    def execute_enemy_turn(self):
-        """敵のターンを実行"""
-        if not self.enemy.is_alive:
-            return
+    def execute_player_attack(self):
+        """プレイヤーの通常攻撃を実行"""
+        self.perform_action({'type': 'attack', 'target': self.enemy_unit})
 
-        # 敵の行動を決定
-        action = self.enemy.choose_action(self.player)
+    def execute_player_skill(self, skill):
+        """
+        プレイヤーのスキルを実行
 
-        if action['type'] == 'attack':
-            result = calculate_damage(self.enemy, self.player)
-            damage = result['damage']
+        Args:
+            skill: EffectPipeline
 
-            self.player.hp -= damage
-            if self.player.hp < 0:
-                self.player.hp = 0
+        Returns:
+            bool: 使用できたか（MP不足の場合False。ターンは消費しない）
+        """
+        if self.player.mp < skill.mp_cost:
+            self.add_message("MPが足りない！")
+            return False
 
-            self.add_message(f"{self.enemy.name}の攻撃！ {damage}のダメージ！")
+        self.perform_action({'type': 'skill', 'skill': skill, 'target': self.enemy_unit})
+        return True
 
-            # プレイヤーが倒された場合
-            if self.player.hp <= 0:
-                self.handle_defeat()
-            else:
-                self.battle_phase = 'player_turn'
-                self.turn_count += 1
+    def execute_player_item(self, item_entry):
+        """
+        プレイヤーのアイテムを使用
 
-        elif action['type'] == 'defend':
-            self.add_message(f"{self.enemy.name}は{action['name']}！")
-            self.battle_phase = 'player_turn'
-            self.turn_count += 1
+        Args:
+            item_entry: 所持アイテム {'name': str, 'count': int}
 
-    def handle_victory(self):
-        """勝利時の処理"""
-        self.battle_phase = 'victory'
+        Returns:
+            bool: 使用できたか（所持数0・未定義の場合False。ターンは消費しない）
+        """
+        item = get_item(item_entry['name'])
+        if item_entry['count'] <= 0 or item is None:
+            self.add_message("アイテムがない！")
+            return False
 
-        # 経験値とゴールド獲得
-        self.add_message(f"{self.enemy.name}を倒した！")
-        self.add_message(f"経験値を{self.enemy.exp_reward}獲得！")
-        self.add_message(f"{self.enemy.gold_reward}円を手に入れた！")
+        self.perform_action({'type': 'item', 'item': item, 'entry': item_entry,
+                             'target': self.enemy_unit})
+        return True
 
-        # 経験値を加算
-        self.player.exp += self.enemy.exp_reward
+    def execute_player_defend(self):
+        """プレイヤーの防御（次の自分のターンまで被ダメージ軽減）"""
+        self.perform_action({'type': 'defend'})
 
-        # レベルアップチェック
-        while can_level_up(self.player.exp, self.player.level):
-            self.level_up_player()
+    def execute_player_escape(self):
+        """プレイヤーの逃走"""
+        self.perform_action({'type': 'escape'})
 
-    def level_up_player(self):
-        """プレイヤーのレベルアップ処理"""
-        old_level = self.player.level
-        self.player.level += 1
-        self.player.exp -= calculate_exp_for_level(old_level)
+    def execute_enemy_turn(self):
+        """敵のターンを実行（先行させておいた思考の結果で行動する）"""
+        if self.battle_phase != 'enemy_turn':
+            return
 
-        # ステータス上昇
-        stats_gain = calculate_level_up_stats(self.player, self.player.level)
+        action = dict(self.enemy.choose_action(self.player))
+        if action['type'] == 'attack':
+            action['target'] = self.player_unit
+        self.perform_action(action)
+
+    def finish_battle(self):
+        """決着時の処理（勝利なら経験値とゴールド）"""
+        result = self.engine.result
+        if result == 'victory':
+            self.battle_phase = 'victory'
+            self.add_message(f"経験値を{self.enemy.exp_reward}獲得！")
+            self.add_message(f"{self.enemy.gold_reward}円を手に入れた！")
+
+            # 経験値を加算（レベルアップは一括適用）
+            self.gain_exp(self.enemy.exp_reward)
+        elif result == 'escaped':
+            self.battle_phase = 'escaped'
+        else:
+            self.battle_phase = 'defeat'
+        self.record_step()
 
-        self.player.max_hp += stats_gain['max_hp']
-        self.player.max_mp += stats_gain['max_mp']
-        self.player.atk += stats_gain['atk']
-        self.player.defense += stats_gain['defense']
-        self.player.spd += stats_gain['spd']
+    def gain_exp(self, amount):
+        """
+        経験値を獲得し、レベルアップをまとめて処理
 
-        # HP/MP全回復
-        self.player.hp = self.player.max_hp
-        self.player.mp = self.player.max_mp
+        Args:
+            amount: 獲得経験値
 
-        # レベルアップメッセージ
-        self.add_message(f"レベルが{self.player.level}に上がった！")
+        Returns:
+            dict: レベルアップ結果
+        """
+        result = apply_exp(self.player, amount)
+        levels_gained = result['levels_gained']
+        self.levels_gained += levels_gained
+        if levels_gained == 0:
+            return result
+
+        # レベルアップメッセージ（何レベル上がっても3件にまとめる）
+        if levels_gained == 1:
+            self.add_message(f"レベルが{self.player.level}に上がった！")
+        else:
+            self.add_message(f"レベルが{self.player.level}に上がった！（+{levels_gained}）")
         self.add_message(f"役職: {self.player.get_rank()}")
 
         # ステータス上昇メッセージ
+        stats_gain = result['stats_gain']
         self.add_message(
             f"HP+{stats_gain['max_hp']} MP+{stats_gain['max_mp']} " +
             f"攻+{stats_gain['atk']} 防+{stats_gain['defense']} 速+{stats_gain['spd']}"
         )
-
-    def handle_defeat(self):
-        """敗北時の処理"""
-        self.battle_phase = 'defeat'
-        self.add_message(f"{self.player.name}は力尽きた...")
+        return result
 
     def is_battle_over(self):
         """バトルが終了したか"""
@@ -180,5 +322,6 @@ class BattleManager:
             'phase': self.battle_phase,
             'exp_gained': self.enemy.exp_reward if self.battle_phase == 'victory' else 0,
             'gold_gained': self.enemy.gold_reward if self.battle_phase == 'victory' else 0,
-            'turns': self.turn_count
+            'levels_gained': self.levels_gained,
+            'turns': self.engine.turn_count
         }
@@ -4,6 +4,7 @@ JID×QUEST - ダメージ計算システム
 
 import random
 from config import *
+from src.battle_system.status_effects import get_stat
 
 
 def calculate_damage(attacker, defender, skill_power=1.0, is_critical=False):
@@ -19,19 +20,19 @@ def calculate_damage(attacker, defender, skill_power=1.0, is_critical=False):
     Returns:
         dict: ダメージ情報 {'damage': int, 'is_critical': bool, 'variance': float}
     """
-    # 基本ダメージ計算: (攻撃力 * 2 - 防御力) * スキル倍率
-    base_damage = (attacker.atk * 2 - defender.defense) * skill_power
+    # 基本ダメージ計算: (攻撃力 * 2 - 防御力) * スキル倍率（状態による倍率を反映）
+    base_damage = (get_stat(attacker, 'atk') * 2 - get_stat(defender, 'defense')) * skill_power
 
     # 最低ダメージは1
     base_damage = max(1, base_damage)
 
     # クリティカル判定（5%の確率）
     if not is_critical:
-        is_critical = random.random() < 0.05
+        is_critical = random.random() < CRITICAL_RATE
 
     # クリティカルの場合は1.5倍
     if is_critical:
-        base_damage *= 1.5
+        base_damage *= CRITICAL_MULTIPLIER
 
     # ダメージの乱数（±10%）
     variance = random.uniform(1.0 - DAMAGE_VARIANCE, 1.0 + DAMAGE_VARIANCE)
@@ -58,33 +59,19 @@ def calculate_exp_for_level(level):
     return level * 30
 
 
-def can_level_up(current_exp, current_level):
+def calculate_class_level_up_stats(player_class, new_level):
     """
-    レベルアップ可能かチェック
+    クラスとレベルからレベルアップ時のステータス上昇を計算
 
     Args:
-        current_exp: 現在の経験値
-        current_level: 現在のレベル
-
-    Returns:
-        bool: レベルアップ可能ならTrue
-    """
-    return current_exp >= calculate_exp_for_level(current_level)
-
-
-def calculate_level_up_stats(player, new_level):
-    """
-    レベルアップ時のステータス上昇を計算
-
-    Args:
-        player: プレイヤーオブジェクト
+        player_class: プレイヤークラス（'男性営業' or '女性営業'）
         new_level: 新しいレベル
 
     Returns:
         dict: 上昇したステータス
     """
     # クラスに応じた成長率
-    if player.player_class == '男性営業':
+    if player_class == '男性営業':
         hp_growth = 5
         mp_growth = 2
         atk_growth = 2
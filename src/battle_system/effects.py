@@ -0,0 +1,221 @@
+"""
+JID×QUEST - スキル・アイテム効果
+skills.jsonの定義を読み込み時に一度だけステップ関数の並びにコンパイルする
+"""
+
+import json
+import random
+from config import *
+from src.battle_system.status_effects import get_stat, get_status_definition
+
+
+# 効果の対象
+TARGET_ENEMY = 'enemy'
+TARGET_SELF = 'self'
+
+# 回復できるステータス -> (最大値の属性名, 表示名)
+HEAL_STATS = {
+    'hp': ('max_hp', 'HP'),
+    'mp': ('max_mp', 'MP'),
+}
+
+
+class EffectContext:
+    """
+    効果パイプラインの各ステップが共有する作業領域
+
+    hostはバトル側のオブジェクト（BattleEngine）で、
+    add_message(message)、deal_damage(target, damage)、get_entity(target)、
+    apply_status(target, definition)を持つ
+    """
+
+    __slots__ = ('host', 'user', 'target', 'total_damage', 'total_heal')
+
+    def __init__(self, host, user, target):
+        self.host = host
+        self.user = user
+        self.target = target
+        self.total_damage = 0
+        self.total_heal = 0
+
+
+# ===== 効果ステップのビルダー =====
+# 効果定義（dict）を受け取り、EffectContextを受け取るステップ関数を返す
+# 定義の読み取りはビルド時に済ませ、実行時は値を参照するだけにする
+
+def build_damage(params):
+    """攻撃力×倍率のダメージ"""
+    power = params.get('power', 1.0)
+
+    def step_damage(ctx):
+        host = ctx.host
+        damage = int(get_stat(host.get_entity(ctx.user), 'atk') * power)
+        damage = host.deal_damage(ctx.target, damage)
+        ctx.total_damage += damage
+        host.add_message(f"{host.get_entity(ctx.target).name}に{damage}のダメージ！")
+
+    return step_damage
+
+
+def build_heal(params):
+    """HP/MPの固定値回復"""
+    stat = params.get('stat', 'hp')
+    if stat not in HEAL_STATS:
+        raise ValueError(f"回復できないステータス: {stat}")
+    max_stat, label = HEAL_STATS[stat]
+    value = params['value']
+    message = f"{label}が{value}回復した！"
+
+    def step_heal(ctx):
+        entity = ctx.host.get_entity(ctx.target)
+        old_value = getattr(entity, stat)
+        setattr(entity, stat, min(getattr(entity, max_stat), old_value + value))
+        ctx.total_heal += getattr(entity, stat) - old_value
+        ctx.host.add_message(message)
+
+    return step_heal
+
+
+def build_status(params):
+    """状態異常・バフの付与（chanceで成功率を指定できる）"""
+    definition = get_status_definition(params['status'])
+    if definition is None:
+        raise ValueError(f"未定義の状態: {params['status']}")
+    chance = params.get('chance', 1.0)
+
+    def step_status(ctx):
+        if chance < 1.0 and random.random() >= chance:
+            ctx.host.add_message("しかし効かなかった！")
+            return
+        ctx.host.apply_status(ctx.target, definition)
+
+    return step_status
+
+
+# 効果タイプ -> ビルダー
+EFFECT_BUILDERS = {
+    'damage': build_damage,
+    'heal': build_heal,
+    'buff': build_status,
+    'status': build_status,
+}
+
+
+def compile_effects(effects):
+    """
+    効果定義の並びをステップ関数のタプルにコンパイル
+
+    Args:
+        effects: [{'type': str, ...}, ...]
+
+    Returns:
+        tuple: ステップ関数のタプル
+    """
+    steps = []
+    for effect in effects:
+        builder = EFFECT_BUILDERS.get(effect['type'])
+        if builder is None:
+            raise ValueError(f"未定義の効果タイプ: {effect['type']}")
+        steps.append(builder(effect))
+    return tuple(steps)
+
+
+class EffectPipeline:
+    """コンパイル済みのスキル・アイテム"""
+
+    __slots__ = ('name', 'kind', 'category', 'mp_cost', 'target', 'description', 'message', 'steps')
+
+    def __init__(self, name, kind, data):
+        """
+        定義からパイプラインを構築
+
+        Args:
+            name: スキル名・アイテム名
+            kind: 'skill' or 'item'
+            data: skills.jsonの1件分
+        """
+        self.name = name
+        self.kind = kind
+        self.category = data.get('category', '')
+        self.mp_cost = data.get('mp_cost', 0)
+        self.target = data.get('target', TARGET_ENEMY)
+        self.description = data.get('description', '')
+        self.message = data.get('message', '{name}を使った！').format(name=name)
+        self.steps = compile_effects(data.get('effects', []))
+
+    def execute(self, host, user, target):
+        """
+        効果を順に実行（MP消費・所持数の管理は呼び出し側で行う）
+
+        Args:
+            host: BattleEngine
+            user: 使用者
+            target: 対象
+
+        Returns:
+            EffectContext: 実行結果
+        """
+        host.add_message(self.message)
+        ctx = EffectContext(host, user, target)
+        for step in self.steps:
+            if step(ctx) is False:
+                break
+        return ctx
+
+
+_effect_catalog = None
+
+
+def load_effect_catalog(reload=False):
+    """
+    スキル・アイテム定義を読み込んでコンパイル（2回目以降はキャッシュを返す）
+
+    Args:
+        reload: Trueの場合はファイルから読み直す
+
+    Returns:
+        dict: {'skills': {名前: EffectPipeline}, 'items': {名前: EffectPipeline}}
+    """
+    global _effect_catalog
+    if _effect_catalog is not None and not reload:
+        return _effect_catalog
+
+    _effect_catalog = {'skills': {}, 'items': {}}
+    try:
+        with open(SKILLS_DATA, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for kind, section in (('skill', 'skills'), ('item', 'items')):
+            for name, entry in data.get(section, {}).items():
+                _effect_catalog[section][name] = EffectPipeline(name, kind, entry)
+        print(f"スキルデータ読み込み完了: スキル{len(_effect_catalog['skills'])}件 "
+              f"アイテム{len(_effect_catalog['items'])}件")
+    except Exception as e:
+        print(f"スキルデータ読み込みエラー: {e}")
+
+    return _effect_catalog
+
+
+def get_skill(name):
+    """
+    スキルを取得
+
+    Args:
+        name: スキル名
+
+    Returns:
+        EffectPipeline: スキル、未定義の場合None
+    """
+    return load_effect_catalog()['skills'].get(name)
+
+
+def get_item(name):
+    """
+    アイテムを取得
+
+    Args:
+        name: アイテム名
+
+    Returns:
+        EffectPipeline: アイテム、未定義の場合None
+    """
+    return load_effect_catalog()['items'].get(name)
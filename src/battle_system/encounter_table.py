@@ -0,0 +1,154 @@
+"""
+JID×QUEST - エンカウントテーブル
+重み付き敵出現テーブル（Walkerのエイリアス法でO(1)抽選）
+"""
+
+import json
+import os
+import random
+from config import *
+
+
+# 敵レベルの範囲（get_enemy_for_areaと同じ）
+ENEMY_MIN_LEVEL = 1
+ENEMY_MAX_LEVEL = 10
+
+
+class AliasTable:
+    """Walkerのエイリアス法による重み付き抽選テーブル（構築O(n)、抽選O(1)）"""
+
+    def __init__(self, weights):
+        """
+        抽選テーブルを構築（Voseの方法）
+
+        Args:
+            weights: 各要素の重みのリスト（正の数）
+        """
+        count = len(weights)
+        if count == 0:
+            raise ValueError("重みが空です")
+
+        total = float(sum(weights))
+        if total <= 0:
+            raise ValueError("重みの合計が0以下です")
+
+        self.count = count
+        self.probability = [0.0] * count
+        self.alias = [0] * count
+
+        # 平均を1とした重みで、1未満と1以上に振り分ける
+        scaled = [weight * count / total for weight in weights]
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] = (scaled[more] + scaled[less]) - 1.0
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+
+        # 丸め誤差で残った要素は確率1
+        for index in large + small:
+            self.probability[index] = 1.0
+
+    def sample(self, rng=random):
+        """
+        インデックスを1つ抽選
+
+        Args:
+            rng: 乱数生成器（random()を持つオブジェクト）
+
+        Returns:
+            int: 抽選されたインデックス
+        """
+        # 1回の乱数で列と判定値を作る
+        value = rng.random() * self.count
+        index = int(value)
+        if value - index < self.probability[index]:
+            return index
+        return self.alias[index]
+
+
+class EncounterTable:
+    """1エリア分の敵出現テーブル"""
+
+    def __init__(self, table_id, entries):
+        """
+        出現テーブルを構築
+
+        Args:
+            table_id: テーブルID
+            entries: [{'type': str, 'weight': float, 'level_offset': [下限, 上限]}, ...]
+        """
+        self.table_id = table_id
+        self.enemy_types = []
+        self.level_offsets = []
+        weights = []
+
+        for entry in entries:
+            self.enemy_types.append(entry['type'])
+            low, high = entry.get('level_offset', [-1, 1])
+            self.level_offsets.append((low, high))
+            weights.append(entry.get('weight', 1))
+
+        self.alias_table = AliasTable(weights)
+
+    def sample(self, area_level, rng=random):
+        """
+        出現する敵を抽選
+
+        Args:
+            area_level: エリアのレベル
+            rng: 乱数生成器
+
+        Returns:
+            dict: 敵情報 {'type': str, 'level': int}
+        """
+        index = self.alias_table.sample(rng)
+        low, high = self.level_offsets[index]
+        enemy_level = area_level + rng.randint(low, high)
+        enemy_level = max(ENEMY_MIN_LEVEL, min(ENEMY_MAX_LEVEL, enemy_level))
+
+        return {
+            'type': self.enemy_types[index],
+            'level': enemy_level
+        }
+
+
+_encounter_tables = None
+
+
+def load_encounter_tables(table_file=ENCOUNTER_TABLES_DATA, reload=False):
+    """
+    出現テーブルを読み込んでコンパイル（2回目以降はキャッシュを返す）
+
+    Args:
+        table_file: 出現テーブルのJSONファイルパス
+        reload: Trueの場合はファイルから読み直す
+
+    Returns:
+        dict: テーブルID -> EncounterTable
+    """
+    global _encounter_tables
+    if _encounter_tables is not None and not reload:
+        return _encounter_tables
+
+    _encounter_tables = {}
+    try:
+        if os.path.exists(table_file):
+            with open(table_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for table_id, table_data in data.items():
+                _encounter_tables[table_id] = EncounterTable(table_id, table_data.get('entries', []))
+            print(f"出現テーブル読み込み完了: {len(_encounter_tables)}件")
+        else:
+            print(f"警告: 出現テーブルが見つかりません: {table_file}")
+    except Exception as e:
+        print(f"出現テーブル読み込みエラー: {e}")
+
+    return _encounter_tables
@@ -0,0 +1,355 @@
+"""
+JID×QUEST - 敵AIシステム
+時間予算付きの反復深化エクスペクティマックス探索
+"""
+
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import *
+from src.battle_system.status_effects import STATUS_DEFEND, get_stat, get_status_definition
+
+
+# 探索で扱う敵の行動
+ENEMY_ACTIONS = ('attack', 'defend')
+
+# 終端評価値（ヒューリスティック評価の範囲 [-1, 1] より大きくする）
+WIN_VALUE = 2.0
+LOSS_VALUE = -2.0
+
+
+class SearchTimeout(Exception):
+    """探索の時間予算切れ"""
+
+
+class BattleSnapshot:
+    """探索用のバトル状態スナップショット（ワーカースレッドに渡す不変データ）"""
+
+    __slots__ = ('enemy_hp', 'enemy_max_hp', 'enemy_atk', 'enemy_def',
+                 'player_hp', 'player_max_hp', 'player_atk', 'player_def')
+
+    def __init__(self, enemy, player):
+        """
+        スナップショットの初期化
+
+        Args:
+            enemy: 敵オブジェクト
+            player: プレイヤーオブジェクト
+        """
+        self.enemy_hp = enemy.hp
+        self.enemy_max_hp = enemy.max_hp
+        self.enemy_atk = get_stat(enemy, 'atk')
+        self.enemy_def = get_stat(enemy, 'defense')
+        self.player_hp = player.hp
+        self.player_max_hp = player.max_hp
+        self.player_atk = get_stat(player, 'atk')
+        self.player_def = get_stat(player, 'defense')
+
+    def stats_key(self):
+        """バトル中に変化しないステータスのキー（評価メモの有効範囲）"""
+        return (self.enemy_max_hp, self.enemy_atk, self.enemy_def,
+                self.player_max_hp, self.player_atk, self.player_def)
+
+
+def damage_outcomes(atk, defense, rate=1.0):
+    """
+    攻撃1回分のダメージ分布を計算（乱数幅は期待値で近似）
+
+    Args:
+        atk: 攻撃側の攻撃力
+        defense: 防御側の防御力
+        rate: 被ダメージ倍率（防御中など）
+
+    Returns:
+        tuple: ((確率, ダメージ), ...)
+    """
+    base = max(1, atk * 2 - defense)
+    normal = int(int(base) * rate)
+    critical = int(int(base * CRITICAL_MULTIPLIER) * rate)
+    return ((1.0 - CRITICAL_RATE, normal), (CRITICAL_RATE, critical))
+
+
+def make_action(action_type, player):
+    """
+    行動タイプからバトル用の行動情報を作成
+
+    Args:
+        action_type: 行動タイプ（'attack' or 'defend'）
+        player: プレイヤーオブジェクト
+
+    Returns:
+        dict: 行動情報
+    """
+    if action_type == 'defend':
+        return {
+            'type': 'defend',
+            'name': '様子を見ている'
+        }
+    return {
+        'type': 'attack',
+        'name': '攻撃',
+        'target': player
+    }
+
+
+class EnemyAI:
+    """敵AIの基底クラス"""
+
+    def plan(self, snapshot):
+        """
+        行動タイプを決定（ワーカースレッドから呼ばれても安全な純粋計算）
+
+        Args:
+            snapshot: BattleSnapshot
+
+        Returns:
+            str: 行動タイプ
+        """
+        raise NotImplementedError
+
+    def choose_action(self, enemy, player):
+        """
+        行動を同期的に決定
+
+        Args:
+            enemy: 敵オブジェクト
+            player: プレイヤーオブジェクト
+
+        Returns:
+            dict: 行動情報
+        """
+        return make_action(self.plan(BattleSnapshot(enemy, player)), player)
+
+
+class BasicAI(EnemyAI):
+    """簡易AI（80%で攻撃、20%で様子見）"""
+
+    def __init__(self, attack_rate=0.8):
+        """
+        簡易AIの初期化
+
+        Args:
+            attack_rate: 通常攻撃を選ぶ確率
+        """
+        self.attack_rate = attack_rate
+
+    def plan(self, snapshot):
+        """確率で行動を選択"""
+        if random.random() < self.attack_rate:
+            return 'attack'
+        return 'defend'
+
+
+class ExpectimaxAI(EnemyAI):
+    """
+    エクスペクティマックス探索AI
+
+    敵の行動を最大化ノード、クリティカル判定をチャンスノードとして
+    反復深化で探索する。時間予算を超えた場合は直前に完了した深さの
+    結果を採用する。評価済みの部分木はメモ化して次の深さ・次のターンで再利用する。
+    """
+
+    def __init__(self, time_budget=ENEMY_AI_TIME_BUDGET, max_depth=ENEMY_AI_MAX_DEPTH,
+                 memo_size=ENEMY_AI_MEMO_SIZE):
+        """
+        探索AIの初期化
+
+        Args:
+            time_budget: 1回の行動決定に使える時間（秒）、Noneで無制限
+            max_depth: 反復深化の最大深さ（ターン数）
+            memo_size: 評価メモの最大エントリ数
+        """
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.memo_size = memo_size
+
+        # 評価メモ {(敵HP, プレイヤーHP, 残り深さ): 評価値}
+        self.memo = {}
+        self.memo_stats_key = None
+
+        # 探索モデル（スナップショットごとに設定）
+        self.enemy_max_hp = 1
+        self.player_max_hp = 1
+        self.enemy_attack_outcomes = ()
+        self.player_attack_outcomes = ()
+        self.player_attack_outcomes_defended = ()
+
+        # 探索統計
+        self.deadline = None
+        self.nodes = 0
+        self.last_depth = 0
+
+    def setup_model(self, snapshot):
+        """スナップショットから探索モデルを構築（ステータスが変わったらメモを破棄）"""
+        stats_key = snapshot.stats_key()
+        if stats_key != self.memo_stats_key:
+            self.memo = {}
+            self.memo_stats_key = stats_key
+
+            self.enemy_max_hp = max(1, snapshot.enemy_max_hp)
+            self.player_max_hp = max(1, snapshot.player_max_hp)
+            self.enemy_attack_outcomes = damage_outcomes(snapshot.enemy_atk, snapshot.player_def)
+            self.player_attack_outcomes = damage_outcomes(snapshot.player_atk, snapshot.enemy_def)
+            defend = get_status_definition(STATUS_DEFEND)
+            defend_rate = defend.modifiers.get('damage_taken', 1.0) if defend else 1.0
+            self.player_attack_outcomes_defended = damage_outcomes(
+                snapshot.player_atk, snapshot.enemy_def, defend_rate)
+
+        if len(self.memo) > self.memo_size:
+            self.memo.clear()
+
+    def plan(self, snapshot, max_depth=None):
+        """
+        反復深化で最善の行動を探索
+
+        Args:
+            snapshot: BattleSnapshot
+            max_depth: 最大深さ（省略時は初期化時の値）
+
+        Returns:
+            str: 行動タイプ
+        """
+        self.setup_model(snapshot)
+        max_depth = max_depth or self.max_depth
+
+        start = time.perf_counter()
+        self.deadline = start + self.time_budget if self.time_budget else None
+        self.nodes = 0
+        self.last_depth = 0
+
+        best_action = 'attack'
+        for depth in range(1, max_depth + 1):
+            try:
+                best_action = self.search_root(snapshot.enemy_hp, snapshot.player_hp, depth)
+                self.last_depth = depth
+            except SearchTimeout:
+                break
+
+        return best_action
+
+    def search_root(self, enemy_hp, player_hp, depth):
+        """ルートで各行動の期待値を比較（同値なら攻撃を優先）"""
+        best_action = ENEMY_ACTIONS[0]
+        best_value = None
+        for action_type in ENEMY_ACTIONS:
+            value = self.action_value(action_type, enemy_hp, player_hp, depth)
+            if best_value is None or value > best_value:
+                best_action = action_type
+                best_value = value
+        return best_action
+
+    def check_deadline(self):
+        """一定ノードごとに時間予算を確認"""
+        self.nodes += 1
+        if self.deadline is not None and (self.nodes & 63) == 0:
+            if time.perf_counter() > self.deadline:
+                raise SearchTimeout()
+
+    def evaluate(self, enemy_hp, player_hp):
+        """葉ノードのヒューリスティック評価（敵から見たHP割合の差）"""
+        return enemy_hp / self.enemy_max_hp - player_hp / self.player_max_hp
+
+    def enemy_node(self, enemy_hp, player_hp, depth):
+        """敵の手番（最大化ノード）"""
+        if depth == 0:
+            return self.evaluate(enemy_hp, player_hp)
+
+        key = (enemy_hp, player_hp, depth)
+        value = self.memo.get(key)
+        if value is not None:
+            return value
+
+        self.check_deadline()
+        value = max(self.action_value(action_type, enemy_hp, player_hp, depth)
+                    for action_type in ENEMY_ACTIONS)
+        self.memo[key] = value
+        return value
+
+    def action_value(self, action_type, enemy_hp, player_hp, depth):
+        """敵の行動1つの期待値（クリティカル判定のチャンスノード）"""
+        if action_type == 'defend':
+            return self.player_node(enemy_hp, player_hp, True, depth)
+
+        value = 0.0
+        for probability, damage in self.enemy_attack_outcomes:
+            next_player_hp = player_hp - damage
+            if next_player_hp <= 0:
+                # 早く倒せるほど高評価
+                value += probability * (WIN_VALUE + depth * 0.01)
+            else:
+                value += probability * self.player_node(enemy_hp, next_player_hp, False, depth)
+        return value
+
+    def player_node(self, enemy_hp, player_hp, enemy_defending, depth):
+        """プレイヤーの手番（通常攻撃を仮定したチャンスノード）"""
+        if enemy_defending:
+            outcomes = self.player_attack_outcomes_defended
+        else:
+            outcomes = self.player_attack_outcomes
+
+        value = 0.0
+        for probability, damage in outcomes:
+            next_enemy_hp = enemy_hp - damage
+            if next_enemy_hp <= 0:
+                # 倒されるなら遅いほうがまし
+                value += probability * (LOSS_VALUE - depth * 0.01)
+            else:
+                value += probability * self.enemy_node(next_enemy_hp, player_hp, depth - 1)
+        return value
+
+
+# AIポリシー名 -> クラス
+AI_POLICIES = {
+    'basic': BasicAI,
+    'expectimax': ExpectimaxAI,
+}
+
+
+def create_enemy_ai(policy_name='basic'):
+    """
+    ポリシー名から敵AIを生成
+
+    Args:
+        policy_name: AIポリシー名（'basic' or 'expectimax'）
+
+    Returns:
+        EnemyAI: 敵AIオブジェクト
+    """
+    policy_class = AI_POLICIES.get(policy_name, BasicAI)
+    return policy_class()
+
+
+class AIWorker:
+    """敵AIの思考をフレーム処理から切り離して実行するワーカースレッド"""
+
+    def __init__(self):
+        """ワーカーの初期化"""
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='enemy_ai')
+
+    def submit(self, ai, snapshot):
+        """
+        思考を開始
+
+        Args:
+            ai: EnemyAI
+            snapshot: BattleSnapshot
+
+        Returns:
+            Future: 行動タイプを返すFuture
+        """
+        return self.executor.submit(ai.plan, snapshot)
+
+    def shutdown(self):
+        """ワーカーを停止"""
+        self.executor.shutdown(wait=False)
+
+
+_ai_worker = None
+
+
+def get_ai_worker():
+    """共有AIワーカーを取得（初回呼び出し時に起動）"""
+    global _ai_worker
+    if _ai_worker is None:
+        _ai_worker = AIWorker()
+    return _ai_worker
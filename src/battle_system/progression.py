@@ -0,0 +1,127 @@
+"""
+JID×QUEST - 成長テーブル
+クラスごとの累積経験値・累積ステータスを事前計算し、複数レベルの上昇を一括適用する
+"""
+
+from bisect import bisect_right
+from config import *
+from src.battle_system.damage_calc import calculate_exp_for_level, calculate_class_level_up_stats
+
+
+# 成長するステータス
+STAT_KEYS = ('max_hp', 'max_mp', 'atk', 'defense', 'spd')
+
+
+class ProgressionTable:
+    """クラスごとの成長テーブル"""
+
+    def __init__(self, player_class, max_level=MAX_LEVEL):
+        """
+        成長テーブルを構築
+
+        Args:
+            player_class: プレイヤークラス
+            max_level: 最大レベル
+        """
+        self.player_class = player_class
+        self.max_level = max_level
+
+        # cumulative_exp[L]: レベル1からレベルLに到達するまでの累積経験値
+        self.cumulative_exp = [0] * (max_level + 1)
+        # cumulative_stats[key][L]: レベル1からレベルLまでの累積ステータス上昇
+        self.cumulative_stats = {key: [0] * (max_level + 1) for key in STAT_KEYS}
+
+        for level in range(2, max_level + 1):
+            self.cumulative_exp[level] = (self.cumulative_exp[level - 1] +
+                                          calculate_exp_for_level(level - 1))
+            gain = calculate_class_level_up_stats(player_class, level)
+            for key in STAT_KEYS:
+                self.cumulative_stats[key][level] = self.cumulative_stats[key][level - 1] + gain[key]
+
+    def level_for_total_exp(self, total_exp):
+        """
+        累積経験値から到達レベルを取得
+
+        Args:
+            total_exp: レベル1からの累積経験値
+
+        Returns:
+            int: 到達レベル
+        """
+        return max(1, min(self.max_level, bisect_right(self.cumulative_exp, total_exp) - 1))
+
+    def stats_gain(self, from_level, to_level):
+        """
+        レベル区間のステータス上昇量を取得
+
+        Args:
+            from_level: 開始レベル
+            to_level: 到達レベル
+
+        Returns:
+            dict: 上昇したステータス
+        """
+        return {key: table[to_level] - table[from_level]
+                for key, table in self.cumulative_stats.items()}
+
+
+_progression_tables = {}
+
+
+def get_progression_table(player_class):
+    """
+    クラスの成長テーブルを取得（初回のみ構築）
+
+    Args:
+        player_class: プレイヤークラス
+
+    Returns:
+        ProgressionTable: 成長テーブル
+    """
+    table = _progression_tables.get(player_class)
+    if table is None:
+        table = ProgressionTable(player_class)
+        _progression_tables[player_class] = table
+    return table
+
+
+def apply_exp(player, amount):
+    """
+    経験値を加算し、上がったレベル分のステータスを一括で適用
+
+    Args:
+        player: プレイヤーオブジェクト
+        amount: 獲得経験値
+
+    Returns:
+        dict: {'old_level': int, 'new_level': int, 'levels_gained': int, 'stats_gain': dict}
+    """
+    table = get_progression_table(player.player_class)
+    old_level = player.level
+
+    # player.expは現在レベル内の経験値
+    total_exp = table.cumulative_exp[old_level] + player.exp + amount
+    new_level = max(old_level, table.level_for_total_exp(total_exp))
+    stats_gain = table.stats_gain(old_level, new_level)
+
+    player.level = new_level
+    player.exp = total_exp - table.cumulative_exp[new_level]
+    player.next_level_exp = calculate_exp_for_level(new_level)
+
+    if new_level > old_level:
+        player.max_hp += stats_gain['max_hp']
+        player.max_mp += stats_gain['max_mp']
+        player.atk += stats_gain['atk']
+        player.defense += stats_gain['defense']
+        player.spd += stats_gain['spd']
+
+        # HP/MP全回復
+        player.hp = player.max_hp
+        player.mp = player.max_mp
+
+    return {
+        'old_level': old_level,
+        'new_level': new_level,
+        'levels_gained': new_level - old_level,
+        'stats_gain': stats_gain
+    }
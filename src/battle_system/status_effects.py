@@ -0,0 +1,309 @@
+"""
+JID×QUEST - 状態異常・バフ
+防御・毒・スタン・能力アップなどの時限効果（期限はヒープで管理）
+"""
+
+import heapq
+import json
+from config import *
+
+
+# 状態の名前（skills.jsonの'statuses'のキー）
+STATUS_DEFEND = '防御'
+
+# 倍率をかけられるステータス（damage_takenは被ダメージ倍率）
+MODIFIER_STATS = ('atk', 'defense', 'spd', 'damage_taken')
+
+
+class StatusDefinition:
+    """状態の定義（skills.jsonの'statuses'の1件分）"""
+
+    __slots__ = ('name', 'duration', 'modifiers', 'tick_damage_rate', 'skip_turn',
+                 'start_message', 'tick_message', 'end_message')
+
+    def __init__(self, name, data):
+        """
+        Args:
+            name: 状態の名前
+            data: 定義
+                  {'duration': 対象自身のターン数, 'modifiers': {ステータス: 倍率},
+                   'tick_damage_rate': ターン開始時の最大HP割合ダメージ, 'skip_turn': bool,
+                   'start_message': str, 'tick_message': str, 'end_message': str}
+        """
+        self.name = name
+        self.duration = max(1, data.get('duration', 1))
+        self.modifiers = data.get('modifiers', {})
+        for stat in self.modifiers:
+            if stat not in MODIFIER_STATS:
+                raise ValueError(f"倍率をかけられないステータス: {stat}")
+        self.tick_damage_rate = data.get('tick_damage_rate', 0.0)
+        self.skip_turn = data.get('skip_turn', False)
+        self.start_message = data.get('start_message', '')
+        self.tick_message = data.get('tick_message', '')
+        self.end_message = data.get('end_message', '')
+
+
+class StatusSet:
+    """
+    戦闘者1人分の状態
+
+    期限は「対象自身のターン数」で、(期限ターン, 通し番号, 名前)のヒープに積む。
+    ターン開始時はヒープの先頭だけを見るので、効果が多くても1ターンO(log n)で済む。
+    上書き・解除された古いエントリは取り出し時に読み飛ばす（遅延削除）。
+    ステータス倍率は変更があったときだけ再計算してキャッシュする。
+    """
+
+    def __init__(self):
+        """状態の初期化"""
+        self.active = {}  # 名前 -> (StatusDefinition, 期限ターン, 通し番号)
+        self.heap = []
+        self.sequence = 0
+        self.turns = 0  # 対象自身が迎えたターン数
+        self.cache = None  # 倍率・フラグのキャッシュ（変更時にNoneにする）
+
+    def clear(self):
+        """全ての状態を解除（バトル開始時）"""
+        self.active.clear()
+        self.heap.clear()
+        self.turns = 0
+        self.cache = None
+
+    def has(self, name):
+        """状態にかかっているか"""
+        return name in self.active
+
+    def add(self, definition, duration=None):
+        """
+        状態を付与（同じ状態は期限を更新）
+
+        Args:
+            definition: StatusDefinition
+            duration: 継続ターン数（省略時は定義の値）
+        """
+        self.sequence += 1
+        expires_at = self.turns + (duration or definition.duration)
+        self.active[definition.name] = (definition, expires_at, self.sequence)
+        heapq.heappush(self.heap, (expires_at, self.sequence, definition.name))
+        self.cache = None
+
+    def remove(self, name):
+        """
+        状態を解除（ヒープのエントリは取り出し時に読み飛ばす）
+
+        Returns:
+            StatusDefinition: 解除した状態、かかっていなかった場合None
+        """
+        entry = self.active.pop(name, None)
+        if entry is None:
+            return None
+        self.cache = None
+        return entry[0]
+
+    def build_cache(self):
+        """倍率とフラグを再計算"""
+        cache = {stat: 1.0 for stat in MODIFIER_STATS}
+        cache['tick_damage_rate'] = 0.0
+        cache['skip_turn'] = False
+        for definition, _, _ in self.active.values():
+            for stat, multiplier in definition.modifiers.items():
+                cache[stat] *= multiplier
+            cache['tick_damage_rate'] += definition.tick_damage_rate
+            cache['skip_turn'] = cache['skip_turn'] or definition.skip_turn
+        self.cache = cache
+        return cache
+
+    def multiplier(self, stat):
+        """
+        ステータスの倍率を取得
+
+        Args:
+            stat: 'atk', 'defense', 'spd', 'damage_taken'
+
+        Returns:
+            float: 倍率（状態がなければ1.0）
+        """
+        if not self.active:
+            return 1.0
+        cache = self.cache or self.build_cache()
+        return cache[stat]
+
+    def get_state(self):
+        """
+        巻き戻し用に状態をタプルで取得
+
+        Returns:
+            tuple: (ターン数, ((名前, 期限ターン, 通し番号), ...))
+        """
+        return (self.turns, tuple((name, expires_at, sequence)
+                                  for name, (_, expires_at, sequence) in self.active.items()))
+
+    def set_state(self, state):
+        """
+        get_state()で取得した状態に戻す
+
+        Args:
+            state: get_state()の結果
+        """
+        turns, entries = state
+        self.active.clear()
+        self.heap.clear()
+        self.turns = turns
+        self.cache = None
+        for name, expires_at, sequence in entries:
+            definition = get_status_definition(name)
+            if definition is None:
+                continue
+            self.active[name] = (definition, expires_at, sequence)
+            self.heap.append((expires_at, sequence, name))
+            self.sequence = max(self.sequence, sequence)
+        heapq.heapify(self.heap)
+
+    def begin_turn(self):
+        """
+        対象自身のターン開始時の処理（行動不能・継続ダメージの判定→期限切れ解除）
+
+        Returns:
+            dict: {'skip': bool, 'tick_damage_rate': float, 'ticking': [StatusDefinition],
+                   'expired': [StatusDefinition]}
+        """
+        self.turns += 1
+        result = {'skip': False, 'tick_damage_rate': 0.0, 'ticking': [], 'expired': []}
+        if not self.active:
+            return result
+
+        # 行動不能と継続ダメージは期限切れの解除より先に判定する（「1ターン動けない」を成立させる）
+        cache = self.cache or self.build_cache()
+        result['skip'] = cache['skip_turn']
+        result['tick_damage_rate'] = cache['tick_damage_rate']
+        if cache['tick_damage_rate'] > 0:
+            result['ticking'] = [definition for definition, _, _ in self.active.values()
+                                 if definition.tick_damage_rate > 0]
+
+        heap = self.heap
+        while heap and heap[0][0] <= self.turns:
+            _, sequence, name = heapq.heappop(heap)
+            entry = self.active.get(name)
+            if entry is None or entry[2] != sequence:
+                continue  # 上書き・解除済み
+            del self.active[name]
+            self.cache = None
+            result['expired'].append(entry[0])
+
+        return result
+
+
+def get_stat(entity, stat):
+    """
+    状態の倍率を反映したステータスを取得
+
+    Args:
+        entity: 戦闘者（statusesを持たない場合は素の値）
+        stat: 'atk', 'defense', 'spd'
+
+    Returns:
+        int: ステータス
+    """
+    value = getattr(entity, stat)
+    statuses = getattr(entity, 'statuses', None)
+    if statuses is None or not statuses.active:
+        return value
+    return max(1, int(value * statuses.multiplier(stat)))
+
+
+def apply_damage_taken(entity, damage):
+    """
+    被ダメージ倍率（防御など）を反映
+
+    Args:
+        entity: ダメージを受ける戦闘者
+        damage: ダメージ量
+
+    Returns:
+        int: 倍率適用後のダメージ
+    """
+    statuses = getattr(entity, 'statuses', None)
+    if statuses is None or not statuses.active:
+        return damage
+    return int(damage * statuses.multiplier('damage_taken'))
+
+
+def tick_damage(entity, rate):
+    """継続ダメージ量（最大HPの割合、最低1）"""
+    return max(1, int(entity.max_hp * rate))
+
+
+_status_definitions = None
+
+
+def load_status_definitions(reload=False):
+    """
+    状態の定義を読み込み（2回目以降はキャッシュを返す）
+
+    Args:
+        reload: Trueの場合はファイルから読み直す
+
+    Returns:
+        dict: 名前 -> StatusDefinition
+    """
+    global _status_definitions
+    if _status_definitions is not None and not reload:
+        return _status_definitions
+
+    _status_definitions = {}
+    try:
+        with open(SKILLS_DATA, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for name, entry in data.get('statuses', {}).items():
+            _status_definitions[name] = StatusDefinition(name, entry)
+        print(f"状態データ読み込み完了: {len(_status_definitions)}件")
+    except Exception as e:
+        print(f"状態データ読み込みエラー: {e}")
+
+    return _status_definitions
+
+
+def get_status_definition(name):
+    """
+    状態の定義を取得
+
+    Args:
+        name: 状態の名前
+
+    Returns:
+        StatusDefinition: 定義、未定義の場合None
+    """
+    return load_status_definitions().get(name)
+
+
+def process_turn_start(host, target):
+    """
+    ターン開始時の状態処理
+
+    継続ダメージ、期限切れの解除、行動不能の判定を行い、メッセージを追加する
+
+    Args:
+        host: BattleEngine
+        target: ターンを迎えた戦闘者（hostの対象表現）
+
+    Returns:
+        dict: begin_turn()の結果と同じ {'skip': bool, ...}
+    """
+    entity = host.get_entity(target)
+    result = entity.statuses.begin_turn()
+
+    if result['tick_damage_rate'] > 0 and entity.hp > 0:
+        damage = tick_damage(entity, result['tick_damage_rate'])
+        entity.hp = max(0, entity.hp - damage)
+        if entity.hp == 0 and hasattr(entity, 'is_alive'):
+            entity.is_alive = False
+        message = result['ticking'][0].tick_message or "{name}は{damage}のダメージを受けた！"
+        host.add_message(message.format(name=entity.name, damage=damage))
+
+    for definition in result['expired']:
+        if definition.end_message:
+            host.add_message(definition.end_message.format(name=entity.name))
+
+    if result['skip'] and entity.hp > 0:
+        host.add_message(f"{entity.name}は動けない！")
+
+    return result
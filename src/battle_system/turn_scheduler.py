@@ -0,0 +1,86 @@
+"""
+JID×QUEST - ターンスケジューラ
+素早さ順に行動者を決める優先度付きキュー
+"""
+
+import heapq
+from config import *
+
+
+class TurnScheduler:
+    """
+    素早さ順のターンスケジューラ
+
+    mode='round': ラウンド制。各ラウンド内で素早さの高い順に1回ずつ行動する
+    mode='atb': ATB制。素早さに比例してゲージが溜まり、満タンになった順に行動する
+
+    どちらもヒープで管理し、1ターンあたりO(log n)で次の行動者を取り出す。
+    戦闘不能の参加者は取り出し時に読み飛ばす（遅延削除）。
+    """
+
+    def __init__(self, mode='round'):
+        """
+        スケジューラの初期化
+
+        Args:
+            mode: 'round' or 'atb'
+        """
+        if mode not in ('round', 'atb'):
+            raise ValueError(f"未対応のスケジュールモード: {mode}")
+
+        self.mode = mode
+        self.heap = []
+        self.sequence = 0  # 同速時の順序を安定させる通し番号
+        self.current_time = 0  # 現在のラウンド（round）またはティック（atb）
+
+    def turn_delay(self, unit):
+        """ATB制でゲージが満タンになるまでのティック数"""
+        speed = max(1, unit.spd)
+        return -(-ATB_GAUGE_MAX // speed)  # 切り上げ
+
+    def push(self, unit, time):
+        """行動予定をキューに積む"""
+        self.sequence += 1
+        if self.mode == 'round':
+            # 同じラウンド内は素早さの降順
+            key = (time, -unit.spd, self.sequence)
+        else:
+            key = (time, self.sequence, 0)
+        heapq.heappush(self.heap, (key, unit))
+
+    def add(self, unit):
+        """
+        参加者を追加
+
+        Args:
+            unit: 行動者（spdとaliveを持つオブジェクト）
+        """
+        if self.mode == 'round':
+            self.push(unit, self.current_time)
+        else:
+            self.push(unit, self.current_time + self.turn_delay(unit))
+
+    def pop(self):
+        """
+        次の行動者を取り出し、次回の行動予定を積み直す
+
+        Returns:
+            行動者、行動可能な参加者がいない場合None
+        """
+        while self.heap:
+            key, unit = heapq.heappop(self.heap)
+            if not unit.alive:
+                continue
+
+            self.current_time = key[0]
+            if self.mode == 'round':
+                self.push(unit, self.current_time + 1)
+            else:
+                self.push(unit, self.current_time + self.turn_delay(unit))
+            return unit
+
+        return None
+
+    def __len__(self):
+        """キューに積まれている予定の数（戦闘不能分を含む）"""
+        return len(self.heap)
@@ -3,8 +3,10 @@ JID×QUEST - 敵エンティティ
 """
 
 import pygame
-import json
 from config import *
+from src.utils.game_data import get_enemy_level_data
+from src.battle_system.enemy_ai import BattleSnapshot, create_enemy_ai, get_ai_worker, make_action
+from src.battle_system.status_effects import StatusSet, apply_damage_taken
 
 
 class Enemy:
@@ -14,6 +16,19 @@ class Enemy:
         """
         敵の初期化
 
+        Args:
+            enemy_type: 敵タイプ（'不動産会社' or '滞納者'）
+            level: 敵のレベル
+        """
+        self.ai = None
+        self.ai_policy = None
+        self.statuses = StatusSet()  # 状態異常・バフ
+        self.setup(enemy_type, level)
+
+    def setup(self, enemy_type, level=1):
+        """
+        敵を（再）初期化（バトル画面のプールから再利用する場合にも呼ばれる）
+
         Args:
             enemy_type: 敵タイプ（'不動産会社' or '滞納者'）
             level: 敵のレベル
@@ -30,21 +45,12 @@ class Enemy:
 
         # バトル用の状態
         self.is_alive = True
-        self.action = None  # 次の行動
+        self.statuses.clear()
+        self.action = None  # 次の行動（思考中のFuture）
 
     def load_enemy_data(self):
-        """キャラクターデータから敵情報を読み込む"""
-        with open(CHARACTERS_DATA, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
-        enemies = data['enemies'].get(self.enemy_type, {})
-        levels = enemies.get('levels', {})
-
-        # レベルに最も近いデータを取得
-        available_levels = sorted([int(k) for k in levels.keys()])
-        closest_level = min(available_levels, key=lambda x: abs(x - self.level))
-
-        enemy_data = levels[str(closest_level)]
+        """キャラクターデータから敵情報を読み込む（JSONはキャッシュ済みのものを使う）"""
+        enemy_data = get_enemy_level_data(self.enemy_type, self.level)
 
         # ステータス設定
         self.name = enemy_data['name']
@@ -59,6 +65,12 @@ class Enemy:
         # 特殊ステータス（滞納者の場合）
         self.special_stat = enemy_data.get('special_stat', None)
 
+        # 行動AI（'basic' or 'expectimax'）、同じポリシーなら評価メモごと使い回す
+        policy_name = enemy_data.get('ai', 'basic')
+        if self.ai is None or self.ai_policy != policy_name:
+            self.ai = create_enemy_ai(policy_name)
+            self.ai_policy = policy_name
+
     def take_damage(self, damage):
         """
         ダメージを受ける
@@ -70,6 +82,10 @@ class Enemy:
             int: 実際に受けたダメージ
         """
         actual_damage = max(0, damage)
+
+        # 防御中などはダメージ軽減
+        actual_damage = apply_damage_taken(self, actual_damage)
+
         self.hp -= actual_damage
 
         if self.hp <= 0:
@@ -92,9 +108,23 @@ class Enemy:
         self.hp = min(self.max_hp, self.hp + amount)
         return self.hp - old_hp
 
+    def plan_action(self, player):
+        """
+        行動決定をワーカースレッドで先行開始
+
+        Args:
+            player: プレイヤーオブジェクト
+        """
+        if not self.is_alive:
+            return
+        self.action = get_ai_worker().submit(self.ai, BattleSnapshot(self, player))
+
     def choose_action(self, player):
         """
-        敵の行動を決定（簡易AI）
+        敵の行動を決定
+
+        plan_action()で先行開始した思考があればその結果を使い、
+        なければその場で思考する。
 
         Args:
             player: プレイヤーオブジェクト
@@ -102,22 +132,15 @@ class Enemy:
         Returns:
             dict: 行動情報
         """
-        import random
+        planned, self.action = self.action, None
 
-        # 80%の確率で通常攻撃、20%の確率で防御
-        action_roll = random.random()
+        if planned is not None:
+            try:
+                return make_action(planned.result(), player)
+            except Exception as e:
+                print(f"敵AIエラー: {e}")
 
-        if action_roll < 0.8:
-            return {
-                'type': 'attack',
-                'name': '攻撃',
-                'target': player
-            }
-        else:
-            return {
-                'type': 'defend',
-                'name': '様子を見ている'
-            }
+        return self.ai.choose_action(self, player)
 
     def get_status_text(self):
         """ステータス情報のテキストを取得"""
@@ -4,6 +4,9 @@ JID×QUEST - プレイヤーエンティティ
 
 import pygame
 from config import *
+from src.battle_system.effects import get_skill
+from src.battle_system.status_effects import StatusSet, apply_damage_taken
+from src.utils.game_data import load_character_data
 
 
 class Player(pygame.sprite.Sprite):
@@ -55,23 +58,48 @@ class Player(pygame.sprite.Sprite):
         self.defense = 6
         self.spd = 5
 
-        # スキル
-        self.skills = [
-            {'name': '強気の営業トーク', 'mp_cost': 3, 'power': 1.5, 'description': 'ATKの1.5倍のダメージ'},
-            {'name': '誠意の謝罪', 'mp_cost': 5, 'power': 0, 'heal': 15, 'description': 'HPを15回復'}
-        ]
+        # 状態異常・バフ（バトルごとに解除）
+        self.statuses = StatusSet()
 
-        # アイテム
-        self.items = [
-            {'name': '栄養ドリンク', 'count': 3, 'effect': 'heal_hp', 'value': 20},
-            {'name': 'マジックウォーター', 'count': 2, 'effect': 'heal_mp', 'value': 10}
-        ]
+        # スキル・アイテム（クラスの初期装備をskills.jsonの定義から読み込む）
+        self.skills = []  # EffectPipelineのリスト
+        self.items = []  # [{'name': str, 'count': int}, ...]
+        self.load_starting_loadout()
 
         # 描画用サーフェス（仮：16x16の四角）
         self.image = self.create_placeholder_sprite()
         self.rect = self.image.get_rect()
         self.rect.topleft = (self.x, self.y)
 
+    def load_starting_loadout(self):
+        """クラスの初期スキル・初期アイテムを設定"""
+        class_data = load_character_data()['player_classes'].get(self.player_class, {})
+
+        self.skills = []
+        for skill_name in class_data.get('skills', []):
+            skill = get_skill(skill_name)
+            if skill:
+                self.skills.append(skill)
+            else:
+                print(f"警告: スキルが見つかりません: {skill_name}")
+
+        self.items = [{'name': item_name, 'count': count}
+                      for item_name, count in class_data.get('items', {}).items()]
+
+    def take_damage(self, damage):
+        """
+        ダメージを受ける
+
+        Args:
+            damage: ダメージ量
+
+        Returns:
+            int: 実際に受けたダメージ
+        """
+        actual_damage = apply_damage_taken(self, max(0, damage))
+        self.hp = max(0, self.hp - actual_damage)
+        return actual_damage
+
     def create_placeholder_sprite(self):
         """仮のスプライトを作成（後でドット絵に差し替え）"""
         surface = pygame.Surface((TILE_SIZE, TILE_SIZE))
@@ -32,18 +32,37 @@ class BattleState:
         self.battle_manager = BattleManager(player, self.enemy)
 
         # UI状態
-        self.command_index = 0  # 選択中のコマンド
         self.commands = ['たたかう', 'スキル', 'アイテム', 'ぼうぎょ', 'にげる']
-        self.message_wait_timer = 0  # メッセージ表示待機時間
         self.message_display_time = 90  # メッセージ表示時間（1.5秒）
+        self.reset_ui_state()
+
+    def reset(self, player, enemy_type, enemy_level):
+        """
+        バトル画面を再初期化（プールから再利用する場合）
+
+        フォント・敵・バトルマネージャーは作り直さずに中身だけ入れ替える
+
+        Args:
+            player: プレイヤーオブジェクト
+            enemy_type: 敵のタイプ
+            enemy_level: 敵のレベル
+        """
+        self.player = player
+        self.enemy.setup(enemy_type, enemy_level)
+        self.battle_manager.reset(player, self.enemy)
+        self.reset_ui_state()
+
+    def reset_ui_state(self):
+        """UI状態を初期化"""
+        self.command_index = 0  # 選択中のコマンド
+        self.message_wait_timer = 0  # メッセージ表示待機時間
 
         # サブメニュー状態
         self.menu_mode = 'main'  # 'main', 'skill', 'item'
         self.submenu_index = 0  # サブメニューの選択インデックス
 
-        # トランジション
-        self.transition_timer = 0
-        self.transition_phase = 'fade_in'  # fade_in, battle, fade_out
+        # エンカウントから初回描画までの計測開始時刻（プールが設定）
+        self.encounter_started_at = None
 
     def handle_events(self, events):
         """
@@ -52,10 +71,6 @@ class BattleState:
         Args:
             events: pygameイベントリスト
         """
-        # トランジション中は入力を受け付けない
-        if self.transition_phase == 'fade_in':
-            return
-
         # メッセージ表示中
         if self.battle_manager.has_messages():
             for event in events:
@@ -113,6 +128,12 @@ class BattleState:
                             self.menu_mode = 'main'
                             self.submenu_index = 0
 
+                    elif event.key == pygame.K_BACKSPACE:
+                        # 1つ前のコマンド選択まで巻き戻す
+                        if self.battle_manager.rewind_to_previous_command():
+                            self.menu_mode = 'main'
+                            self.submenu_index = 0
+
     def execute_command(self):
         """選択されたコマンドを実行"""
         if self.menu_mode == 'main':
@@ -142,73 +163,17 @@ class BattleState:
         elif self.menu_mode == 'skill':
             # スキル使用
             skill = self.player.skills[self.submenu_index]
-            if self.player.mp >= skill['mp_cost']:
-                self.player.mp -= skill['mp_cost']
-                self.execute_skill(skill)
+            if self.battle_manager.execute_player_skill(skill):
                 self.menu_mode = 'main'
-            else:
-                self.battle_manager.add_message("MPが足りない！")
 
         elif self.menu_mode == 'item':
             # アイテム使用
             item = self.player.items[self.submenu_index]
-            if item['count'] > 0:
-                item['count'] -= 1
-                self.execute_item(item)
+            if self.battle_manager.execute_player_item(item):
                 self.menu_mode = 'main'
-            else:
-                self.battle_manager.add_message("アイテムがない！")
-
-    def execute_skill(self, skill):
-        """スキルを実行"""
-        if 'heal' in skill:
-            # 回復スキル
-            heal_amount = skill['heal']
-            self.player.hp = min(self.player.max_hp, self.player.hp + heal_amount)
-            self.battle_manager.add_message(f"{skill['name']}を使った！")
-            self.battle_manager.add_message(f"HPが{heal_amount}回復した！")
-            self.battle_manager.battle_phase = 'enemy_turn'
-            self.battle_manager.execute_enemy_turn()
-        else:
-            # 攻撃スキル
-            damage = int(self.player.atk * skill['power'])
-            actual_damage = self.enemy.take_damage(damage)
-            self.battle_manager.add_message(f"{skill['name']}！")
-            self.battle_manager.add_message(f"{self.enemy.name}に{actual_damage}のダメージ！")
-
-            if not self.enemy.is_alive:
-                self.battle_manager.battle_phase = 'victory'
-                self.battle_manager.calculate_rewards()
-            else:
-                self.battle_manager.battle_phase = 'enemy_turn'
-                self.battle_manager.execute_enemy_turn()
-
-    def execute_item(self, item):
-        """アイテムを使用"""
-        effect = item['effect']
-        value = item['value']
-
-        self.battle_manager.add_message(f"{item['name']}を使った！")
-
-        if effect == 'heal_hp':
-            self.player.hp = min(self.player.max_hp, self.player.hp + value)
-            self.battle_manager.add_message(f"HPが{value}回復した！")
-        elif effect == 'heal_mp':
-            self.player.mp = min(self.player.max_mp, self.player.mp + value)
-            self.battle_manager.add_message(f"MPが{value}回復した！")
-
-        self.battle_manager.battle_phase = 'enemy_turn'
-        self.battle_manager.execute_enemy_turn()
 
     def update(self):
         """バトル状態の更新"""
-        # トランジション処理
-        if self.transition_phase == 'fade_in':
-            self.transition_timer += 1
-            if self.transition_timer >= BATTLE_TRANSITION_FRAMES:
-                self.transition_phase = 'battle'
-                self.transition_timer = 0
-
         # メッセージ自動送り
         if self.battle_manager.has_messages():
             self.message_wait_timer += 1
@@ -229,8 +194,22 @@ class BattleState:
         if result['phase'] == 'defeat':
             self.player.hp = self.player.max_hp // 2
 
-        # フィールドに戻る
+        # 勝利を待っているクエスト目標を進める
+        if result['phase'] == 'victory' and self.game.field_state:
+            self.game.field_state.quest_system.record_action('battle', self.enemy.enemy_type,
+                                                             level=self.enemy.level)
+
+        # レベルアップしたらオートセーブ
+        if result['levels_gained']:
+            self.game.autosave.mark_dirty('level_up')
+
+        # フィールドに戻る（黒からフェードイン）
         self.game.state = GameState.FIELD
+        self.game.transitions.start_in('fade', MAP_TRANSITION_FRAMES)
+
+        # バトル画面をプールに返却
+        self.game.battle_state = None
+        self.game.battle_pool.release(self)
 
     def draw(self, surface):
         """
@@ -239,18 +218,14 @@ class BattleState:
         Args:
             surface: 描画先サーフェス
         """
+        # エンカウントから初回描画までの時間を記録
+        if self.encounter_started_at is not None:
+            self.game.battle_pool.record_latency(self.encounter_started_at)
+            self.encounter_started_at = None
+
         # 背景（黒）
         surface.fill(COLORS['BLACK'])
 
-        # フェードイン効果
-        if self.transition_phase == 'fade_in':
-            alpha = int(255 * (1 - self.transition_timer / BATTLE_TRANSITION_FRAMES))
-            fade_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-            fade_surface.fill(COLORS['WHITE'])
-            fade_surface.set_alpha(alpha)
-            surface.blit(fade_surface, (0, 0))
-            return
-
         # 敵の描画（HD-2D風）
         if self.enemy.is_alive:
             from src.entities.character_renderer import CharacterRenderer
@@ -425,17 +400,17 @@ class BattleState:
                 surface.blit(cursor_surface, (window_x + 15, y_offset))
 
             # スキル名
-            skill_surface = self.font.render(skill['name'], True, COLORS['WHITE'])
+            skill_surface = self.font.render(skill.name, True, COLORS['WHITE'])
             surface.blit(skill_surface, (window_x + 50, y_offset))
 
             # MP消費
-            mp_text = f"MP:{skill['mp_cost']}"
-            mp_color = COLORS['WHITE'] if self.player.mp >= skill['mp_cost'] else COLORS['RED']
+            mp_text = f"MP:{skill.mp_cost}"
+            mp_color = COLORS['WHITE'] if self.player.mp >= skill.mp_cost else COLORS['RED']
             mp_surface = self.font.render(mp_text, True, mp_color)
             surface.blit(mp_surface, (window_x + 350, y_offset))
 
             # 説明
-            desc_surface = self.font.render(skill['description'], True, COLORS['WINDOW_BLUE'])
+            desc_surface = self.font.render(skill.description, True, COLORS['WINDOW_BLUE'])
             surface.blit(desc_surface, (window_x + 50, y_offset + 30))
 
         # 操作説明
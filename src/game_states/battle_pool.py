@@ -0,0 +1,114 @@
+"""
+JID×QUEST - バトル画面プール
+エンカウント前にバトル画面を用意しておき、エンカウント時は中身の入れ替えだけで開始する
+"""
+
+import time
+from config import *
+from src.game_states.battle import BattleState
+
+
+# 事前準備に使う敵（reset()で実際の敵に入れ替える）
+PREWARM_ENEMY_TYPE = '不動産会社'
+PREWARM_ENEMY_LEVEL = 1
+
+
+class BattleStatePool:
+    """バトル画面のプール"""
+
+    def __init__(self, game, size=1):
+        """
+        プールの初期化
+
+        Args:
+            game: メインゲームオブジェクト
+            size: 待機させておくバトル画面の数
+        """
+        self.game = game
+        self.size = size
+        self.idle = []  # 待機中のバトル画面
+
+        # エンカウント→初回描画の計測
+        self.latency_count = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.last_latency = 0.0
+        self.latency_over_frame = 0  # 1フレームを超えた回数
+
+    def prewarm(self, player):
+        """
+        待機中のバトル画面を1つ用意（フィールドの更新中に毎フレーム呼ばれる）
+
+        1フレームに作るのは最大1つなので、負荷は歩行中のフレームに分散される
+
+        Args:
+            player: プレイヤーオブジェクト
+        """
+        if len(self.idle) < self.size:
+            self.idle.append(BattleState(self.game, player, PREWARM_ENEMY_TYPE, PREWARM_ENEMY_LEVEL))
+
+    def acquire(self, player, enemy_type, enemy_level):
+        """
+        バトル画面を取得して指定の敵で初期化
+
+        Args:
+            player: プレイヤーオブジェクト
+            enemy_type: 敵のタイプ
+            enemy_level: 敵のレベル
+
+        Returns:
+            BattleState: バトル画面
+        """
+        started_at = time.perf_counter()
+
+        if self.idle:
+            battle_state = self.idle.pop()
+            battle_state.reset(player, enemy_type, enemy_level)
+        else:
+            # 事前準備が間に合わなかった場合はその場で生成
+            battle_state = BattleState(self.game, player, enemy_type, enemy_level)
+
+        battle_state.encounter_started_at = started_at
+        return battle_state
+
+    def release(self, battle_state):
+        """
+        バトル画面をプールに返却
+
+        Args:
+            battle_state: 使い終わったバトル画面
+        """
+        if len(self.idle) < self.size and battle_state not in self.idle:
+            self.idle.append(battle_state)
+
+    def record_latency(self, started_at):
+        """
+        エンカウントから初回描画までの時間を記録
+
+        Args:
+            started_at: acquire()を呼んだ時刻（time.perf_counter()）
+        """
+        latency = time.perf_counter() - started_at
+        self.last_latency = latency
+        self.latency_count += 1
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+        if latency >= 1.0 / FPS:
+            self.latency_over_frame += 1
+
+    def get_stats(self):
+        """
+        計測結果を取得
+
+        Returns:
+            dict: {'count': int, 'last_ms': float, 'average_ms': float, 'max_ms': float,
+                   'over_frame': int}
+        """
+        average = self.latency_total / self.latency_count if self.latency_count else 0.0
+        return {
+            'count': self.latency_count,
+            'last_ms': self.last_latency * 1000,
+            'average_ms': average * 1000,
+            'max_ms': self.latency_max * 1000,
+            'over_frame': self.latency_over_frame
+        }
@@ -4,16 +4,25 @@ JID×QUEST - フィールドマップ画面
 
 import pygame
 import random
-import json
+import os
+import time
 from config import *
 from src.entities.player import Player
 from src.utils.tilemap import TileMap
 from src.battle_system.damage_calc import get_enemy_for_area
+from src.battle_system.progression import apply_exp
 from src.ui.dialogue_box import DialogueBox
 from src.ui.menu_window import MenuWindow
-from src.utils.save_load import SaveLoadManager
 from src.utils.event_manager import EventManager
+from src.systems.event_script import ScriptVM
 from src.systems.quest_system import QuestSystem
+from src.systems.dialogue_index import load_dialogue_index
+from src.systems.dialogue_graph import DialogueRunner
+from src.systems.exploration import ExplorationTracker
+from src.utils.rewind import RewindBuffer
+from src.utils.triggers import TriggerTracker
+from src.utils.snapshot import (capture_snapshot, restore_snapshot,
+                                capture_rewind_state, restore_rewind_state)
 
 
 class FieldMapState:
@@ -46,51 +55,86 @@ class FieldMapState:
         self.show_info = True
 
         # エンカウントシステム
-        self.encounter_rate = 0.05  # 1歩ごとの遭遇率（5%）
         self.encounter_enabled = True  # エンカウント有効フラグ
-        self.area_level = 2  # 現在エリアのレベル（2F営業部）
+
+        # 今いるゾーン（エリアレベル・遭遇率・BGM・ライティングはゾーンから引く）
+        self.zone = self.tilemap.get_zone(spawn['x'], spawn['y'])
+        self.current_bgm = self.zone.bgm
+        self.lighting_overlay = None  # (ライティングの色, 重ねるサーフェス)
 
         # 会話システム
         self.dialogue_box = DialogueBox()
-        self.load_dialogue_data()
+        self.dialogue_index = load_dialogue_index()
+        self.dialogue_runner = DialogueRunner(self)  # 選択肢のある会話（会話グラフ）
 
         # セーブ/ロードシステム
-        self.save_manager = SaveLoadManager()
+        self.save_manager = game.save_manager
 
         # イベントシステム
         self.event_manager = EventManager()
         self.event_manager.load_events()
 
+        # イベントスクリプトの実行環境（カットシーンと環境スクリプトを並行実行）
+        self.script_vm = ScriptVM(self)
+
         # クエストシステム
         self.quest_system = QuestSystem()
         self.quest_system.load_quests()
+        self.quest_system.completion_callback = self.on_quest_completed
+        self.quest_system.set_event_flags(self.event_manager.event_flags)
+        self.event_manager.flag_callback = self.on_flag_changed
+
+        # 探索記録（マップごとに見たタイル）
+        self.exploration = ExplorationTracker()
+        self.explore_around()
+
+        # トリガー領域（今いるタイルのトリガー集合。開始位置のトリガーは入ったことにしない）
+        self.triggers = TriggerTracker()
+        self.triggers.reset(self.tilemap, self.player.tile_x, self.player.tile_y)
 
         # メニューシステム
-        self.menu_window = MenuWindow(save_callback=self.save_game)
+        self.menu_window = MenuWindow(save_callback=self.save_game,
+                                      save_busy_callback=self.game.save_writer.is_busy)
 
         # 初回起動フラグ
         self.initial_event_triggered = False
 
-    def load_dialogue_data(self):
-        """会話データを読み込み"""
-        try:
-            with open('data/dialogues/npcs.json', 'r', encoding='utf-8') as f:
-                self.dialogue_data = json.load(f)
-        except FileNotFoundError:
-            print("警告: 会話データが見つかりません")
-            self.dialogue_data = {}
+        # クイックセーブ（メモリ上のスナップショット）
+        self.quick_snapshot = None
+
+        # 巻き戻し（毎フレームの状態を記録し、BackSpaceを押している間さかのぼる）
+        self.rewind = RewindBuffer(REWIND_SECONDS * FPS)
+        self.rewinding = False
 
     def save_game(self, slot):
         """
-        ゲームをセーブ
+        ゲームをセーブ（スナップショットだけ取り、書き出しはSaveWriterに任せる）
 
         Args:
             slot: セーブスロット番号
 
         Returns:
-            bool: セーブ成功時True
+            bool: セーブを受け付けた場合True（結果はSAVE_COMPLETE_EVENTで通知される）
         """
-        return self.save_manager.save_game(self.player, self.map_path, slot)
+        return self.game.save_writer.submit(capture_snapshot(self), slot)
+
+    def quick_save(self):
+        """クイックセーブ（メモリ上にスナップショットを取るだけ）"""
+        start = time.perf_counter()
+        self.quick_snapshot = capture_snapshot(self)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"クイックセーブ: {elapsed:.3f}ms")
+
+    def quick_load(self):
+        """クイックロード（メモリ上のスナップショットから復元）"""
+        if self.quick_snapshot is None:
+            print("クイックセーブがありません")
+            return
+
+        start = time.perf_counter()
+        restore_snapshot(self, self.quick_snapshot)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"クイックロード: {elapsed:.3f}ms")
 
     def handle_events(self, events):
         """
@@ -109,6 +153,10 @@ class FieldMapState:
             self.dialogue_box.handle_input(events)
             return
 
+        # カットシーン中は操作できない
+        if self.script_vm.has_cutscene():
+            return
+
         for event in events:
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
@@ -123,6 +171,12 @@ class FieldMapState:
                     # 情報表示の切り替え
                     self.show_info = not self.show_info
 
+                if event.key == pygame.K_F5:
+                    self.quick_save()
+
+                if event.key == pygame.K_F9:
+                    self.quick_load()
+
     def interact(self):
         """目の前のタイルとインタラクション"""
         # プレイヤーの向いている方向のタイル座標を取得
@@ -159,31 +213,63 @@ class FieldMapState:
         """
         npc_name = npc['name']
 
-        # 会話データから適切なメッセージを取得
-        if npc_name in self.dialogue_data:
-            npc_dialogues = self.dialogue_data[npc_name]
-
-            # レベルに応じたメッセージを選択
-            if f"レベル{self.player.level}" in npc_dialogues:
-                messages = npc_dialogues[f"レベル{self.player.level}"]
-            elif "通常" in npc_dialogues:
-                messages = npc_dialogues["通常"]
-            elif "初回" in npc_dialogues:
-                messages = npc_dialogues["初回"]
-            else:
-                # デフォルトメッセージ
-                messages = list(npc_dialogues.values())[0]
-
-            # 会話開始
-            self.dialogue_box.start_dialogue(messages, npc_name, auto_close=False)
+        # 会話を待っているクエスト目標を進める
+        if 'id' in npc:
+            self.quest_system.record_action('talk', npc['id'])
+
+        # コンパイル済みの会話表からレベルとフラグに合う会話を選ぶ
+        entry = None
+        npc_dialogue = self.dialogue_index.get(npc_name)
+        if npc_dialogue:
+            entry = npc_dialogue.select(self.player.level, self.event_manager.event_flags)
+        if entry and entry.graph and self.dialogue_runner.start(entry.graph):
+            if entry.set_flag:
+                self.event_manager.set_flag(entry.set_flag, True)
+        elif entry and entry.messages:
+            self.dialogue_box.start_dialogue(list(entry.messages), npc_name, auto_close=False)
+            if entry.set_flag:
+                self.event_manager.set_flag(entry.set_flag, True)
         else:
             # 会話データがない場合はデフォルトメッセージ
             default_message = npc.get('dialogue', '...')
             self.dialogue_box.start_dialogue([default_message], npc_name, auto_close=False)
 
+    def on_flag_changed(self, flag_name):
+        """
+        イベントフラグの変化をクエストの受注条件に反映
+
+        Args:
+            flag_name: 変化したフラグ名
+        """
+        self.quest_system.on_flag_changed(flag_name)
+
+    def on_quest_completed(self, quest_id):
+        """
+        クエスト完了時に報酬（フラグ・経験値）を与えてオートセーブする
+
+        Args:
+            quest_id: クエストID
+        """
+        rewards = self.quest_system.quests[quest_id].get('rewards', {})
+        for flag_name in rewards.get('flags', []):
+            self.event_manager.set_flag(flag_name, True)
+        if rewards.get('exp'):
+            apply_exp(self.player, rewards['exp'])
+            print(f"経験値を{rewards['exp']}獲得！")
+        self.game.autosave.mark_dirty('quest')
+
+    def accept_available_quests(self):
+        """受注可能になったクエストを受注する（クエスト受付の画面がないので自動で受ける）"""
+        for quest_id in sorted(self.quest_system.get_available_quests()):
+            self.quest_system.accept_quest(quest_id)
+
+    def get_map_name(self):
+        """クエスト目標の対象に使うマップ名（拡張子なしのファイル名）"""
+        return os.path.splitext(os.path.basename(self.map_path))[0]
+
     def trigger_story_event(self, event_id):
         """
-        ストーリーイベントを発生させる
+        ストーリーイベントを発生させる（カットシーンとしてスクリプトを実行）
 
         Args:
             event_id: イベントID
@@ -192,70 +278,37 @@ class FieldMapState:
         if not event_data:
             return
 
-        # イベントの最初のステップを処理
-        self.process_event_step()
+        self.script_vm.spawn(event_id, self.event_manager.programs[event_id], cutscene=True)
 
-    def process_event_step(self):
-        """現在のイベントステップを処理"""
-        step_data = self.event_manager.get_current_step()
-        if not step_data:
-            return
+    def get_script_program(self, script_id):
+        """
+        スクリプトIDから命令列を取得（セーブからの再開用）
+
+        Args:
+            script_id: スクリプトID
 
-        step_type = step_data.get('type')
-
-        if step_type == 'dialogue':
-            # 会話ステップ
-            speaker = step_data.get('speaker', 'システム')
-            messages = step_data.get('messages', [])
-            self.dialogue_box.start_dialogue(messages, speaker, auto_close=False)
-            # 会話終了後に次のステップへ進める
-            self.event_manager.advance_step()
-            # 次のステップがあれば処理
-            if self.event_manager.is_event_active():
-                # 会話が終わったら次のステップを処理（連続会話の場合）
-                next_step = self.event_manager.get_current_step()
-                if next_step and next_step.get('type') == 'dialogue':
-                    # 現在の会話が終わるまで待つ必要があるので、ここでは処理しない
-                    pass
-
-        elif step_type == 'set_flag':
-            # フラグ設定ステップ
-            flag_name = step_data.get('flag')
-            if flag_name:
-                self.event_manager.set_flag(flag_name, True)
-            # 次のステップへ
-            if not self.event_manager.advance_step():
-                # イベント終了
-                pass
-
-        elif step_type == 'objective':
-            # 目標表示ステップ
-            objective_text = step_data.get('text', '')
-            self.dialogue_box.start_dialogue([f"【目標】", objective_text], "システム", auto_close=False)
-            self.event_manager.advance_step()
+        Returns:
+            tuple: 命令列、見つからない場合None
+        """
+        return self.event_manager.programs.get(script_id)
+
+    def on_script_finished(self, script_id):
+        """
+        スクリプトの終了通知（ストーリーイベントなら完了にする）
+
+        Args:
+            script_id: スクリプトID
+        """
+        if script_id == self.event_manager.current_event:
+            self.event_manager.complete_event()
 
     def update(self):
         """状態の更新"""
-        # 初回イベントの発生
+        # 初回イベントの発生（入社式が未完了なら開始）
         if not self.initial_event_triggered and not self.dialogue_box.is_active:
             self.initial_event_triggered = True
-            # 入社式イベントが未完了なら開始
             if self.event_manager.can_trigger_event('welcome_ceremony'):
-                welcome_messages = [
-                    "ようこそ、JID Corporationへ。",
-                    "私は井坂、この会社の創設者だ。",
-                    "今日から君も我が社の一員だ。",
-                    "営業として、多くの契約を",
-                    "取ってきてほしい。",
-                    "",
-                    "入社おめでとうございます！",
-                    "私は梅田、社長をしています。",
-                    "一緒に最強の会社を作りましょう。",
-                    "困ったことがあれば、",
-                    "いつでも相談してください。"
-                ]
-                self.dialogue_box.start_dialogue(welcome_messages, "JID Corporation", auto_close=False)
-                self.event_manager.set_flag('welcome_ceremony_done', True)
+                self.trigger_story_event('welcome_ceremony')
 
         # 会話ウィンドウの更新
         self.dialogue_box.update()
@@ -263,13 +316,39 @@ class FieldMapState:
         # メニューウィンドウの更新
         self.menu_window.update()
 
+        # オートセーブ（条件を満たしたときだけ書き込む）
+        self.game.autosave.update(self)
+
+        # イベントスクリプト（メニュー表示中は止める）
+        if not self.menu_window.is_active:
+            self.script_vm.update()
+
+        # 会話グラフ（会話ウィンドウが閉じられたら次のノードへ）
+        if DIALOGUE_HOT_RELOAD:
+            self.dialogue_runner.library.check_reload()
+        self.dialogue_runner.update()
+
         # メニュー表示中または会話中は移動できない
         if self.menu_window.is_active or self.dialogue_box.is_active:
             return
 
+        # バトル画面を事前準備（準備済みなら何もしない）
+        self.game.battle_pool.prewarm(self.player)
+
         # キー入力処理
         keys = pygame.key.get_pressed()
-        self.player.handle_input(keys)
+
+        # カットシーン中はスクリプトがプレイヤーを動かす
+        cutscene = self.script_vm.has_cutscene()
+
+        # 巻き戻し中は記録も移動もしない（カットシーン中は巻き戻せない）
+        if keys[pygame.K_BACKSPACE] and not cutscene:
+            self.scrub_rewind(REWIND_SCRUB_SPEED)
+            return
+        self.rewinding = False
+
+        if not cutscene:
+            self.player.handle_input(keys)
 
         # プレイヤーが移動を開始する時に衝突判定
         if self.player.moving and self.player.move_progress == 0:
@@ -283,26 +362,87 @@ class FieldMapState:
 
         # 移動完了時の処理
         if was_moving and not self.player.moving:
-            # マップ遷移イベントをチェック
-            self.check_map_transition()
+            # 周りを探索済みにして、探索率を待っているクエスト目標を進める
+            self.explore_around()
+
+            # トリガー領域（階段・カットシーンなど）をチェック
+            self.check_triggers()
+
+            # 今いるゾーンを更新
+            self.update_zone()
 
             # エンカウント判定
-            if self.encounter_enabled:
+            if self.encounter_enabled and not cutscene:
                 self.check_encounter()
 
         # カメラをプレイヤーに追従
         self.update_camera()
 
-    def check_map_transition(self):
-        """マップ遷移イベントをチェック"""
-        event = self.tilemap.get_event_at(self.player.tile_x, self.player.tile_y)
-        if event and event['type'] in ['stairs_up', 'stairs_down', 'door']:
-            # マップ遷移
-            self.transition_to_map(
-                event['destination'],
-                event['dest_x'],
-                event['dest_y']
+        # イベント条件の判定用にレベル・位置を通知（変化がなければ何もしない）
+        self.event_manager.set_player_level(self.player.level)
+        self.event_manager.set_player_position(self.map_path, self.player.tile_x, self.player.tile_y)
+        self.quest_system.set_player_level(self.player.level)
+
+        # 受注可能になったクエストを受ける
+        if self.quest_system.get_available_quests():
+            self.accept_available_quests()
+
+        # 巻き戻し用に状態を記録（カットシーン中はスクリプトの状態を持たない記録になるので残さない）
+        if not self.script_vm.has_cutscene():
+            self.rewind.record(capture_rewind_state(self))
+
+    def scrub_rewind(self, steps):
+        """
+        記録をさかのぼって状態を戻す
+
+        Args:
+            steps: さかのぼるステップ数（フレーム数）
+        """
+        if not self.rewinding:
+            self.rewinding = True
+            self.rewind.report('フィールド')
+
+        state = self.rewind.rewind(steps)
+        if state is not None:
+            restore_rewind_state(self, state)
+
+    def check_triggers(self):
+        """移動後の位置で入った・出た・留まったトリガーのアクションを実行"""
+        for _, trigger in self.triggers.step(self.tilemap, self.player.tile_x, self.player.tile_y):
+            for action in trigger.actions:
+                self.run_trigger_action(action)
+
+    def run_trigger_action(self, action):
+        """
+        トリガーのアクションを1つ実行
+
+        Args:
+            action: アクションの辞書
+                    {"type": "map", "destination": マップファイル名, "dest_x": X, "dest_y": Y}
+                    {"type": "event", "event": イベントID}
+                    {"type": "flag", "flag": フラグ名, "value": 値}
+                    {"type": "quest", "action": 行動の種類, "subject": 対象}
+        """
+        action_type = action.get('type')
+        if action_type == 'map':
+            # マップ遷移（暗転してから切り替える）
+            self.game.transitions.start(
+                'fade', MAP_TRANSITION_FRAMES,
+                on_switch=lambda: self.transition_to_map(
+                    action['destination'],
+                    action['dest_x'],
+                    action['dest_y']
+                )
             )
+        elif action_type == 'event':
+            if not self.event_manager.current_event:
+                self.trigger_story_event(action['event'])
+        elif action_type == 'flag':
+            self.event_manager.set_flag(action['flag'], action.get('value', True))
+        elif action_type == 'quest':
+            self.quest_system.record_action(action['action'], action.get('subject'))
+        else:
+            print(f"警告: 不明なトリガーアクション: {action_type}")
 
     def transition_to_map(self, map_path, dest_x, dest_y):
         """
@@ -313,11 +453,11 @@ class FieldMapState:
             dest_x: 遷移先のX座標（タイル単位）
             dest_y: 遷移先のY座標（タイル単位）
         """
-        import os
         full_path = os.path.join('data/maps', map_path)
 
         # 新しいマップを読み込み
-        self.tilemap = TileMap(full_path)
+        self.load_map(full_path)
+        self.game.autosave.mark_dirty('map')
 
         # プレイヤーを指定位置に配置
         self.player.tile_x = dest_x
@@ -326,6 +466,11 @@ class FieldMapState:
         self.player.y = dest_y * TILE_SIZE
         self.player.moving = False
 
+        # 到着地点の周りを探索済みにする（到着地点のトリガーは入ったことにしない）
+        self.explore_around()
+        self.triggers.reset(self.tilemap, dest_x, dest_y)
+        self.update_zone()
+
         # カメラを更新
         self.update_camera()
 
@@ -333,11 +478,53 @@ class FieldMapState:
         # ただし、入社式は1回のみなのでリセットしない
         # 必要に応じてマップ固有のイベントフラグを管理
 
+    def load_map(self, map_path):
+        """
+        マップを読み込んで現在のマップにする
+
+        Args:
+            map_path: マップデータのパス
+        """
+        self.tilemap = TileMap(map_path)
+        self.map_path = map_path
+
+        # 訪問を待っているクエスト目標を進める
+        self.quest_system.record_action('visit', self.get_map_name())
+
+    def explore_around(self):
+        """
+        プレイヤーの周りを探索済みにし、現在のマップの探索率をクエストに通知
+
+        Returns:
+            int: 現在のマップの探索率（パーセント）
+        """
+        map_name = self.get_map_name()
+        exploration = self.exploration.get_map(map_name, self.tilemap)
+        exploration.reveal(self.player.tile_x, self.player.tile_y)
+        coverage = exploration.get_coverage_percent()
+        self.quest_system.set_objective_value(('explore', map_name), coverage)
+        return coverage
+
+    def update_zone(self):
+        """今いるタイルのゾーンを引き直す（BGMが変わるときだけ切り替える）"""
+        self.zone = self.tilemap.get_zone(self.player.tile_x, self.player.tile_y)
+        if self.zone.bgm != self.current_bgm:
+            self.current_bgm = self.zone.bgm
+            if self.current_bgm:
+                print(f"BGM切り替え: {self.current_bgm}")
+
     def check_encounter(self):
-        """エンカウント判定"""
-        if random.random() < self.encounter_rate:
+        """エンカウント判定（現在タイルのゾーンの遭遇率と出現テーブルを使う）"""
+        zone = self.zone
+        if not zone.rate:
+            return  # エンカウントのないゾーン（乱数も消費しない）
+
+        if random.random() < zone.rate:
             # エンカウント発生！
-            enemy_data = get_enemy_for_area(self.area_level)
+            if zone.table:
+                enemy_data = zone.table.sample(zone.area_level)
+            else:
+                enemy_data = get_enemy_for_area(zone.area_level)
             self.start_battle(enemy_data['type'], enemy_data['level'])
 
     def start_battle(self, enemy_type, enemy_level):
@@ -348,12 +535,25 @@ class FieldMapState:
             enemy_type: 敵のタイプ
             enemy_level: 敵のレベル
         """
-        from src.game_states.battle import BattleState
-
         print(f"バトル開始！ {enemy_type} Lv.{enemy_level}")
 
-        # バトル状態に遷移
-        self.game.battle_state = BattleState(self.game, self.player, enemy_type, enemy_level)
+        # フィールドを渦巻きで覆い、白からバトル画面をフェードインする
+        self.game.transitions.start(
+            'swirl', ENCOUNTER_TRANSITION_FRAMES,
+            on_switch=lambda: self.enter_battle(enemy_type, enemy_level),
+            in_effect='fade', in_frames=BATTLE_TRANSITION_FRAMES, in_color=COLORS['WHITE']
+        )
+
+    def enter_battle(self, enemy_type, enemy_level):
+        """
+        バトル画面に切り替える（エンカウント演出で画面が覆われたときに呼ばれる）
+
+        Args:
+            enemy_type: 敵のタイプ
+            enemy_level: 敵のレベル
+        """
+        # バトル状態に遷移（事前準備済みのバトル画面を再利用）
+        self.game.battle_state = self.game.battle_pool.acquire(self.player, enemy_type, enemy_level)
         self.game.state = GameState.BATTLE
 
     def update_camera(self):
@@ -388,6 +588,10 @@ class FieldMapState:
         # プレイヤー描画
         self.player.draw(surface, self.camera_x, self.camera_y)
 
+        # ゾーンのライティング
+        if self.zone.lighting:
+            self.draw_lighting(surface, self.zone.lighting)
+
         # UI描画
         if self.show_info:
             self.draw_ui(surface)
@@ -398,6 +602,22 @@ class FieldMapState:
         # メニューウィンドウ描画
         self.menu_window.draw(surface, self.player)
 
+    def draw_lighting(self, surface, lighting):
+        """
+        ゾーンのライティング（半透明の色）を画面に重ねる
+
+        Args:
+            surface: 描画先サーフェス
+            lighting: (R, G, B, 不透明度)
+        """
+        # 色が変わったときだけサーフェスを作り直す
+        if self.lighting_overlay is None or self.lighting_overlay[0] != lighting:
+            overlay = pygame.Surface(surface.get_size())
+            overlay.fill(lighting[:3])
+            overlay.set_alpha(lighting[3] if len(lighting) > 3 else 128)
+            self.lighting_overlay = (lighting, overlay)
+        surface.blit(self.lighting_overlay[1], (0, 0))
+
     def draw_npcs(self, surface):
         """NPCを描画（HD-2D風）"""
         from src.entities.character_renderer import CharacterRenderer
@@ -448,6 +668,7 @@ class FieldMapState:
         surface.blit(map_surface, map_rect)
 
         # デバッグ情報
-        debug_text = f"座標: ({self.player.tile_x}, {self.player.tile_y}) 向き: {self.player.direction}"
+        coverage = self.exploration.get_coverage_percent(self.get_map_name())
+        debug_text = f"座標: ({self.player.tile_x}, {self.player.tile_y}) 向き: {self.player.direction} 探索: {coverage}%"
         debug_surface = self.font.render(debug_text, True, COLORS['LIGHT_BLUE'])
         surface.blit(debug_surface, (5, SCREEN_HEIGHT - 15))
@@ -0,0 +1,417 @@
+"""
+JID×QUEST - 会話グラフ
+選択肢・条件・効果のある会話をdata/dialogues/graphs/から読み込み、隣接配列にコンパイルして実行する
+"""
+
+import glob
+import json
+import os
+import time
+from config import *
+from src.utils.flag_store import load_flag_registry
+
+
+# ===== 条件 =====
+# 条件はhost（FieldMapState）を受け取る述語にコンパイルする
+
+def compile_dialogue_condition(condition):
+    """
+    会話の条件定義を述語にコンパイル
+
+    Args:
+        condition: {'type': 'flag', 'flag': str, 'value': 値}
+                   {'type': 'level', 'min': int, 'max': int}（どちらも省略可）
+                   {'type': 'quest', 'quest': str, 'state': 'active'|'completed'|'available'|'none'}
+
+    Returns:
+        function: 述語(host) -> bool
+    """
+    condition_type = condition.get('type')
+
+    if condition_type == 'flag':
+        flag_id = load_flag_registry().intern(condition['flag'])
+        required_value = condition.get('value', True)
+        return lambda host: host.event_manager.event_flags.get_by_id(flag_id) == required_value
+
+    if condition_type == 'level':
+        min_level = int(condition.get('min', 1))
+        max_level = int(condition.get('max', MAX_LEVEL))
+        return lambda host: min_level <= host.player.level <= max_level
+
+    if condition_type == 'quest':
+        quest_id = condition['quest']
+        state = condition.get('state', 'completed')
+        if state == 'active':
+            return lambda host: quest_id in host.quest_system.active_quests
+        if state == 'completed':
+            return lambda host: quest_id in host.quest_system.completed_quests
+        if state == 'available':
+            return lambda host: host.quest_system.can_accept_quest(quest_id)
+        if state == 'none':
+            return lambda host: (quest_id not in host.quest_system.active_quests
+                                 and quest_id not in host.quest_system.completed_quests)
+        raise ValueError(f"未定義のクエスト状態: {state}")
+
+    raise ValueError(f"未定義の条件タイプ: {condition_type}")
+
+
+def compile_conditions(conditions):
+    """
+    条件の並びを1つの述語にまとめる
+
+    Args:
+        conditions: 条件定義のリスト
+
+    Returns:
+        function: 全ての条件を満たすか判定する述語、条件がない場合None
+    """
+    predicates = tuple(compile_dialogue_condition(condition) for condition in conditions or ())
+    if not predicates:
+        return None
+    if len(predicates) == 1:
+        return predicates[0]
+    return lambda host: all(predicate(host) for predicate in predicates)
+
+
+# ===== 効果 =====
+# 効果は(種類, 引数...)のタプル
+EFFECT_SET_FLAG = 0  # (EFFECT_SET_FLAG, フラグ名, 値)
+EFFECT_START_QUEST = 1  # (EFFECT_START_QUEST, クエストID)
+
+
+def compile_effect(effect):
+    """
+    効果定義をタプルに変換
+
+    Args:
+        effect: {'type': 'set_flag', 'flag': str, 'value': 値} / {'type': 'start_quest', 'quest': str}
+
+    Returns:
+        tuple: 効果
+    """
+    effect_type = effect.get('type')
+    if effect_type == 'set_flag':
+        load_flag_registry().intern(effect['flag'])
+        return (EFFECT_SET_FLAG, effect['flag'], effect.get('value', True))
+    if effect_type == 'start_quest':
+        return (EFFECT_START_QUEST, effect['quest'])
+    raise ValueError(f"未定義の効果タイプ: {effect_type}")
+
+
+class DialogueGraph:
+    """
+    コンパイル済みの会話グラフ
+
+    ノードは番号で持ち、ノードiから出る選択肢はedge_start[i]からedge_start[i + 1]の手前までの
+    辺（行き先・文言・条件の配列）に並ぶ。ノードを進めるのも選択肢を絞るのも出次数分の処理で済む。
+    """
+
+    def __init__(self, graph_id, data):
+        """
+        グラフ定義をコンパイル
+
+        Args:
+            graph_id: グラフID
+            data: {'start': ノード名, 'speaker': 既定の話者,
+                   'nodes': {ノード名: {'speaker', 'messages', 'effects', 'choices', 'next'}}}
+                   choicesの各要素は{'text': 文言, 'next': ノード名, 'conditions': [...]}
+        """
+        self.graph_id = graph_id
+        nodes = data.get('nodes', {})
+        if not nodes:
+            raise ValueError("ノードがありません")
+
+        self.node_names = list(nodes)
+        index_of = {name: index for index, name in enumerate(self.node_names)}
+
+        def resolve(name, where):
+            if name is None:
+                return -1  # 会話の終わり
+            if name not in index_of:
+                raise ValueError(f"{where}: 存在しないノード {name}")
+            return index_of[name]
+
+        self.start = resolve(data.get('start', self.node_names[0]), 'start')
+        default_speaker = data.get('speaker', '')
+
+        # ノードの配列
+        self.speakers = []
+        self.messages = []
+        self.effects = []
+        self.next_nodes = []
+
+        # 辺（選択肢）の配列
+        self.edge_start = []
+        self.edge_targets = []
+        self.edge_texts = []
+        self.edge_conditions = []
+
+        for name in self.node_names:
+            node = nodes[name]
+            self.speakers.append(node.get('speaker', default_speaker))
+            self.messages.append(tuple(node.get('messages', ())))
+            self.effects.append(tuple(compile_effect(effect) for effect in node.get('effects', ())))
+            self.next_nodes.append(resolve(node.get('next'), name))
+
+            choices = node.get('choices', ())
+            if choices and not self.messages[-1]:
+                raise ValueError(f"{name}: 選択肢のあるノードにはメッセージが必要です")
+            self.edge_start.append(len(self.edge_targets))
+            for choice in choices:
+                self.edge_targets.append(resolve(choice.get('next'), name))
+                self.edge_texts.append(choice['text'])
+                self.edge_conditions.append(compile_conditions(choice.get('conditions')))
+        self.edge_start.append(len(self.edge_targets))
+
+    def get_choices(self, node, host):
+        """
+        ノードの選択肢のうち条件を満たすもの
+
+        Args:
+            node: ノード番号
+            host: FieldMapState
+
+        Returns:
+            list: [(文言, 行き先のノード番号), ...]
+        """
+        choices = []
+        for edge in range(self.edge_start[node], self.edge_start[node + 1]):
+            condition = self.edge_conditions[edge]
+            if condition is None or condition(host):
+                choices.append((self.edge_texts[edge], self.edge_targets[edge]))
+        return choices
+
+    def has_choices(self, node):
+        """ノードに選択肢が定義されているか（条件は見ない）"""
+        return self.edge_start[node] < self.edge_start[node + 1]
+
+
+class DialogueGraphLibrary:
+    """
+    会話グラフの読み込みとホットリロード
+
+    ファイルごとに更新時刻を覚えておき、check_reload()で変わったファイルだけコンパイルし直す。
+    会話中のグラフはそのまま最後まで使い、次の会話から新しいグラフになる。
+    """
+
+    def __init__(self, graphs_dir=DIALOGUE_GRAPHS_DIR):
+        """
+        Args:
+            graphs_dir: 会話グラフのディレクトリ（*.json、1ファイルに複数のグラフを書ける）
+        """
+        self.graphs_dir = graphs_dir
+        self.graphs = {}  # グラフID -> DialogueGraph
+        self.file_mtimes = {}  # ファイルパス -> 更新時刻
+        self.file_graphs = {}  # ファイルパス -> そのファイルのグラフID
+        self.last_check = time.perf_counter()
+        self.reload_count = 0
+
+        for path in sorted(glob.glob(os.path.join(graphs_dir, '*.json'))):
+            self.load_file(path)
+
+    def load_file(self, path):
+        """
+        1ファイル分のグラフを読み込んでコンパイル（エラーのあるグラフは前のものを残す）
+
+        Args:
+            path: ファイルパス
+        """
+        try:
+            self.file_mtimes[path] = os.path.getmtime(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"会話グラフ読み込みエラー: {path}: {e}")
+            return
+
+        # ファイルから消えたグラフを外す
+        for graph_id in self.file_graphs.get(path, ()):
+            if graph_id not in data:
+                self.graphs.pop(graph_id, None)
+
+        for graph_id, graph_data in data.items():
+            try:
+                self.graphs[graph_id] = DialogueGraph(graph_id, graph_data)
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"会話グラフエラー: {graph_id}: {e}")
+        self.file_graphs[path] = list(data)
+
+    def check_reload(self, force=False):
+        """
+        ファイルが更新されていたら読み直す（DIALOGUE_RELOAD_INTERVAL秒に1回だけ確認する）
+
+        Args:
+            force: Trueなら間隔に関係なく確認する
+
+        Returns:
+            bool: 読み直したファイルがあればTrue
+        """
+        now = time.perf_counter()
+        if not force and now - self.last_check < DIALOGUE_RELOAD_INTERVAL:
+            return False
+        self.last_check = now
+
+        reloaded = False
+        for path in glob.glob(os.path.join(self.graphs_dir, '*.json')):
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            if self.file_mtimes.get(path) != mtime:
+                self.load_file(path)
+                print(f"会話グラフを再読み込み: {path}")
+                self.reload_count += 1
+                reloaded = True
+
+        # 削除されたファイルのグラフを外す
+        for path in list(self.file_mtimes):
+            if not os.path.exists(path):
+                for graph_id in self.file_graphs.pop(path, ()):
+                    self.graphs.pop(graph_id, None)
+                del self.file_mtimes[path]
+                reloaded = True
+
+        return reloaded
+
+    def get(self, graph_id):
+        """
+        グラフを取得
+
+        Args:
+            graph_id: グラフID
+
+        Returns:
+            DialogueGraph: グラフ、ない場合None
+        """
+        return self.graphs.get(graph_id)
+
+
+_dialogue_graphs = None
+
+
+def load_dialogue_graphs(reload=False):
+    """
+    会話グラフを読み込み（2回目以降はキャッシュを返す）
+
+    Args:
+        reload: Trueの場合はファイルから読み直す
+
+    Returns:
+        DialogueGraphLibrary: 会話グラフ
+    """
+    global _dialogue_graphs
+    if _dialogue_graphs is None or reload:
+        _dialogue_graphs = DialogueGraphLibrary()
+        print(f"会話グラフ読み込み完了: {len(_dialogue_graphs.graphs)}件")
+    return _dialogue_graphs
+
+
+class DialogueRunner:
+    """
+    会話グラフの実行
+
+    ノードのメッセージと選択肢をDialogueBoxに出し、閉じられたら選ばれた選択肢
+    （選択肢がなければnext）のノードに進む。hostはFieldMapStateで、
+    dialogue_box・event_manager・quest_system・playerを持つ
+    """
+
+    # 1回の進行で通るメッセージのないノードの上限（nextの輪で止まらないように）
+    MAX_SILENT_STEPS = 64
+
+    def __init__(self, host, library=None):
+        """
+        Args:
+            host: FieldMapState
+            library: DialogueGraphLibrary（省略時は共有のもの）
+        """
+        self.host = host
+        self.library = library or load_dialogue_graphs()
+        self.graph = None
+        self.node = -1
+        self.choice_targets = []  # 表示中の選択肢の行き先
+
+    def is_active(self):
+        """会話グラフを実行中か"""
+        return self.graph is not None
+
+    def start(self, graph_id):
+        """
+        会話グラフを最初のノードから開始
+
+        Args:
+            graph_id: グラフID
+
+        Returns:
+            bool: 開始できた場合True
+        """
+        graph = self.library.get(graph_id)
+        if graph is None:
+            print(f"会話グラフが見つかりません: {graph_id}")
+            return False
+        self.graph = graph
+        self.enter(graph.start)
+        return True
+
+    def stop(self):
+        """会話グラフを終える"""
+        self.graph = None
+        self.node = -1
+        self.choice_targets = []
+
+    def enter(self, node):
+        """
+        ノードに入って効果を適用し、メッセージを表示する（メッセージのないノードは通り抜ける）
+
+        Args:
+            node: ノード番号（-1なら終わり）
+        """
+        graph = self.graph
+        for _ in range(self.MAX_SILENT_STEPS):
+            if node < 0:
+                self.stop()
+                return
+            self.node = node
+            self.apply_effects(graph.effects[node])
+
+            choices = graph.get_choices(node, self.host) if graph.has_choices(node) else []
+            messages = graph.messages[node]
+            if messages:
+                self.choice_targets = [target for _, target in choices]
+                self.host.dialogue_box.start_dialogue(
+                    list(messages), graph.speakers[node], auto_close=False,
+                    choices=[text for text, _ in choices])
+                return
+
+            node = graph.next_nodes[node]
+
+        print(f"会話グラフが進みません: {graph.graph_id}")
+        self.stop()
+
+    def update(self):
+        """会話ウィンドウが閉じられていたら次のノードに進む（毎フレーム呼ぶ）"""
+        if self.graph is None or self.host.dialogue_box.is_active:
+            return
+
+        if self.choice_targets:
+            selected = self.host.dialogue_box.selected_choice
+            if selected is None:
+                self.stop()  # 選択肢をキャンセルした
+                return
+            self.enter(self.choice_targets[selected])
+        else:
+            self.enter(self.graph.next_nodes[self.node])
+
+    def apply_effects(self, effects):
+        """
+        ノードの効果を適用
+
+        Args:
+            effects: compile_effect()のタプルの並び
+        """
+        for effect in effects:
+            if effect[0] == EFFECT_SET_FLAG:
+                self.host.event_manager.set_flag(effect[1], effect[2])
+            elif effect[0] == EFFECT_START_QUEST:
+                quest_system = self.host.quest_system
+                if quest_system.can_accept_quest(effect[1]):
+                    quest_system.accept_quest(effect[1])
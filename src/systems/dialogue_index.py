@@ -0,0 +1,242 @@
+"""
+JID×QUEST - 会話インデックス
+npcs.jsonをNPCごとの会話表にコンパイルし、レベルとフラグから会話をO(1)で選ぶ
+"""
+
+import json
+import os
+from config import *
+from src.utils.flag_store import load_flag_registry
+
+
+# 特別な意味を持つ会話キー
+KEY_FIRST = '初回'  # 初めて話しかけたとき
+KEY_NORMAL = '通常'  # 他に当てはまるものがないとき
+LEVEL_KEY_PREFIX = 'レベル'  # 'レベル10'ならレベル10から次のレベル会話の手前まで
+
+
+def get_met_flag(npc_name):
+    """NPCに話しかけたことがあるかのフラグ名"""
+    return f"npc_{npc_name}_met"
+
+
+class DialogueEntry:
+    """
+    会話1件分（メッセージと、選ばれる条件）
+
+    npcs.jsonの値はメッセージのリストか、条件付きの辞書
+    {"messages": [...], "min_level": 1, "max_level": 99,
+     "flag": "フラグ名", "value": true, "set_flag": "フラグ名", "graph": "会話グラフID"}
+    """
+
+    __slots__ = ('key', 'messages', 'min_level', 'max_level', 'flag_id', 'flag_value',
+                 'set_flag', 'priority', 'graph')
+
+    def __init__(self, key, messages, min_level=1, max_level=MAX_LEVEL, flag_id=None,
+                 flag_value=True, set_flag=None, priority=0, graph=None):
+        """
+        Args:
+            key: npcs.jsonでの会話キー
+            messages: メッセージのタプル
+            min_level: 選ばれる最低レベル
+            max_level: 選ばれる最高レベル
+            flag_id: 条件のフラグID（Noneなら条件なし）
+            flag_value: 条件のフラグの値
+            set_flag: 会話したときに立てるフラグ名
+            priority: 同じレベルで条件付きの会話が複数あるときの優先度（大きいほど先）
+            graph: メッセージの代わりに実行する会話グラフのID
+        """
+        self.key = key
+        self.messages = messages
+        self.min_level = min_level
+        self.max_level = max_level
+        self.flag_id = flag_id
+        self.flag_value = flag_value
+        self.set_flag = set_flag
+        self.priority = priority
+        self.graph = graph
+
+    def matches(self, flags):
+        """
+        フラグの条件を満たすか
+
+        Args:
+            flags: FlagStore
+
+        Returns:
+            bool: 条件なし、または条件を満たす場合True
+        """
+        return self.flag_id is None or flags.get_by_id(self.flag_id) == self.flag_value
+
+
+class NPCDialogue:
+    """
+    NPC1人分のコンパイル済み会話表
+
+    レベルごとに「条件付きの会話 → そのレベルの会話 → 通常 → 初回 → 先頭の会話」の
+    候補の並びを前計算しておくので、選ぶときは表を引いて先頭から条件を見るだけで済む。
+    """
+
+    def __init__(self, npc_name, npc_dialogues):
+        """
+        Args:
+            npc_name: NPC名
+            npc_dialogues: npcs.jsonの1人分 {会話キー: メッセージのリスト or 条件付きの辞書}
+        """
+        self.npc_name = npc_name
+        self.entries = {}  # 会話キー -> DialogueEntry
+        registry = load_flag_registry()
+
+        # レベル会話の範囲は次のレベル会話の手前まで
+        level_keys = sorted((int(key[len(LEVEL_KEY_PREFIX):]), key) for key in npc_dialogues
+                            if key.startswith(LEVEL_KEY_PREFIX)
+                            and key[len(LEVEL_KEY_PREFIX):].isdigit())
+        level_ranges = {}
+        for index, (level, key) in enumerate(level_keys):
+            next_level = level_keys[index + 1][0] if index + 1 < len(level_keys) else MAX_LEVEL + 1
+            level_ranges[key] = (level, next_level - 1)
+
+        conditional = []  # フラグ条件のある会話
+        ranged = []  # フラグ条件がなく、レベルの範囲だけある会話
+        for key, value in npc_dialogues.items():
+            if isinstance(value, dict):
+                flag_name = value.get('flag')
+                entry = DialogueEntry(
+                    key, tuple(value.get('messages', [])),
+                    min_level=int(value.get('min_level', 1)),
+                    max_level=int(value.get('max_level', MAX_LEVEL)),
+                    flag_id=registry.intern(flag_name) if flag_name else None,
+                    flag_value=value.get('value', True),
+                    set_flag=value.get('set_flag'),
+                    priority=int(value.get('priority', 0)),
+                    graph=value.get('graph'))
+            elif key == KEY_FIRST:
+                # 初回は「話しかけたことがない」を条件にし、話したらフラグを立てる
+                met_flag = get_met_flag(npc_name)
+                entry = DialogueEntry(key, tuple(value), flag_id=registry.intern(met_flag),
+                                      flag_value=False, set_flag=met_flag, priority=100)
+            elif key in level_ranges:
+                min_level, max_level = level_ranges[key]
+                entry = DialogueEntry(key, tuple(value), min_level, max_level)
+            else:
+                entry = DialogueEntry(key, tuple(value))
+
+            if not entry.messages and not entry.graph:
+                raise ValueError(f"メッセージがありません: {npc_name}/{key}")
+            self.entries[key] = entry
+            if entry.flag_id is not None:
+                conditional.append(entry)
+            elif key in level_ranges or isinstance(value, dict):
+                ranged.append(entry)
+
+        conditional.sort(key=lambda entry: -entry.priority)
+        # 範囲が重なったら優先度、次に最低レベルの高いもの（より後半向けの会話）を選ぶ
+        ranged.sort(key=lambda entry: (-entry.priority, -entry.min_level))
+
+        # どれにも当てはまらないときの会話（通常 → 初回 → 先頭）。条件なしで必ず選ばれるようにする
+        fallback = self.entries.get(KEY_NORMAL) or self.entries.get(KEY_FIRST)
+        if fallback is None:
+            fallback = next(iter(self.entries.values()), None)
+        if fallback is not None and fallback.flag_id is not None:
+            fallback = DialogueEntry(fallback.key, fallback.messages)
+
+        # レベル -> 候補の並び（同じ並びは使い回す）
+        self.by_level = [()] * (MAX_LEVEL + 1)
+        chains = {}
+        for level in range(1, MAX_LEVEL + 1):
+            chain = [entry for entry in conditional if entry.min_level <= level <= entry.max_level]
+            for entry in ranged:
+                if entry.min_level <= level <= entry.max_level:
+                    chain.append(entry)
+                    break
+            if fallback is not None and fallback not in chain:
+                chain.append(fallback)
+            chain = tuple(chain)
+            self.by_level[level] = chains.setdefault(tuple(id(entry) for entry in chain), chain)
+
+    def select(self, level, flags):
+        """
+        レベルとフラグに合う会話を選ぶ
+
+        Args:
+            level: プレイヤーのレベル
+            flags: FlagStore
+
+        Returns:
+            DialogueEntry: 会話、会話がない場合None
+        """
+        for entry in self.by_level[max(1, min(level, MAX_LEVEL))]:
+            if entry.matches(flags):
+                return entry
+        return None
+
+    def get_entry(self, key):
+        """
+        会話キーで会話を取得（イベントなど決まった場面の会話用）
+
+        Args:
+            key: 会話キー
+
+        Returns:
+            DialogueEntry: 会話、ない場合None
+        """
+        return self.entries.get(key)
+
+
+class DialogueIndex:
+    """全NPCのコンパイル済み会話表"""
+
+    def __init__(self, dialogue_data):
+        """
+        Args:
+            dialogue_data: npcs.jsonの辞書
+        """
+        self.npcs = {}
+        for npc_name, npc_dialogues in dialogue_data.items():
+            try:
+                self.npcs[npc_name] = NPCDialogue(npc_name, npc_dialogues)
+            except (TypeError, ValueError) as e:
+                print(f"会話データエラー: {npc_name}: {e}")
+
+    def get(self, npc_name):
+        """
+        NPCの会話表を取得
+
+        Args:
+            npc_name: NPC名
+
+        Returns:
+            NPCDialogue: 会話表、ない場合None
+        """
+        return self.npcs.get(npc_name)
+
+
+_dialogue_index = None
+
+
+def load_dialogue_index(reload=False):
+    """
+    会話データを読み込んでコンパイル（2回目以降はキャッシュを返す）
+
+    Args:
+        reload: Trueの場合はファイルから読み直す
+
+    Returns:
+        DialogueIndex: 会話インデックス
+    """
+    global _dialogue_index
+    if _dialogue_index is not None and not reload:
+        return _dialogue_index
+
+    dialogue_data = {}
+    try:
+        if os.path.exists(NPC_DIALOGUES_DATA):
+            with open(NPC_DIALOGUES_DATA, 'r', encoding='utf-8') as f:
+                dialogue_data = json.load(f)
+        else:
+            print("警告: 会話データが見つかりません")
+    except Exception as e:
+        print(f"会話データ読み込みエラー: {e}")
+
+    _dialogue_index = DialogueIndex(dialogue_data)
+    return _dialogue_index
@@ -0,0 +1,306 @@
+"""
+JID×QUEST - イベントスクリプト
+ストーリーイベントのステップを命令列にコンパイルし、ジェネレータで複数のスクリプトを並行実行する
+"""
+
+from config import *
+
+
+# ===== 命令 =====
+# 命令は(オペコード, 引数...)のタプル
+OP_DIALOGUE = 0  # (OP_DIALOGUE, 話者, (メッセージ, ...)) 会話が閉じるまで待つ
+OP_SET_FLAG = 1  # (OP_SET_FLAG, フラグ名, 値)
+OP_WAIT = 2  # (OP_WAIT, フレーム数)
+OP_MOVE = 3  # (OP_MOVE, 向き, 歩数) プレイヤーを歩かせる
+OP_BATTLE = 4  # (OP_BATTLE, 敵のタイプ, レベル) バトルが終わってフィールドに戻るまで待つ
+OP_JUMP = 5  # (OP_JUMP, 命令番号) 環境スクリプトのループ用
+
+
+def compile_step(step):
+    """
+    ステップ定義を命令に変換
+
+    Args:
+        step: story_events.jsonのステップ {'type': str, ...}
+
+    Returns:
+        tuple: 命令
+    """
+    step_type = step.get('type')
+
+    if step_type == 'dialogue':
+        return (OP_DIALOGUE, step.get('speaker', 'システム'), tuple(step.get('messages', [])))
+    if step_type == 'objective':
+        return (OP_DIALOGUE, 'システム', ("【目標】", step.get('text', '')))
+    if step_type == 'set_flag':
+        return (OP_SET_FLAG, step['flag'], step.get('value', True))
+    if step_type == 'wait':
+        return (OP_WAIT, max(1, int(step['frames'])))
+    if step_type == 'move':
+        if step['direction'] not in ('up', 'down', 'left', 'right'):
+            raise ValueError(f"不正な向き: {step['direction']}")
+        return (OP_MOVE, step['direction'], max(1, int(step.get('steps', 1))))
+    if step_type == 'battle':
+        return (OP_BATTLE, step['enemy'], int(step.get('level', 1)))
+    if step_type == 'jump':
+        return (OP_JUMP, int(step['to']))
+
+    raise ValueError(f"未定義のステップタイプ: {step_type}")
+
+
+def compile_script(steps):
+    """
+    ステップ定義の並びを命令列にコンパイル
+
+    Args:
+        steps: ステップ定義のリスト
+
+    Returns:
+        tuple: 命令のタプル
+    """
+    program = tuple(compile_step(step) for step in steps)
+    for instruction in program:
+        if instruction[0] == OP_JUMP and not 0 <= instruction[1] < len(program):
+            raise ValueError(f"ジャンプ先が範囲外です: {instruction[1]}")
+    return program
+
+
+# ===== 待ちのある命令の実装 =====
+# 待つ命令はジェネレータで、待っている間は毎フレーム1回ずつyieldする
+# 途中経過はthread.counterに置き、セーブから再開したときも続きから待てるようにする
+
+def op_dialogue(vm, thread, speaker, messages):
+    """会話ウィンドウが空くのを待って会話を開始し、閉じるまで待つ"""
+    dialogue_box = vm.host.dialogue_box
+    while dialogue_box.is_active:
+        yield
+    dialogue_box.start_dialogue(list(messages), speaker, auto_close=False)
+    while dialogue_box.is_active:
+        yield
+
+
+def op_set_flag(vm, thread, flag_name, value):
+    """フラグを設定（待たない）"""
+    vm.host.event_manager.set_flag(flag_name, value)
+
+
+def op_wait(vm, thread, frames):
+    """指定フレーム数待つ"""
+    if thread.counter <= 0:
+        thread.counter = frames
+    while thread.counter > 0:
+        thread.counter -= 1
+        yield
+
+
+def op_move(vm, thread, direction, steps):
+    """プレイヤーを指定の向きに歩かせる（壁に当たったらそこで終わる）"""
+    player = vm.host.player
+    if thread.counter <= 0:
+        thread.counter = steps
+    while thread.counter > 0:
+        while player.moving:
+            yield
+        player.start_move(direction)
+        if not vm.host.tilemap.is_walkable(player.target_tile_x, player.target_tile_y):
+            player.moving = False
+            thread.counter = 0
+            break
+        while player.moving:
+            yield
+        thread.counter -= 1
+
+
+def op_battle(vm, thread, enemy_type, enemy_level):
+    """バトルを開始し、終わってフィールドに戻るまで待つ"""
+    game = vm.host.game
+    vm.host.start_battle(enemy_type, enemy_level)
+    yield
+    while game.state != GameState.FIELD or game.transitions.is_active:
+        yield
+
+
+# オペコード -> 実装（OP_JUMPはVM本体で処理する）
+OP_HANDLERS = {
+    OP_DIALOGUE: op_dialogue,
+    OP_SET_FLAG: op_set_flag,
+    OP_WAIT: op_wait,
+    OP_MOVE: op_move,
+    OP_BATTLE: op_battle,
+}
+
+
+class ScriptThread:
+    """実行中のスクリプト1本分"""
+
+    __slots__ = ('script_id', 'program', 'pc', 'counter', 'cutscene', 'runner', 'finished')
+
+    def __init__(self, script_id, program, pc=0, counter=0, cutscene=False):
+        """
+        Args:
+            script_id: スクリプトID（ストーリーイベントならイベントID）
+            program: compile_script()の命令列
+            pc: 実行中の命令番号
+            counter: 実行中の命令の途中経過（残りフレーム数・残り歩数）
+            cutscene: Trueならカットシーン（実行中はプレイヤーを操作できない）
+        """
+        self.script_id = script_id
+        self.program = program
+        self.pc = pc
+        self.counter = counter
+        self.cutscene = cutscene
+        self.runner = None
+        self.finished = False
+
+    def get_state(self):
+        """セーブ用の状態 (スクリプトID, 命令番号, 途中経過, カットシーンか)"""
+        return (self.script_id, self.pc, self.counter, self.cutscene)
+
+
+class ScriptVM:
+    """
+    イベントスクリプトの実行環境
+
+    スクリプトごとにジェネレータを1つ持ち、update()で順番に進める。
+    待ちのない命令は1フレームに合計budget個までしか実行しないので、
+    スクリプトが多くてもループしていてもフレーム時間は一定に収まる。
+    hostはFieldMapStateで、dialogue_box・event_manager・player・tilemap・game・
+    start_battle()・on_script_finished(script_id)を持つ
+    """
+
+    def __init__(self, host, budget=SCRIPT_INSTRUCTION_BUDGET):
+        """
+        実行環境の初期化
+
+        Args:
+            host: FieldMapState
+            budget: 1フレームに実行できる命令数
+        """
+        self.host = host
+        self.budget = budget
+        self.threads = []
+        self.next_index = 0  # 次のフレームで最初に進めるスクリプト
+
+    def spawn(self, script_id, program, cutscene=False, pc=0, counter=0):
+        """
+        スクリプトを開始
+
+        Args:
+            script_id: スクリプトID
+            program: 命令列
+            cutscene: Trueならカットシーン
+            pc: 開始する命令番号（セーブからの再開用）
+            counter: 命令の途中経過（セーブからの再開用）
+
+        Returns:
+            ScriptThread: 開始したスクリプト
+        """
+        thread = ScriptThread(script_id, program, pc, counter, cutscene)
+        thread.runner = self.run(thread)
+        self.threads.append(thread)
+        return thread
+
+    def stop(self, script_id):
+        """スクリプトを止める（完了扱いにはしない）"""
+        self.threads = [thread for thread in self.threads if thread.script_id != script_id]
+
+    def stop_all(self):
+        """全てのスクリプトを止める"""
+        self.threads = []
+        self.next_index = 0
+
+    def is_running(self, script_id):
+        """スクリプトが実行中か"""
+        return any(thread.script_id == script_id for thread in self.threads)
+
+    def has_cutscene(self):
+        """カットシーンを実行中か"""
+        for thread in self.threads:
+            if thread.cutscene:
+                return True
+        return False
+
+    def run(self, thread):
+        """
+        スクリプト1本分のジェネレータ
+
+        Yields:
+            bool: Trueなら待ち中、Falseなら命令を1つ実行した
+        """
+        program = thread.program
+        while thread.pc < len(program):
+            instruction = program[thread.pc]
+            opcode = instruction[0]
+
+            if opcode == OP_JUMP:
+                thread.pc = instruction[1]
+                yield False
+                continue
+
+            waiting = OP_HANDLERS[opcode](self, thread, *instruction[1:])
+            if waiting is not None:
+                for _ in waiting:
+                    yield True
+            thread.counter = 0
+            thread.pc += 1
+            yield False
+
+    def update(self):
+        """スクリプトを1フレーム分進める"""
+        threads = self.threads
+        if not threads:
+            return
+
+        budget = self.budget
+        count = len(threads)
+        start = self.next_index % count
+        self.next_index = start + 1
+        for offset in range(count):
+            thread = threads[(start + offset) % count]
+            while True:
+                try:
+                    blocked = next(thread.runner)
+                except StopIteration:
+                    thread.finished = True
+                    break
+                if blocked:
+                    break
+                budget -= 1
+                if budget <= 0:
+                    break
+            if budget <= 0:
+                # 予算切れ：次のフレームは次のスクリプトから始める（ループするスクリプトが他を止めない）
+                self.next_index = (start + offset + 1) % count
+                break
+
+        # 終わったスクリプトを外して通知
+        finished = [thread for thread in threads if thread.finished]
+        if finished:
+            self.threads = [thread for thread in threads if not thread.finished]
+            for thread in finished:
+                self.host.on_script_finished(thread.script_id)
+
+    def get_state(self):
+        """
+        セーブ用に全スクリプトの状態を取得
+
+        Returns:
+            tuple: ScriptThread.get_state()のタプル
+        """
+        return tuple(thread.get_state() for thread in self.threads)
+
+    def load_state(self, state, get_program):
+        """
+        セーブした状態からスクリプトを再開（待ち中の命令はその命令の最初から待ち直す）
+
+        Args:
+            state: get_state()の結果
+            get_program: スクリプトID -> 命令列（見つからなければNone）
+        """
+        self.stop_all()
+        for script_id, pc, counter, cutscene in state:
+            program = get_program(script_id)
+            if program is None or pc >= len(program):
+                print(f"スクリプトを再開できません: {script_id}")
+                continue
+            self.spawn(script_id, program, cutscene, pc, counter)
@@ -0,0 +1,219 @@
+"""
+JID×QUEST - 探索記録
+マップごとに見たタイルをビット集合で記録し、探索率を数え上げで保つ
+"""
+
+import base64
+from collections import deque
+from config import *
+
+
+class ExplorationMap:
+    """
+    1マップ分の探索記録
+
+    タイル(x, y)はビット番号 y * width + x。歩けるタイルのうち見たものの数を
+    見えた瞬間に数えておくので、探索率はいつでもO(1)で求まる。
+    """
+
+    def __init__(self, width, height, collision, bits=None):
+        """
+        Args:
+            width: マップの幅（タイル数）
+            height: マップの高さ（タイル数）
+            collision: 衝突マップ（0なら歩ける）
+            bits: 保存していたビット集合（bytes、省略時は何も見ていない）
+        """
+        self.width = width
+        self.height = height
+        self.collision = collision
+        self.bits = bytearray((width * height + 7) // 8)
+        if bits:
+            self.bits[:len(bits)] = bits[:len(self.bits)]
+
+        # 歩けるタイルのビット集合（探索率の分母と、保存データからの数え直しに使う）
+        walkable_mask = 0
+        for y, row in enumerate(collision):
+            for x, blocked in enumerate(row[:width]):
+                if blocked == 0:
+                    walkable_mask |= 1 << (y * width + x)
+        self.walkable_total = bin(walkable_mask).count('1')
+        self.explored_walkable = bin(int.from_bytes(self.bits, 'little') & walkable_mask).count('1')
+
+    def is_explored(self, tile_x, tile_y):
+        """
+        タイルを見たことがあるか（ミニマップの表示用）
+
+        Args:
+            tile_x: X座標（タイル単位）
+            tile_y: Y座標（タイル単位）
+
+        Returns:
+            bool: 見たことがある場合True
+        """
+        if tile_x < 0 or tile_x >= self.width or tile_y < 0 or tile_y >= self.height:
+            return False
+        index = tile_y * self.width + tile_x
+        return bool(self.bits[index >> 3] >> (index & 7) & 1)
+
+    def mark(self, tile_x, tile_y):
+        """
+        タイルを見たことにする
+
+        Returns:
+            bool: 初めて見た場合True
+        """
+        index = tile_y * self.width + tile_x
+        byte_index = index >> 3
+        mask = 1 << (index & 7)
+        if self.bits[byte_index] & mask:
+            return False
+        self.bits[byte_index] |= mask
+        if self.collision[tile_y][tile_x] == 0:
+            self.explored_walkable += 1
+        return True
+
+    def reveal(self, tile_x, tile_y, radius=EXPLORE_VISION_RADIUS):
+        """
+        プレイヤーの位置から見えるタイルを記録
+
+        歩けるタイルを幅優先でradius歩までたどり、たどれたタイルとそれに接する壁を見たことにする
+        （壁の向こう側は見えない）
+
+        Args:
+            tile_x: X座標（タイル単位）
+            tile_y: Y座標（タイル単位）
+            radius: 視界の半径（歩数）
+
+        Returns:
+            int: 新しく見た歩けるタイルの数
+        """
+        if tile_x < 0 or tile_x >= self.width or tile_y < 0 or tile_y >= self.height:
+            return 0
+
+        before = self.explored_walkable
+        width, height, collision = self.width, self.height, self.collision
+        visited = {(tile_x, tile_y)}
+        queue = deque([(tile_x, tile_y, 0)])
+        self.mark(tile_x, tile_y)
+
+        while queue:
+            x, y, distance = queue.popleft()
+            for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if nx < 0 or nx >= width or ny < 0 or ny >= height or (nx, ny) in visited:
+                    continue
+                visited.add((nx, ny))
+                self.mark(nx, ny)
+                if collision[ny][nx] == 0 and distance + 1 < radius:
+                    queue.append((nx, ny, distance + 1))
+
+        return self.explored_walkable - before
+
+    def get_coverage(self):
+        """
+        探索率
+
+        Returns:
+            float: 見た歩けるタイルの割合（0.0〜1.0）
+        """
+        if self.walkable_total == 0:
+            return 1.0
+        return self.explored_walkable / self.walkable_total
+
+    def get_coverage_percent(self):
+        """探索率（整数のパーセント、切り捨て）"""
+        if self.walkable_total == 0:
+            return 100
+        return self.explored_walkable * 100 // self.walkable_total
+
+
+class ExplorationTracker:
+    """
+    全マップの探索記録
+
+    マップの記録は最初にそのマップを歩いたときに作る。
+    セーブから読み込んだビット集合は、マップの大きさがわかるまでそのまま持っておく。
+    """
+
+    def __init__(self):
+        self.maps = {}  # マップ名 -> ExplorationMap
+        self.pending = {}  # マップ名 -> まだ展開していない保存データ（bytes）
+
+    def get_map(self, map_name, tilemap):
+        """
+        マップの探索記録を取得（なければ作る）
+
+        Args:
+            map_name: マップ名
+            tilemap: TileMap
+
+        Returns:
+            ExplorationMap: 探索記録
+        """
+        exploration = self.maps.get(map_name)
+        if exploration is None:
+            exploration = ExplorationMap(tilemap.width, tilemap.height, tilemap.collision,
+                                         self.pending.pop(map_name, None))
+            self.maps[map_name] = exploration
+        return exploration
+
+    def get_coverage_percent(self, map_name):
+        """
+        マップの探索率（まだ歩いていないマップは0）
+
+        Args:
+            map_name: マップ名
+
+        Returns:
+            int: 探索率（パーセント）
+        """
+        exploration = self.maps.get(map_name)
+        return exploration.get_coverage_percent() if exploration else 0
+
+    def get_state(self):
+        """
+        セーブ用の状態
+
+        Returns:
+            tuple: ((マップ名, ビット集合のbytes), ...)
+        """
+        state = dict(self.pending)
+        for map_name, exploration in self.maps.items():
+            state[map_name] = bytes(exploration.bits)
+        return tuple(sorted(state.items()))
+
+    def load_state(self, state):
+        """
+        セーブした状態を読み込み（マップの記録は次に歩いたときに展開する）
+
+        Args:
+            state: get_state()の結果
+        """
+        self.maps = {}
+        self.pending = dict(state)
+
+
+def pack_exploration(state):
+    """
+    探索記録をセーブ用の辞書にする
+
+    Args:
+        state: ExplorationTracker.get_state()の結果
+
+    Returns:
+        dict: マップ名 -> ビット集合のbase64
+    """
+    return {map_name: base64.b64encode(bits).decode('ascii') for map_name, bits in state}
+
+
+def unpack_exploration(data):
+    """
+    セーブ用の辞書を探索記録に戻す
+
+    Args:
+        data: pack_exploration()の結果
+
+    Returns:
+        tuple: ExplorationTracker.get_state()の形式
+    """
+    return tuple(sorted((map_name, base64.b64decode(bits)) for map_name, bits in data.items()))
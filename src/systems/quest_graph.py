@@ -0,0 +1,292 @@
+"""
+JID×QUEST - クエスト依存グラフ
+前提クエストからDAGを作り、循環・到達不能なクエストを検出して、推移的な前提と解放順を前計算する
+"""
+
+from src.utils.flag_store import get_completed_flag, get_started_flag
+
+
+def collect_flag_sources(quests, events=None):
+    """
+    フラグを立てるもの（クエスト報酬・イベント報酬・イベントのset_flag・イベント完了）を集める
+
+    Args:
+        quests: main_quests.jsonの辞書
+        events: story_events.jsonの辞書（省略可）
+
+    Returns:
+        dict: フラグ名 -> 立てるもののリスト（'quest:ID' / 'event:ID'）
+    """
+    sources = {}
+
+    for quest_id, quest_data in quests.items():
+        for flag_name in quest_data.get('rewards', {}).get('flags', []):
+            sources.setdefault(flag_name, []).append(f"quest:{quest_id}")
+
+    for event_id, event_data in (events or {}).items():
+        source = f"event:{event_id}"
+        flags = [get_started_flag(event_id), get_completed_flag(event_id)]
+        flags.extend(event_data.get('rewards', {}).get('flags', []))
+        flags.extend(step['flag'] for step in event_data.get('steps', [])
+                     if step.get('type') == 'set_flag' and 'flag' in step)
+        for flag_name in flags:
+            sources.setdefault(flag_name, []).append(source)
+
+    return sources
+
+
+class QuestGraph:
+    """
+    クエストの依存グラフ
+
+    クエストごとにビット番号を振り、前提クエストの集合を整数のビット集合で持つ。
+    完了済みクエストもビット集合にしておけば、前提を満たしているかは
+    (前提 & ~完了済み) == 0 の1回の演算で判定できる。
+    循環に含まれる・存在しないクエストを前提にする・立てるものがないフラグを必要とするクエストは
+    blockedにまとめ、受注可能にはしない。
+    """
+
+    def __init__(self, quests, flag_sources=None):
+        """
+        グラフを作って検証する
+
+        Args:
+            quests: main_quests.jsonの辞書
+            flag_sources: collect_flag_sources()の結果（省略時はフラグを検証しない）
+        """
+        self.quests = quests
+        self.quest_ids = list(quests)
+        self.bits = {quest_id: 1 << index for index, quest_id in enumerate(self.quest_ids)}
+
+        self.errors = []  # 内容の誤り（循環・存在しない前提）
+        self.warnings = []  # 到達できないクエスト
+        self.blocked = set()  # 受注可能にならないクエスト
+
+        # 直接の前提（ビット集合）と、前提 -> それを前提にするクエスト
+        self.prerequisite_masks = {}
+        self.dependents = {quest_id: [] for quest_id in self.quest_ids}
+        for quest_id in self.quest_ids:
+            mask = 0
+            for prereq_id in quests[quest_id].get('prerequisites', []):
+                if prereq_id not in self.bits:
+                    self.errors.append(f"{quest_id}: 存在しない前提クエスト {prereq_id}")
+                    self.blocked.add(quest_id)
+                    continue
+                mask |= self.bits[prereq_id]
+                self.dependents[prereq_id].append(quest_id)
+            self.prerequisite_masks[quest_id] = mask
+
+        self.order, self.tiers = self.sort_topologically()
+        self.transitive_masks = self.compute_transitive()
+        if flag_sources is not None:
+            self.check_flags(flag_sources)
+        self.propagate_blocked()
+
+        # 解放順（段・必要レベル・宣言順で並べる）
+        declared = {quest_id: index for index, quest_id in enumerate(self.quest_ids)}
+        self.schedule = sorted(
+            (quest_id for quest_id in self.order if quest_id not in self.blocked),
+            key=lambda quest_id: (self.tiers[quest_id],
+                                  quests[quest_id].get('required_level', 1),
+                                  declared[quest_id]))
+
+    def sort_topologically(self):
+        """
+        Kahnの方法でトポロジカル順に並べ、循環を検出
+
+        Returns:
+            tuple: (トポロジカル順のクエストIDのリスト, クエストID -> 段（前提の最長の深さ）)
+        """
+        indegree = {quest_id: bin(self.prerequisite_masks[quest_id]).count('1')
+                    for quest_id in self.quest_ids}
+        tiers = {}
+        ready = [quest_id for quest_id in self.quest_ids if indegree[quest_id] == 0]
+        for quest_id in ready:
+            tiers[quest_id] = 0
+
+        order = []
+        while ready:
+            next_ready = []
+            for quest_id in ready:
+                order.append(quest_id)
+                for dependent in self.dependents[quest_id]:
+                    indegree[dependent] -= 1
+                    tiers[dependent] = max(tiers.get(dependent, 0), tiers[quest_id] + 1)
+                    if indegree[dependent] == 0:
+                        next_ready.append(dependent)
+            ready = next_ready
+
+        # 並べられなかったクエストは循環に含まれるか、循環の先にある
+        remaining = [quest_id for quest_id in self.quest_ids if indegree[quest_id] > 0]
+        if remaining:
+            in_cycle = set()
+            for cycle in self.find_cycles(remaining):
+                in_cycle.update(cycle)
+                self.errors.append(f"前提クエストが循環しています: {' → '.join(cycle + cycle[:1])}")
+            for quest_id in remaining:
+                if quest_id not in in_cycle:
+                    self.warnings.append(f"{quest_id}: 前提が循環していて到達できません")
+            self.blocked.update(remaining)
+            for quest_id in remaining:
+                tiers[quest_id] = None
+
+        return order, tiers
+
+    def find_cycles(self, quest_ids):
+        """
+        循環を1つずつ取り出す（Tarjanの強連結成分分解）
+
+        Args:
+            quest_ids: トポロジカルソートで残ったクエストID
+
+        Returns:
+            list: 循環ごとのクエストIDのリスト
+        """
+        members = set(quest_ids)
+        index_of = {}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        cycles = []
+
+        for root in quest_ids:
+            if root in index_of:
+                continue
+            # 再帰を使わずに深さ優先探索（(ノード, 次に見る依存先の番号)を積む）
+            work = [(root, 0)]
+            while work:
+                quest_id, child_index = work.pop()
+                if child_index == 0:
+                    index_of[quest_id] = lowlink[quest_id] = len(index_of)
+                    stack.append(quest_id)
+                    on_stack.add(quest_id)
+
+                children = [child for child in self.dependents[quest_id] if child in members]
+                if child_index < len(children):
+                    work.append((quest_id, child_index + 1))
+                    child = children[child_index]
+                    if child not in index_of:
+                        work.append((child, 0))
+                    elif child in on_stack:
+                        lowlink[quest_id] = min(lowlink[quest_id], index_of[child])
+                    continue
+
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[quest_id])
+
+                if lowlink[quest_id] == index_of[quest_id]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == quest_id:
+                            break
+                    if len(component) > 1 or quest_id in self.dependents[quest_id]:
+                        cycles.append(component[::-1])
+
+        return cycles
+
+    def compute_transitive(self):
+        """
+        推移的な前提（前提の前提も含む）をトポロジカル順に前計算
+
+        Returns:
+            dict: クエストID -> 推移的な前提のビット集合
+        """
+        transitive = {}
+        for quest_id in self.order:
+            mask = self.prerequisite_masks[quest_id]
+            for prereq_id in self.quests[quest_id].get('prerequisites', []):
+                mask |= transitive.get(prereq_id, 0)
+            transitive[quest_id] = mask
+        return transitive
+
+    def check_flags(self, flag_sources):
+        """
+        必要フラグを立てるものがあるか検証
+
+        Args:
+            flag_sources: collect_flag_sources()の結果
+        """
+        for quest_id in self.quest_ids:
+            for flag_name in self.quests[quest_id].get('required_flags', []):
+                sources = flag_sources.get(flag_name)
+                if not sources:
+                    self.warnings.append(f"{quest_id}: フラグ {flag_name} を立てるものがありません")
+                    self.blocked.add(quest_id)
+                elif sources == [f"quest:{quest_id}"]:
+                    self.warnings.append(f"{quest_id}: フラグ {flag_name} は自分の報酬でしか立ちません")
+                    self.blocked.add(quest_id)
+
+    def propagate_blocked(self):
+        """受注できないクエストを前提にするクエストも受注できないとする"""
+        pending = list(self.blocked)
+        while pending:
+            quest_id = pending.pop()
+            for dependent in self.dependents[quest_id]:
+                if dependent not in self.blocked:
+                    self.blocked.add(dependent)
+                    self.warnings.append(f"{dependent}: 前提 {quest_id} に到達できません")
+                    pending.append(dependent)
+
+    def get_mask(self, quest_ids):
+        """
+        クエストIDの集まりをビット集合にする
+
+        Args:
+            quest_ids: クエストIDの集まり
+
+        Returns:
+            int: ビット集合（知らないクエストIDは無視）
+        """
+        mask = 0
+        bits = self.bits
+        for quest_id in quest_ids:
+            mask |= bits.get(quest_id, 0)
+        return mask
+
+    def get_quest_ids(self, mask):
+        """
+        ビット集合をクエストIDのリストに戻す
+
+        Args:
+            mask: ビット集合
+
+        Returns:
+            list: クエストID（宣言順）
+        """
+        return [quest_id for quest_id in self.quest_ids if mask & self.bits[quest_id]]
+
+    def prerequisites_met(self, quest_id, completed_mask):
+        """
+        直接の前提クエストを全て完了しているか
+
+        Args:
+            quest_id: クエストID
+            completed_mask: 完了済みクエストのビット集合
+
+        Returns:
+            bool: 前提を満たしていて、受注できないクエストでもない場合True
+        """
+        if quest_id in self.blocked:
+            return False
+        return not self.prerequisite_masks.get(quest_id, 0) & ~completed_mask
+
+    def get_unlocked_mask(self, completed_mask):
+        """
+        前提を満たしている未完了クエストのビット集合
+
+        Args:
+            completed_mask: 完了済みクエストのビット集合
+
+        Returns:
+            int: ビット集合
+        """
+        mask = 0
+        for quest_id in self.schedule:
+            bit = self.bits[quest_id]
+            if not bit & completed_mask and not self.prerequisite_masks[quest_id] & ~completed_mask:
+                mask |= bit
+        return mask
@@ -2,8 +2,23 @@
 JID×QUEST - クエストシステム
 """
 
+import bisect
 import json
 import os
+from src.systems.quest_graph import QuestGraph
+
+
+def get_objective_key(objective):
+    """
+    目標を行動に振り分けるキー
+
+    Args:
+        objective: main_quests.jsonの目標定義
+
+    Returns:
+        tuple: (目標タイプ, 対象)。対象のない目標は(目標タイプ, None)で、そのタイプの行動全てで進む
+    """
+    return (objective.get('type'), objective.get('subject'))
 
 
 class QuestSystem:
@@ -12,10 +27,35 @@ class QuestSystem:
     def __init__(self):
         """クエストシステムの初期化"""
         self.quests = {}  # 全クエストデータ
-        self.active_quests = []  # 進行中のクエスト
-        self.completed_quests = []  # 完了したクエスト
+        self.active_quests = set()  # 進行中のクエスト
+        self.completed_quests = set()  # 完了したクエスト
+        self.completed_mask = 0  # 完了したクエストのビット集合（QuestGraphのビット番号）
+        self.unlocked_mask = 0  # 前提を満たしている未完了クエストのビット集合
         self.quest_progress = {}  # クエスト進捗状況
 
+        # クエスト完了時のコールバック（引数: クエストID）
+        self.completion_callback = None
+
+        # 受注条件の判定に使う状態（FieldMapStateから通知される）
+        self.player_level = 1
+        self.event_flags = {}
+
+        # 前提クエストの依存グラフ（読み込み時に検証・前計算する）
+        self.graph = QuestGraph({})
+
+        # 逆引き表
+        # 条件に関わる値が変わったときは、その値に依存するクエストだけ評価し直す
+        self.flag_index = {}  # フラグ名 -> それを必要とするクエストIDの集合
+        self.level_index = {}  # 必要レベル -> クエストIDの集合
+        self.level_thresholds = []  # 必要レベル（昇順）
+        self.objective_keys = {}  # (クエストID, 目標ID) -> get_objective_key()
+        self.objective_min_levels = {}  # (クエストID, 目標ID) -> 対象の最低レベル（'min_level'がある目標だけ）
+        self.objective_index = {}  # get_objective_key() -> 進行中で未達成の(クエストID, 目標ID)の集合
+        self.available_quests = set()  # 受注可能なクエスト
+
+        # 回数ではなく現在の値で進む目標（レベル・探索率）の値
+        self.objective_values = {('level', None): self.player_level}  # get_objective_key() -> 値
+
     def load_quests(self, quest_file='data/quests/main_quests.json'):
         """
         クエストデータを読み込み
@@ -35,14 +75,38 @@ class QuestSystem:
             print(f"クエスト読み込みエラー: {e}")
             self.quests = {}
 
-    def can_accept_quest(self, quest_id, player_level=1, event_flags=None):
+        self.build_indexes()
+
+    def can_accept_quest(self, quest_id, player_level=None, event_flags=None):
         """
         クエストを受注可能かチェック
 
+        Args:
+            quest_id: クエストID
+            player_level: プレイヤーレベル（省略時は通知されたレベル）
+            event_flags: イベントフラグ（dictまたはFlagStore、省略時は通知されたフラグ）
+
+        Returns:
+            bool: 受注可能な場合True
+        """
+        # 通知済みの状態で判定するなら受注可能な集合を引くだけ
+        if player_level is None and event_flags is None:
+            return quest_id in self.available_quests
+
+        if player_level is None:
+            player_level = self.player_level
+        if event_flags is None:
+            event_flags = self.event_flags
+        return self.check_requirements(quest_id, player_level, event_flags)
+
+    def check_requirements(self, quest_id, player_level, event_flags):
+        """
+        受注条件（未受注・レベル・前提クエスト・フラグ）を評価
+
         Args:
             quest_id: クエストID
             player_level: プレイヤーレベル
-            event_flags: イベントフラグ辞書
+            event_flags: イベントフラグ（dictまたはFlagStore）
 
         Returns:
             bool: 受注可能な場合True
@@ -50,33 +114,41 @@ class QuestSystem:
         if quest_id not in self.quests:
             return False
 
-        # すでに完了済み
+        # すでに完了済み（進行中かはcheck_conditionsで見る）
         if quest_id in self.completed_quests:
             return False
 
-        # すでに進行中
+        # 前提クエストチェック（ビット集合の演算1回）
+        if not self.graph.prerequisites_met(quest_id, self.completed_mask):
+            return False
+
+        return self.check_conditions(quest_id, player_level, event_flags)
+
+    def check_conditions(self, quest_id, player_level, event_flags):
+        """
+        前提クエスト以外の受注条件（未受注・レベル・フラグ）を評価
+
+        Args:
+            quest_id: クエストID（前提を満たしている未完了のもの）
+            player_level: プレイヤーレベル
+            event_flags: イベントフラグ（dictまたはFlagStore）
+
+        Returns:
+            bool: 条件を満たしている場合True
+        """
         if quest_id in self.active_quests:
             return False
 
         quest_data = self.quests[quest_id]
 
         # レベル要件チェック
-        required_level = quest_data.get('required_level', 1)
-        if player_level < required_level:
+        if player_level < quest_data.get('required_level', 1):
             return False
 
-        # 前提クエストチェック
-        prerequisites = quest_data.get('prerequisites', [])
-        for prereq_id in prerequisites:
-            if prereq_id not in self.completed_quests:
-                return False
-
         # イベントフラグチェック
-        if event_flags:
-            required_flags = quest_data.get('required_flags', [])
-            for flag_name in required_flags:
-                if not event_flags.get(flag_name, False):
-                    return False
+        for flag_name in quest_data.get('required_flags', []):
+            if not event_flags.get(flag_name, False):
+                return False
 
         return True
 
@@ -99,8 +171,9 @@ class QuestSystem:
 
         quest_data = self.quests[quest_id]
 
-        # クエストを進行中リストに追加
-        self.active_quests.append(quest_id)
+        # クエストを進行中にする
+        self.active_quests.add(quest_id)
+        self.available_quests.discard(quest_id)
 
         # 進捗を初期化
         self.quest_progress[quest_id] = {
@@ -117,8 +190,15 @@ class QuestSystem:
                 'target': objective.get('target', 1),
                 'completed': False
             }
+            self.index_objective(quest_id, objective_id)
 
         print(f"クエスト受注: {quest_data.get('name', quest_id)}")
+
+        # レベル・探索率の目標は受注時点の値から始める
+        for objective_id in self.quest_progress[quest_id]['objectives']:
+            key = self.objective_keys.get((quest_id, objective_id))
+            if key in self.objective_values:
+                self.sync_objective_value(quest_id, objective_id, self.objective_values[key])
         return quest_data
 
     def update_objective(self, quest_id, objective_id, increment=1):
@@ -155,6 +235,7 @@ class QuestSystem:
         # 目標達成チェック
         if objective['current'] >= objective['target']:
             objective['completed'] = True
+            self.unindex_objective(quest_id, objective_id)
             print(f"目標達成: {objective_id}")
 
             # クエスト全体の完了チェック
@@ -201,18 +282,28 @@ class QuestSystem:
 
         quest_data = self.quests[quest_id]
 
-        # 進行中リストから削除
-        self.active_quests.remove(quest_id)
-
-        # 完了リストに追加
-        self.completed_quests.append(quest_id)
+        # 進行中から完了に移す
+        self.active_quests.discard(quest_id)
+        self.completed_quests.add(quest_id)
+        self.completed_mask |= self.graph.bits.get(quest_id, 0)
+        self.unlocked_mask = self.graph.get_unlocked_mask(self.completed_mask)
 
-        # 進捗を完了としてマーク
+        # 進捗を完了としてマーク（未達成のまま残った目標も振り分けから外す）
         if quest_id in self.quest_progress:
             self.quest_progress[quest_id]['completed'] = True
+            for objective_id in self.quest_progress[quest_id]['objectives']:
+                self.unindex_objective(quest_id, objective_id)
+
+        # このクエストを前提にするクエストだけ評価し直す
+        dependents = self.graph.dependents.get(quest_id)
+        if dependents:
+            self.recheck_quests(dependents)
 
         print(f"クエスト完了: {quest_data.get('name', quest_id)}")
 
+        if self.completion_callback:
+            self.completion_callback(quest_id)
+
         # 報酬を返す
         return quest_data.get('rewards', {})
 
@@ -252,7 +343,7 @@ class QuestSystem:
         Returns:
             list: 進行中のクエスト情報リスト
         """
-        return [self.get_quest_info(qid) for qid in self.active_quests]
+        return [self.get_quest_info(qid) for qid in sorted(self.active_quests)]
 
     def get_completed_quests(self):
         """
@@ -261,7 +352,16 @@ class QuestSystem:
         Returns:
             list: 完了したクエスト情報リスト
         """
-        return [self.get_quest_info(qid) for qid in self.completed_quests]
+        return [self.get_quest_info(qid) for qid in sorted(self.completed_quests)]
+
+    def get_available_quests(self):
+        """
+        受注可能なクエストの集合を取得
+
+        Returns:
+            set: クエストIDの集合（読み取り専用として扱うこと）
+        """
+        return self.available_quests
 
     def save_state(self):
         """
@@ -271,8 +371,8 @@ class QuestSystem:
             dict: 保存用データ
         """
         return {
-            'active_quests': self.active_quests.copy(),
-            'completed_quests': self.completed_quests.copy(),
+            'active_quests': sorted(self.active_quests),
+            'completed_quests': sorted(self.completed_quests),
             'quest_progress': self.quest_progress.copy()
         }
 
@@ -283,6 +383,191 @@ class QuestSystem:
         Args:
             state_data: 保存データ
         """
-        self.active_quests = state_data.get('active_quests', [])
-        self.completed_quests = state_data.get('completed_quests', [])
+        self.active_quests = set(state_data.get('active_quests', []))
+        self.completed_quests = set(state_data.get('completed_quests', []))
+        self.completed_mask = self.graph.get_mask(self.completed_quests)
+        self.unlocked_mask = self.graph.get_unlocked_mask(self.completed_mask)
         self.quest_progress = state_data.get('quest_progress', {})
+        self.rebuild_objective_index()
+        self.rebuild_available()
+
+    # ===== 受注条件と目標の逆引き =====
+
+    def build_indexes(self):
+        """読み込んだクエストの依存グラフを作って検証し、受注条件と目標から逆引き表を作る"""
+        self.graph = QuestGraph(self.quests)
+        for message in self.graph.errors + self.graph.warnings:
+            print(f"クエストデータエラー: {message}")
+        self.completed_mask = self.graph.get_mask(self.completed_quests)
+        self.unlocked_mask = self.graph.get_unlocked_mask(self.completed_mask)
+
+        self.flag_index = {}
+        self.level_index = {}
+        self.objective_keys = {}
+        self.objective_min_levels = {}
+
+        for quest_id, quest_data in self.quests.items():
+            for flag_name in quest_data.get('required_flags', []):
+                self.flag_index.setdefault(flag_name, set()).add(quest_id)
+            required_level = quest_data.get('required_level', 1)
+            if required_level > 1:
+                self.level_index.setdefault(required_level, set()).add(quest_id)
+            for objective in quest_data.get('objectives', []):
+                self.objective_keys[(quest_id, objective.get('id'))] = get_objective_key(objective)
+                if 'min_level' in objective:
+                    self.objective_min_levels[(quest_id, objective.get('id'))] = objective['min_level']
+
+        self.level_thresholds = sorted(self.level_index)
+        self.rebuild_objective_index()
+        self.rebuild_available()
+
+    def rebuild_available(self):
+        """
+        受注可能な集合を作り直す（読み込み時・フラグの一括置き換え時）
+
+        前提を満たしているクエストだけをビット集合から取り出して残りの条件を評価する
+        """
+        unlocked = self.graph.get_quest_ids(self.unlocked_mask)
+        self.available_quests = {quest_id for quest_id in unlocked
+                                 if self.check_conditions(quest_id, self.player_level,
+                                                          self.event_flags)}
+
+    def recheck_quests(self, quest_ids):
+        """
+        指定したクエストだけ受注条件を評価し直す
+
+        Args:
+            quest_ids: クエストIDの集合
+        """
+        bits = self.graph.bits
+        for quest_id in quest_ids:
+            if (self.unlocked_mask & bits.get(quest_id, 0)
+                    and self.check_conditions(quest_id, self.player_level, self.event_flags)):
+                self.available_quests.add(quest_id)
+            else:
+                self.available_quests.discard(quest_id)
+
+    def rebuild_objective_index(self):
+        """進行中クエストの未達成の目標から振り分け表を作り直す"""
+        self.objective_index = {}
+        for quest_id in self.active_quests:
+            progress = self.quest_progress.get(quest_id)
+            if not progress:
+                continue
+            for objective_id, objective in progress['objectives'].items():
+                if not objective['completed']:
+                    self.index_objective(quest_id, objective_id)
+
+    def index_objective(self, quest_id, objective_id):
+        """目標を振り分け表に追加"""
+        key = self.objective_keys.get((quest_id, objective_id))
+        if key is not None:
+            self.objective_index.setdefault(key, set()).add((quest_id, objective_id))
+
+    def unindex_objective(self, quest_id, objective_id):
+        """目標を振り分け表から外す"""
+        key = self.objective_keys.get((quest_id, objective_id))
+        entries = self.objective_index.get(key)
+        if entries:
+            entries.discard((quest_id, objective_id))
+            if not entries:
+                del self.objective_index[key]
+
+    def set_event_flags(self, event_flags):
+        """
+        参照するフラグを差し替えて全クエストを評価し直す
+
+        Args:
+            event_flags: イベントフラグ（EventManager.event_flagsをそのまま参照する）
+        """
+        self.event_flags = event_flags
+        self.rebuild_available()
+
+    def on_flag_changed(self, flag_name):
+        """
+        フラグの変化を通知（そのフラグを必要とするクエストだけ評価し直す）
+
+        Args:
+            flag_name: 変化したフラグ名
+        """
+        quest_ids = self.flag_index.get(flag_name)
+        if quest_ids:
+            self.recheck_quests(quest_ids)
+
+    def set_player_level(self, level):
+        """
+        プレイヤーのレベルを通知（しきい値をまたいだクエストとレベル目標だけ評価し直す）
+
+        Args:
+            level: 現在のレベル
+        """
+        old_level = self.player_level
+        if level == old_level:
+            return
+        self.player_level = level
+
+        low, high = min(old_level, level), max(old_level, level)
+        start = bisect.bisect_right(self.level_thresholds, low)
+        end = bisect.bisect_right(self.level_thresholds, high)
+        for threshold in self.level_thresholds[start:end]:
+            self.recheck_quests(self.level_index[threshold])
+
+        self.set_objective_value(('level', None), level)
+
+    def set_objective_value(self, key, value):
+        """
+        現在の値で進む目標（レベル・探索率）に値を通知し、それを待っている目標だけ進める
+
+        Args:
+            key: get_objective_key()の形式（('level', None)、('explore', マップ名)など）
+            value: 現在の値
+
+        Returns:
+            list: この通知で達成した(クエストID, 目標ID)のリスト
+        """
+        self.objective_values[key] = value
+        completed = []
+        for quest_id, objective_id in list(self.objective_index.get(key, ())):
+            if self.sync_objective_value(quest_id, objective_id, value):
+                completed.append((quest_id, objective_id))
+        return completed
+
+    def sync_objective_value(self, quest_id, objective_id, value):
+        """
+        目標の進捗を値に合わせる（進捗は減らさない）
+
+        Returns:
+            bool: 目標を達成した場合True
+        """
+        objective = self.quest_progress[quest_id]['objectives'][objective_id]
+        if value > objective['current']:
+            return self.update_objective(quest_id, objective_id, value - objective['current'])
+        return False
+
+    def record_action(self, action_type, subject=None, amount=1, level=None):
+        """
+        ゲーム内の行動を、それを待っている目標にだけ振り分ける
+
+        Args:
+            action_type: 行動の種類（'talk', 'visit', 'battle', 'action'）
+            subject: 行動の対象（NPCのID・マップ名・敵のタイプなど）
+            amount: 進捗増加量
+            level: 対象のレベル（倒した敵のレベルなど。'min_level'のある目標はこれで判定する）
+
+        Returns:
+            list: この行動で達成した(クエストID, 目標ID)のリスト
+        """
+        entries = list(self.objective_index.get((action_type, subject), ()))
+        if subject is not None:
+            # 対象を指定しない目標（「敵を3体倒す」など）も進める
+            entries.extend(self.objective_index.get((action_type, None), ()))
+
+        completed = []
+        min_levels = self.objective_min_levels
+        for quest_id, objective_id in entries:
+            min_level = min_levels.get((quest_id, objective_id))
+            if min_level is not None and (level is None or level < min_level):
+                continue
+            if self.update_objective(quest_id, objective_id, amount):
+                completed.append((quest_id, objective_id))
+        return completed
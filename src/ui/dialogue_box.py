@@ -36,7 +36,12 @@ class DialogueBox:
         self.is_active = False
         self.auto_close = False  # 会話終了後に自動で閉じるか
 
-    def start_dialogue(self, messages, speaker_name="", auto_close=False):
+        # 選択肢（最後のメッセージを表示し終えたら出す）
+        self.choices = []
+        self.choice_index = 0
+        self.selected_choice = None  # 閉じたときに選ばれていた選択肢の番号（キャンセルはNone）
+
+    def start_dialogue(self, messages, speaker_name="", auto_close=False, choices=None):
         """
         会話を開始
 
@@ -44,6 +49,7 @@ class DialogueBox:
             messages: メッセージリスト（文字列のリスト）
             speaker_name: 話者の名前
             auto_close: 会話終了後に自動で閉じるか
+            choices: 最後のメッセージの後に出す選択肢（文字列のリスト）
         """
         if isinstance(messages, str):
             messages = [messages]
@@ -56,6 +62,14 @@ class DialogueBox:
         self.is_animating = True
         self.is_active = True
         self.frame_counter = 0
+        self.choices = list(choices or [])
+        self.choice_index = 0
+        self.selected_choice = None
+
+    def is_choosing(self):
+        """選択肢を表示しているか"""
+        return (bool(self.choices) and not self.is_animating
+                and self.current_message_index >= len(self.messages) - 1)
 
     def handle_input(self, events):
         """
@@ -68,7 +82,18 @@ class DialogueBox:
             return
 
         for event in events:
-            if event.type == pygame.KEYDOWN:
+            if event.type == pygame.KEYDOWN and self.is_choosing():
+                if event.key == pygame.K_UP:
+                    self.choice_index = (self.choice_index - 1) % len(self.choices)
+                elif event.key == pygame.K_DOWN:
+                    self.choice_index = (self.choice_index + 1) % len(self.choices)
+                elif event.key in [pygame.K_SPACE, pygame.K_RETURN]:
+                    self.choose(self.choice_index)
+                elif event.key in [pygame.K_ESCAPE, pygame.K_x]:
+                    self.close()
+                if not self.is_active:
+                    return
+            elif event.type == pygame.KEYDOWN:
                 if event.key in [pygame.K_SPACE, pygame.K_RETURN]:
                     if self.is_animating:
                         # アニメーション中は全文表示
@@ -85,13 +110,19 @@ class DialogueBox:
             self.current_char_index = 0
             self.is_animating = True
             self.frame_counter = 0
-        else:
-            # 会話終了
-            if self.auto_close:
-                self.close()
-            else:
-                # 最後のメッセージを表示し続ける
-                pass
+        elif not self.choices:
+            # 会話終了（最後のメッセージで決定キーを押したら閉じる）
+            self.close()
+
+    def choose(self, index):
+        """
+        選択肢を選んで閉じる
+
+        Args:
+            index: 選択肢の番号
+        """
+        self.selected_choice = index
+        self.close()
 
     def close(self):
         """会話ウィンドウを閉じる"""
@@ -99,6 +130,7 @@ class DialogueBox:
         self.messages = []
         self.current_message_index = 0
         self.current_char_index = 0
+        self.choices = []
 
     def update(self):
         """会話ウィンドウの更新"""
@@ -181,6 +213,17 @@ class DialogueBox:
             surface.blit(text_surface,
                         (self.window_x + 10, self.window_y + text_y_offset + i * 15))
 
+        # 選択肢（ウィンドウ右側にカーソル付きで並べる）
+        if self.is_choosing():
+            choice_x = self.window_x + self.window_width - 260
+            choice_y = self.window_y + text_y_offset
+            for i, choice in enumerate(self.choices):
+                color = COLORS['GOLD'] if i == self.choice_index else COLORS['WHITE']
+                prefix = "▶ " if i == self.choice_index else "  "
+                choice_surface = self.font.render(prefix + choice, True, color)
+                surface.blit(choice_surface, (choice_x, choice_y + i * 20))
+            return
+
         # "▼"マーク（メッセージ送りアイコン）
         if not self.is_animating:
             if self.current_message_index < len(self.messages) - 1:
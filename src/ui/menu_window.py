@@ -9,12 +9,13 @@ from config import *
 class MenuWindow:
     """メニューウィンドウクラス（ドラクエ風）"""
 
-    def __init__(self, save_callback=None):
+    def __init__(self, save_callback=None, save_busy_callback=None):
         """
         メニューウィンドウの初期化
 
         Args:
             save_callback: セーブ実行時のコールバック関数
+            save_busy_callback: 書き込み中のセーブがあるか返すコールバック関数
         """
         self.font = pygame.font.Font(None, FONT_SIZE)
 
@@ -31,6 +32,7 @@ class MenuWindow:
 
         # コールバック
         self.save_callback = save_callback
+        self.save_busy_callback = save_busy_callback
 
     def open(self):
         """メニューを開く"""
@@ -50,6 +52,19 @@ class MenuWindow:
             if self.save_message_timer == 0:
                 self.save_message = ""
 
+    def show_save_result(self, success):
+        """
+        セーブ結果のメッセージを表示
+
+        Args:
+            success: セーブ成功時True
+        """
+        if success:
+            self.save_message = "セーブしました！"
+        else:
+            self.save_message = "セーブに失敗しました"
+        self.save_message_timer = 90  # 1.5秒表示
+
     def handle_input(self, events):
         """
         入力処理
@@ -71,14 +86,17 @@ class MenuWindow:
                         elif event.key == pygame.K_DOWN or event.key == pygame.K_s:
                             self.save_selected_slot = (self.save_selected_slot + 1) % 3
                         elif event.key == pygame.K_RETURN or event.key == pygame.K_SPACE:
-                            # セーブ実行
-                            if self.save_callback:
-                                success = self.save_callback(self.save_selected_slot + 1)
-                                if success:
-                                    self.save_message = "セーブしました！"
+                            # セーブ実行（書き込みはバックグラウンドで行い、完了はshow_save_resultで受け取る）
+                            if self.save_busy_callback and self.save_busy_callback():
+                                # 前のセーブの書き込みが終わるまで受け付けない
+                                self.save_message = "書き込み中です"
+                                self.save_message_timer = 60  # 1秒表示
+                            elif self.save_callback:
+                                if self.save_callback(self.save_selected_slot + 1):
+                                    self.save_message = "セーブ中..."
+                                    self.save_message_timer = 0  # 完了通知まで表示し続ける
                                 else:
-                                    self.save_message = "セーブに失敗しました"
-                                self.save_message_timer = 90  # 1.5秒表示
+                                    self.show_save_result(False)
                         elif event.key == pygame.K_ESCAPE or event.key == pygame.K_x:
                             self.current_submenu = None
                             self.save_message = ""
@@ -0,0 +1,305 @@
+"""
+JID×QUEST - 画面切り替え演出
+フェード・ワイプ・モザイク・渦巻きのトランジションと、各画面で共有するタイムライン
+"""
+
+import math
+import pygame
+from config import *
+
+try:
+    import numpy
+except ImportError:
+    numpy = None  # 渦巻きはモザイクで代用する
+
+
+# 対応している演出
+TRANSITION_EFFECTS = ('fade', 'wipe', 'mosaic', 'swirl')
+
+# モザイクの段階（ブロックサイズ）。段階ごとに縮小バッファを1枚ずつ用意する
+MOSAIC_BLOCK_SIZES = (2, 3, 4, 6, 8, 12, 16, 24, 32, 48, 64)
+
+
+class TransitionRenderer:
+    """
+    トランジションの描画クラス
+
+    オーバーレイ・縮小バッファ・渦巻きの座標テーブルは初期化時に一度だけ作り、
+    毎フレームの描画では新しいSurfaceや配列を作らない。
+    """
+
+    def __init__(self, screen):
+        """
+        描画用バッファの初期化
+
+        Args:
+            screen: 描画先サーフェス（バッファはこれと同じサイズ・形式で作る）
+        """
+        self.width, self.height = screen.get_size()
+
+        # フェード用オーバーレイ（色が変わったときだけ塗り直す）
+        self.overlay = pygame.Surface((self.width, self.height))
+        self.overlay_color = None
+
+        # モザイク用の縮小バッファ（描画先と同じ形式でないとscaleの出力先に使えない）
+        self.mosaic_buffers = []
+        for block_size in MOSAIC_BLOCK_SIZES:
+            if block_size > TRANSITION_MOSAIC_MAX_BLOCK:
+                break
+            size = (max(1, self.width // block_size), max(1, self.height // block_size))
+            self.mosaic_buffers.append(pygame.Surface(size, 0, screen))
+
+        # 渦巻き用の縮小バッファと座標テーブル（NumPyがある場合のみ）
+        self.swirl_enabled = numpy is not None
+        if self.swirl_enabled:
+            self.setup_swirl(screen)
+        else:
+            print("警告: NumPyがないため渦巻きのトランジションはモザイクで代用します（pip install numpy）")
+
+    def setup_swirl(self, screen):
+        """
+        渦巻きの座標テーブルを事前計算
+
+        Args:
+            screen: 描画先サーフェス
+        """
+        width = max(1, self.width // TRANSITION_SWIRL_SCALE)
+        height = max(1, self.height // TRANSITION_SWIRL_SCALE)
+        self.swirl_size = (width, height)
+        self.swirl_buffer = pygame.Surface(self.swirl_size, 0, screen)
+
+        # surfarrayと同じ(x, y)順の座標
+        xs, ys = numpy.meshgrid(numpy.arange(width, dtype=numpy.float32),
+                                numpy.arange(height, dtype=numpy.float32), indexing='ij')
+        self.swirl_center = ((width - 1) / 2.0, (height - 1) / 2.0)
+        dx = xs - self.swirl_center[0]
+        dy = ys - self.swirl_center[1]
+        self.swirl_radius = numpy.sqrt(dx * dx + dy * dy)
+        self.swirl_theta = numpy.arctan2(dy, dx)
+
+        # 中心ほど大きく回す
+        max_radius = float(self.swirl_radius.max()) or 1.0
+        self.swirl_falloff = (1.0 - self.swirl_radius / max_radius) ** 2
+
+        # 毎フレーム使い回す作業用配列
+        self.swirl_angle = numpy.empty((width, height), dtype=numpy.float32)
+        self.swirl_work = numpy.empty((width, height), dtype=numpy.float32)
+        self.swirl_index_x = numpy.empty((width, height), dtype=numpy.intp)
+        self.swirl_index = numpy.empty((width, height), dtype=numpy.intp)
+        self.swirl_source = numpy.empty((width, height, 3), dtype=numpy.uint8)
+        self.swirl_result = numpy.empty((width, height, 3), dtype=numpy.uint8)
+        self.swirl_source_flat = self.swirl_source.reshape(-1, 3)
+
+    def draw(self, surface, effect, coverage, color):
+        """
+        トランジションを描画
+
+        Args:
+            surface: 描画先サーフェス（描画済みの画面に重ねる）
+            effect: 演出名（TRANSITION_EFFECTSのいずれか）
+            coverage: 覆い具合（0.0=元の画面、1.0=完全に覆う）
+            color: フェード・ワイプの色
+        """
+        coverage = max(0.0, min(1.0, coverage))
+        if coverage <= 0.0:
+            return
+
+        if effect == 'fade':
+            self.draw_fade(surface, coverage, color)
+        elif effect == 'wipe':
+            self.draw_wipe(surface, coverage, color)
+        elif effect == 'mosaic':
+            self.draw_mosaic(surface, coverage, color)
+        elif effect == 'swirl':
+            if self.swirl_enabled:
+                self.draw_swirl(surface, coverage, color)
+            else:
+                self.draw_mosaic(surface, coverage, color)
+
+    def draw_fade(self, surface, coverage, color):
+        """単色フェード"""
+        if self.overlay_color != color:
+            self.overlay.fill(color)
+            self.overlay_color = color
+        self.overlay.set_alpha(int(255 * coverage))
+        surface.blit(self.overlay, (0, 0))
+
+    def draw_wipe(self, surface, coverage, color):
+        """左から右へのワイプ"""
+        surface.fill(color, (0, 0, int(self.width * coverage), self.height))
+
+    def draw_mosaic(self, surface, coverage, color):
+        """モザイク（段階的にブロックを大きくし、最後は単色に溶かす）"""
+        if self.mosaic_buffers:
+            level = min(len(self.mosaic_buffers) - 1, int(coverage * len(self.mosaic_buffers)))
+            buffer = self.mosaic_buffers[level]
+            pygame.transform.scale(surface, buffer.get_size(), buffer)
+            pygame.transform.scale(buffer, (self.width, self.height), surface)
+        self.draw_fade(surface, coverage * coverage, color)
+
+    def draw_swirl(self, surface, coverage, color):
+        """渦巻き（縮小バッファ上で画素を回転させて拡大表示）"""
+        np = numpy
+        width, height = self.swirl_size
+        center_x, center_y = self.swirl_center
+
+        # 縮小して画素を取り出す
+        pygame.transform.scale(surface, self.swirl_size, self.swirl_buffer)
+        pixels = pygame.surfarray.pixels3d(self.swirl_buffer)
+        np.copyto(self.swirl_source, pixels)
+        del pixels  # サーフェスのロックを解除
+
+        # 各画素の参照元の角度 = 元の角度 + 回転量 × 中心からの減衰
+        twist = coverage * TRANSITION_SWIRL_TURNS * 2 * math.pi
+        np.multiply(self.swirl_falloff, twist, out=self.swirl_angle)
+        np.add(self.swirl_angle, self.swirl_theta, out=self.swirl_angle)
+
+        # 参照元のX座標
+        np.cos(self.swirl_angle, out=self.swirl_work)
+        np.multiply(self.swirl_work, self.swirl_radius, out=self.swirl_work)
+        np.add(self.swirl_work, center_x, out=self.swirl_work)
+        np.clip(self.swirl_work, 0, width - 1, out=self.swirl_work)
+        np.copyto(self.swirl_index_x, self.swirl_work, casting='unsafe')
+
+        # 参照元のY座標
+        np.sin(self.swirl_angle, out=self.swirl_work)
+        np.multiply(self.swirl_work, self.swirl_radius, out=self.swirl_work)
+        np.add(self.swirl_work, center_y, out=self.swirl_work)
+        np.clip(self.swirl_work, 0, height - 1, out=self.swirl_work)
+        np.copyto(self.swirl_index, self.swirl_work, casting='unsafe')
+
+        # 1次元の画素番号に変換して一括で参照
+        np.multiply(self.swirl_index_x, height, out=self.swirl_index_x)
+        np.add(self.swirl_index, self.swirl_index_x, out=self.swirl_index)
+        np.take(self.swirl_source_flat, self.swirl_index, axis=0, out=self.swirl_result)
+
+        pygame.surfarray.blit_array(self.swirl_buffer, self.swirl_result)
+        pygame.transform.scale(self.swirl_buffer, (self.width, self.height), surface)
+        self.draw_fade(surface, coverage * coverage, color)
+
+
+class ScreenTransition:
+    """
+    画面切り替えのタイムライン（タイトル・フィールド・バトルで共有）
+
+    start(): 画面を覆う（out）→ 切り替え処理 → 次の画面を表示する（in）
+    start_in(): 覆われた状態から次の画面を表示する（in）のみ
+    """
+
+    def __init__(self, screen):
+        """
+        タイムラインの初期化
+
+        Args:
+            screen: 描画先サーフェス
+        """
+        self.renderer = TransitionRenderer(screen)
+        self.is_active = False
+        self.phase = None  # 'out' or 'in'
+        self.timer = 0
+
+        self.out_effect = 'fade'
+        self.out_frames = 1
+        self.out_color = COLORS['BLACK']
+        self.in_effect = 'fade'
+        self.in_frames = 1
+        self.in_color = COLORS['BLACK']
+        self.on_switch = None
+
+    def start(self, effect='fade', frames=MAP_TRANSITION_FRAMES, color=COLORS['BLACK'],
+              on_switch=None, in_effect=None, in_frames=None, in_color=None):
+        """
+        画面切り替えを開始
+
+        Args:
+            effect: 覆うときの演出名
+            frames: 覆うまでのフレーム数
+            color: 覆うときの色
+            on_switch: 完全に覆ったときに呼ぶ関数（画面の切り替え処理）
+            in_effect: 表示するときの演出名（省略時はeffectと同じ）
+            in_frames: 表示するまでのフレーム数（省略時はframesと同じ）
+            in_color: 表示するときの色（省略時はcolorと同じ）
+        """
+        self.check_effect(effect)
+        self.out_effect = effect
+        self.out_frames = max(1, frames)
+        self.out_color = color
+        self.in_effect = in_effect or effect
+        self.in_frames = max(1, in_frames or frames)
+        self.in_color = in_color or color
+        self.check_effect(self.in_effect)
+
+        self.on_switch = on_switch
+        self.phase = 'out'
+        self.timer = 0
+        self.is_active = True
+
+    def start_in(self, effect='fade', frames=MAP_TRANSITION_FRAMES, color=COLORS['BLACK']):
+        """
+        覆われた状態から次の画面を表示する演出のみ開始
+
+        Args:
+            effect: 演出名
+            frames: 表示するまでのフレーム数
+            color: 色
+        """
+        self.check_effect(effect)
+        self.in_effect = effect
+        self.in_frames = max(1, frames)
+        self.in_color = color
+        self.on_switch = None
+        self.phase = 'in'
+        self.timer = 0
+        self.is_active = True
+
+    def check_effect(self, effect):
+        """演出名をチェック"""
+        if effect not in TRANSITION_EFFECTS:
+            raise ValueError(f"未対応のトランジション: {effect}")
+
+    def update(self):
+        """タイムラインを1フレーム進める"""
+        if not self.is_active:
+            return
+
+        self.timer += 1
+        if self.phase == 'out':
+            if self.timer >= self.out_frames:
+                # 完全に覆ったところで画面を切り替える
+                on_switch = self.on_switch
+                self.on_switch = None
+                self.phase = 'in'
+                self.timer = 0
+                if on_switch:
+                    on_switch()
+        elif self.timer >= self.in_frames:
+            self.is_active = False
+            self.phase = None
+
+    def get_coverage(self):
+        """
+        現在の覆い具合を取得
+
+        Returns:
+            float: 0.0（元の画面）〜 1.0（完全に覆う）
+        """
+        if self.phase == 'out':
+            return self.timer / self.out_frames
+        if self.phase == 'in':
+            return 1.0 - self.timer / self.in_frames
+        return 0.0
+
+    def draw(self, surface):
+        """
+        描画済みの画面にトランジションを重ねる
+
+        Args:
+            surface: 描画先サーフェス
+        """
+        if not self.is_active:
+            return
+
+        if self.phase == 'out':
+            self.renderer.draw(surface, self.out_effect, self.get_coverage(), self.out_color)
+        else:
+            self.renderer.draw(surface, self.in_effect, self.get_coverage(), self.in_color)
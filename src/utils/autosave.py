@@ -0,0 +1,142 @@
+"""
+JID×QUEST - オートセーブ
+意味のある変化（マップ移動・クエスト完了・レベルアップ）で汚れ印を付け、書き込みをまとめて行う
+"""
+
+import time
+from config import *
+from src.utils.snapshot import capture_snapshot
+
+
+class AutosaveScheduler:
+    """
+    オートセーブのスケジューラ
+
+    mark_dirty()は印を付けるだけで、実際の書き込みはupdate()が次の条件で1回にまとめる。
+    - 前回の書き込みからAUTOSAVE_MIN_INTERVAL秒以上たっている
+    - 最後の変化からAUTOSAVE_QUIET_TIME秒たった（続けて変化しそうな間は待つ）か、
+      最初の変化からAUTOSAVE_MAX_STALENESS秒たった（待ちすぎない）
+    - 前回のオートセーブの書き込みが終わっている
+    スナップショットだけメインスレッドで取り、シリアライズと書き込みはSaveWriterが行う。
+    """
+
+    def __init__(self, save_writer, slot=AUTOSAVE_SLOT):
+        """
+        スケジューラの初期化
+
+        Args:
+            save_writer: SaveWriter
+            slot: オートセーブの書き込み先スロット
+        """
+        self.save_writer = save_writer
+        self.slot = slot
+
+        # 計測値
+        self.marks = 0  # mark_dirty()の回数
+        self.writes = 0  # 書き込みを依頼した回数
+        self.failures = 0
+        self.latency_total = 0.0  # 書き込みにかかった時間の合計（ms）
+        self.latency_max = 0.0
+        self.completed = 0
+
+        self.reset()
+
+    def reset(self):
+        """汚れ印と書き込み間隔をリセット（ニューゲーム・ロード時）"""
+        self.dirty_reasons = set()
+        self.first_dirty_at = None
+        self.last_dirty_at = None
+        self.last_write_at = time.perf_counter()
+        self.in_flight = False
+
+    def mark_dirty(self, reason):
+        """
+        オートセーブが必要な変化があったことを記録
+
+        Args:
+            reason: 変化の種類（'map', 'quest', 'level_up'など、ログ表示用）
+        """
+        now = time.perf_counter()
+        self.marks += 1
+        self.dirty_reasons.add(reason)
+        if self.first_dirty_at is None:
+            self.first_dirty_at = now
+        self.last_dirty_at = now
+
+    def is_dirty(self):
+        """書き込み待ちの変化があるか"""
+        return self.first_dirty_at is not None
+
+    def update(self, field_state):
+        """
+        書き込みの条件を満たしていればスナップショットを取って書き込みを依頼（毎フレーム呼ぶ）
+
+        Args:
+            field_state: FieldMapState
+        """
+        if self.first_dirty_at is None or self.in_flight:
+            return
+
+        now = time.perf_counter()
+        if now - self.last_write_at < AUTOSAVE_MIN_INTERVAL:
+            return
+        if (now - self.last_dirty_at < AUTOSAVE_QUIET_TIME
+                and now - self.first_dirty_at < AUTOSAVE_MAX_STALENESS):
+            return
+
+        self.flush(field_state)
+
+    def flush(self, field_state):
+        """
+        条件に関係なくすぐに書き込みを依頼
+
+        Args:
+            field_state: FieldMapState
+        """
+        if self.first_dirty_at is None:
+            return
+
+        reasons = ', '.join(sorted(self.dirty_reasons))
+        if not self.save_writer.submit(capture_snapshot(field_state), self.slot):
+            self.failures += 1
+            return
+
+        print(f"オートセーブ: {reasons}")
+        self.writes += 1
+        self.in_flight = True
+        self.dirty_reasons = set()
+        self.first_dirty_at = None
+        self.last_dirty_at = None
+        self.last_write_at = time.perf_counter()
+
+    def on_complete(self, event):
+        """
+        書き込み完了の通知を受け取る
+
+        Args:
+            event: SAVE_COMPLETE_EVENT
+        """
+        self.in_flight = False
+        self.completed += 1
+        self.latency_total += event.elapsed_ms
+        self.latency_max = max(self.latency_max, event.elapsed_ms)
+        if not event.success:
+            self.failures += 1
+
+    def get_metrics(self):
+        """
+        計測値を取得
+
+        Returns:
+            dict: {'marks', 'writes', 'writes_avoided', 'failures',
+                   'latency_avg_ms', 'latency_max_ms', 'dirty'}
+        """
+        return {
+            'marks': self.marks,
+            'writes': self.writes,
+            'writes_avoided': max(0, self.marks - self.writes),
+            'failures': self.failures,
+            'latency_avg_ms': self.latency_total / self.completed if self.completed else 0.0,
+            'latency_max_ms': self.latency_max,
+            'dirty': self.is_dirty()
+        }
@@ -2,8 +2,91 @@
 JID×QUEST - イベント管理システム
 """
 
+import bisect
 import json
 import os
+from src.systems.event_script import compile_script
+from src.utils.flag_store import (FlagStore, flags_from_dict, get_completed_flag, get_started_flag,
+                                  load_flag_registry)
+
+
+def compile_condition(condition):
+    """
+    条件定義を述語にコンパイル
+
+    Args:
+        condition: {'type': 'flag', 'flag': str, 'value': 値}
+                   {'type': 'level', 'level': int}（以上）
+                   {'type': 'position', 'x': int, 'y': int, 'map': str（省略可）}
+
+    Returns:
+        tuple: (述語(EventManager) -> bool, 依存キー('flag'|'level'|'position', キー))
+    """
+    condition_type = condition.get('type')
+
+    if condition_type == 'flag':
+        flag_id = load_flag_registry().intern(condition['flag'])
+        required_value = condition.get('value', True)
+        return (lambda manager: manager.event_flags.get_by_id(flag_id) == required_value,
+                ('flag', flag_id))
+
+    if condition_type == 'level':
+        required_level = int(condition['level'])
+        return (lambda manager: manager.player_level >= required_level,
+                ('level', required_level))
+
+    if condition_type == 'position':
+        tile = (int(condition['x']), int(condition['y']))
+        map_name = condition.get('map')
+        if map_name is None:
+            return (lambda manager: manager.player_position[1:] == tile, ('position', tile))
+        position = (os.path.basename(map_name),) + tile
+        return (lambda manager: manager.player_position == position, ('position', tile))
+
+    raise ValueError(f"未定義の条件タイプ: {condition_type}")
+
+
+class CompiledEvent:
+    """条件を述語にコンパイルしたイベント"""
+
+    __slots__ = ('event_id', 'started_flag_id', 'completed_flag_id', 'predicates', 'dependencies')
+
+    def __init__(self, event_id, event_data):
+        """
+        Args:
+            event_id: イベントID
+            event_data: story_events.jsonの1件分
+        """
+        self.event_id = event_id
+        registry = load_flag_registry()
+        self.started_flag_id = registry.intern(get_started_flag(event_id))
+        self.completed_flag_id = registry.intern(get_completed_flag(event_id))
+
+        predicates = []
+        dependencies = [('flag', self.completed_flag_id)]
+        for condition in event_data.get('conditions', []):
+            predicate, dependency = compile_condition(condition)
+            predicates.append(predicate)
+            dependencies.append(dependency)
+        self.predicates = tuple(predicates)
+        self.dependencies = tuple(dependencies)
+
+    def check(self, manager):
+        """
+        発動可能かどうか（完了済みでなく、全ての条件を満たす）
+
+        Args:
+            manager: EventManager
+
+        Returns:
+            bool: 発動可能な場合True
+        """
+        if manager.event_flags.get_by_id(self.completed_flag_id):
+            return False
+        for predicate in self.predicates:
+            if not predicate(manager):
+                return False
+        return True
 
 
 class EventManager:
@@ -12,9 +95,25 @@ class EventManager:
     def __init__(self):
         """イベントマネージャーの初期化"""
         self.events = {}  # イベントデータ
-        self.event_flags = {}  # イベントフラグ
+        self.event_flags = FlagStore()  # イベントフラグ（フラグ名は読み込み時に整数IDに固定）
         self.current_event = None  # 現在実行中のイベント
-        self.event_step = 0  # イベントの進行ステップ
+
+        # 条件の判定に使うプレイヤーの状態（FieldMapStateから通知される）
+        self.player_level = 1
+        self.player_position = (None, None, None)  # (マップ名, X, Y)
+
+        # コンパイル済みの条件と逆引き表
+        # 条件に関わる値が変わったときは、その値に依存するイベントだけ評価し直す
+        self.compiled_events = {}
+        self.programs = {}  # イベントID -> ステップをコンパイルした命令列
+        self.flag_index = {}  # フラグID -> イベントIDの集合
+        self.level_index = {}  # レベルのしきい値 -> イベントIDの集合
+        self.level_thresholds = []  # しきい値（昇順）
+        self.position_index = {}  # (X, Y) -> イベントIDの集合
+        self.eligible_events = set()  # 発動可能なイベント
+
+        # フラグ変化時のコールバック（引数: フラグ名）
+        self.flag_callback = None
 
     def load_events(self, event_file='data/events/story_events.json'):
         """
@@ -35,6 +134,8 @@ class EventManager:
             print(f"イベント読み込みエラー: {e}")
             self.events = {}
 
+        self.compile_events()
+
     def set_flag(self, flag_name, value=True):
         """
         イベントフラグを設定
@@ -43,8 +144,25 @@ class EventManager:
             flag_name: フラグ名
             value: フラグの値（デフォルト: True）
         """
-        self.event_flags[flag_name] = value
-        print(f"イベントフラグ設定: {flag_name} = {value}")
+        self.set_flag_by_id(self.event_flags.get_id(flag_name), value)
+
+    def set_flag_by_id(self, flag_id, value=True):
+        """
+        IDでイベントフラグを設定（値が変わったらそのフラグに依存するイベントを評価し直す）
+
+        Args:
+            flag_id: フラグID
+            value: フラグの値（デフォルト: True）
+        """
+        if not self.event_flags.set_by_id(flag_id, value):
+            return
+
+        event_ids = self.flag_index.get(flag_id)
+        if event_ids:
+            self.recheck_events(event_ids)
+
+        if self.flag_callback:
+            self.flag_callback(self.event_flags.registry.names[flag_id])
 
     def get_flag(self, flag_name, default=False):
         """
@@ -61,7 +179,7 @@ class EventManager:
 
     def check_conditions(self, conditions):
         """
-        イベント発生条件をチェック
+        イベント発生条件をチェック（コンパイルしていない条件をその場で評価する）
 
         Args:
             conditions: 条件のリスト
@@ -69,34 +187,15 @@ class EventManager:
         Returns:
             bool: すべての条件を満たす場合True
         """
-        if not conditions:
-            return True
-
-        for condition in conditions:
-            condition_type = condition.get('type')
-
-            if condition_type == 'flag':
-                # フラグ条件
-                flag_name = condition.get('flag')
-                required_value = condition.get('value', True)
-                if self.get_flag(flag_name) != required_value:
-                    return False
-
-            elif condition_type == 'level':
-                # レベル条件（プレイヤーオブジェクトが必要）
-                # ここでは省略、必要に応じて実装
-                pass
-
-            elif condition_type == 'position':
-                # 位置条件
-                # ここでは省略、必要に応じて実装
-                pass
-
+        for condition in conditions or []:
+            predicate, _ = compile_condition(condition)
+            if not predicate(self):
+                return False
         return True
 
     def can_trigger_event(self, event_id):
         """
-        イベントが発動可能かチェック
+        イベントが発動可能かチェック（発動可能なイベントの集合を引くだけ）
 
         Args:
             event_id: イベントID
@@ -104,86 +203,150 @@ class EventManager:
         Returns:
             bool: 発動可能な場合True
         """
-        if event_id not in self.events:
-            return False
-
-        event_data = self.events[event_id]
-
-        # すでに完了しているイベントは発動しない
-        if self.get_flag(f"event_{event_id}_completed"):
-            return False
+        return event_id in self.eligible_events
 
-        # 条件チェック
-        conditions = event_data.get('conditions', [])
-        return self.check_conditions(conditions)
+    def get_eligible_events(self):
+        """
+        発動可能なイベントの集合を取得
 
-    def start_event(self, event_id):
+        Returns:
+            set: イベントIDの集合（読み取り専用として扱うこと）
         """
-        イベントを開始
+        return self.eligible_events
+
+    # ===== 条件のコンパイルと逆引き =====
+
+    def compile_events(self):
+        """読み込んだイベントの条件を述語に、ステップを命令列にコンパイルし、逆引き表を作る"""
+        self.compiled_events = {}
+        self.programs = {}
+        self.flag_index = {}
+        self.level_index = {}
+        self.level_thresholds = []
+        self.position_index = {}
+
+        for event_id, event_data in self.events.items():
+            try:
+                compiled = CompiledEvent(event_id, event_data)
+                self.programs[event_id] = compile_script(event_data.get('steps', []))
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"イベント条件エラー: {event_id}: {e}")
+                continue
+            self.compiled_events[event_id] = compiled
+
+            for kind, key in compiled.dependencies:
+                if kind == 'flag':
+                    self.flag_index.setdefault(key, set()).add(event_id)
+                elif kind == 'level':
+                    self.level_index.setdefault(key, set()).add(event_id)
+                elif kind == 'position':
+                    self.position_index.setdefault(key, set()).add(event_id)
+
+        self.level_thresholds = sorted(self.level_index)
+        self.rebuild_eligible()
+
+    def rebuild_eligible(self):
+        """全イベントを評価し直して発動可能な集合を作り直す（読み込み時・フラグの一括置き換え時）"""
+        self.eligible_events = {event_id for event_id, compiled in self.compiled_events.items()
+                                if compiled.check(self)}
+
+    def recheck_events(self, event_ids):
+        """
+        指定したイベントだけ評価し直す
 
         Args:
-            event_id: イベントID
+            event_ids: イベントIDの集合
+        """
+        for event_id in event_ids:
+            if self.compiled_events[event_id].check(self):
+                self.eligible_events.add(event_id)
+            else:
+                self.eligible_events.discard(event_id)
 
-        Returns:
-            dict: イベントデータ、イベントが存在しない場合None
+    def replace_flags(self, flags):
         """
-        if not self.can_trigger_event(event_id):
-            return None
+        フラグを丸ごと置き換える（ロード・巻き戻し時）
 
-        self.current_event = event_id
-        self.event_step = 0
+        値が変わったフラグだけをXORで求め、それに依存するイベントだけ評価し直す
 
-        event_data = self.events[event_id]
-        print(f"イベント開始: {event_data.get('name', event_id)}")
+        Args:
+            flags: FlagStore.snapshot()の結果
+        """
+        changed = self.event_flags.diff(flags)
+        if not changed:
+            return
+        self.event_flags.restore(flags)
 
-        # イベント開始フラグを設定
-        self.set_flag(f"event_{event_id}_started", True)
+        event_ids = set()
+        for flag_id in changed:
+            event_ids.update(self.flag_index.get(flag_id, ()))
+        self.recheck_events(event_ids)
 
-        return event_data
+        if self.flag_callback:
+            names = self.event_flags.registry.names
+            for flag_id in changed:
+                self.flag_callback(names[flag_id])
 
-    def get_current_step(self):
+    def set_player_level(self, level):
         """
-        現在のイベントステップデータを取得
+        プレイヤーのレベルを通知（しきい値をまたいだイベントだけ評価し直す）
 
-        Returns:
-            dict: ステップデータ、イベントが実行中でない場合None
+        Args:
+            level: 現在のレベル
         """
-        if not self.current_event:
-            return None
+        old_level = self.player_level
+        if level == old_level:
+            return
+        self.player_level = level
 
-        event_data = self.events.get(self.current_event)
-        if not event_data:
-            return None
+        low, high = min(old_level, level), max(old_level, level)
+        start = bisect.bisect_right(self.level_thresholds, low)
+        end = bisect.bisect_right(self.level_thresholds, high)
+        for threshold in self.level_thresholds[start:end]:
+            self.recheck_events(self.level_index[threshold])
 
-        steps = event_data.get('steps', [])
-        if self.event_step >= len(steps):
-            return None
+    def set_player_position(self, map_path, tile_x, tile_y):
+        """
+        プレイヤーの位置を通知（移動前後のタイルに関係するイベントだけ評価し直す）
+
+        Args:
+            map_path: マップのパス
+            tile_x: X座標（タイル単位）
+            tile_y: Y座標（タイル単位）
+        """
+        map_name = os.path.basename(map_path)
+        old_map, old_x, old_y = self.player_position
+        if (map_name, tile_x, tile_y) == (old_map, old_x, old_y):
+            return
+        self.player_position = (map_name, tile_x, tile_y)
 
-        return steps[self.event_step]
+        for key in ((old_x, old_y), (tile_x, tile_y)):
+            event_ids = self.position_index.get(key)
+            if event_ids:
+                self.recheck_events(event_ids)
 
-    def advance_step(self):
+    def start_event(self, event_id):
         """
-        イベントを次のステップに進める
+        イベントを開始
+
+        Args:
+            event_id: イベントID
 
         Returns:
-            bool: 次のステップがある場合True、イベント終了の場合False
+            dict: イベントデータ、イベントが存在しない場合None
         """
-        if not self.current_event:
-            return False
+        if not self.can_trigger_event(event_id):
+            return None
 
-        event_data = self.events.get(self.current_event)
-        if not event_data:
-            return False
+        self.current_event = event_id
 
-        steps = event_data.get('steps', [])
-        self.event_step += 1
+        event_data = self.events[event_id]
+        print(f"イベント開始: {event_data.get('name', event_id)}")
 
-        if self.event_step >= len(steps):
-            # イベント終了
-            self.complete_event()
-            return False
+        # イベント開始フラグを設定（フラグIDはコンパイル時に固定済み）
+        self.set_flag_by_id(self.compiled_events[event_id].started_flag_id, True)
 
-        return True
+        return event_data
 
     def complete_event(self):
         """現在のイベントを完了としてマーク"""
@@ -196,8 +359,8 @@ class EventManager:
         if event_data:
             print(f"イベント完了: {event_data.get('name', event_id)}")
 
-        # 完了フラグを設定
-        self.set_flag(f"event_{event_id}_completed", True)
+        # 完了フラグを設定（フラグIDはコンパイル時に固定済み）
+        self.set_flag_by_id(self.compiled_events[event_id].completed_flag_id, True)
 
         # 報酬フラグを設定
         rewards = event_data.get('rewards', {})
@@ -205,14 +368,12 @@ class EventManager:
             self.set_flag(flag_name, True)
 
         self.current_event = None
-        self.event_step = 0
 
     def cancel_event(self):
         """現在のイベントをキャンセル"""
         if self.current_event:
             print(f"イベントキャンセル: {self.current_event}")
             self.current_event = None
-            self.event_step = 0
 
     def is_event_active(self):
         """
@@ -243,9 +404,8 @@ class EventManager:
             dict: 保存用データ
         """
         return {
-            'flags': self.event_flags.copy(),
-            'current_event': self.current_event,
-            'event_step': self.event_step
+            'flags': self.event_flags.to_dict(),
+            'current_event': self.current_event
         }
 
     def load_state(self, state_data):
@@ -255,6 +415,5 @@ class EventManager:
         Args:
             state_data: 保存データ
         """
-        self.event_flags = state_data.get('flags', {})
+        self.replace_flags(flags_from_dict(state_data.get('flags', {})))
         self.current_event = state_data.get('current_event')
-        self.event_step = state_data.get('event_step', 0)
@@ -0,0 +1,329 @@
+"""
+JID×QUEST - フラグストア
+フラグ名を読み込み時に整数IDに固定し、真偽値はビット集合、それ以外の値は別表に持つ
+"""
+
+import json
+import os
+from config import *
+
+
+# フラグ名を集めるコンテンツ
+FLAG_CONTENT_FILES = ('data/events/story_events.json', 'data/quests/main_quests.json')
+
+
+def get_started_flag(event_id):
+    """イベント開始フラグの名前"""
+    return f"event_{event_id}_started"
+
+
+def get_completed_flag(event_id):
+    """イベント完了フラグの名前"""
+    return f"event_{event_id}_completed"
+
+
+def collect_flag_names(events, quests):
+    """
+    コンテンツに出てくるフラグ名を集める
+
+    Args:
+        events: story_events.jsonの辞書
+        quests: main_quests.jsonの辞書
+
+    Returns:
+        list: フラグ名（出てきた順、重複あり）
+    """
+    names = []
+    for event_id, event_data in events.items():
+        names.append(get_started_flag(event_id))
+        names.append(get_completed_flag(event_id))
+        names.extend(condition['flag'] for condition in event_data.get('conditions', [])
+                     if condition.get('type') == 'flag' and 'flag' in condition)
+        names.extend(step['flag'] for step in event_data.get('steps', [])
+                     if step.get('type') == 'set_flag' and 'flag' in step)
+        names.extend(event_data.get('rewards', {}).get('flags', []))
+    for quest_data in quests.values():
+        names.extend(quest_data.get('required_flags', []))
+        names.extend(quest_data.get('rewards', {}).get('flags', []))
+    return names
+
+
+class FlagRegistry:
+    """フラグ名と整数IDの対応表（IDは登録順に振り、一度振ったら変えない）"""
+
+    def __init__(self):
+        self.ids = {}  # フラグ名 -> ID
+        self.names = []  # ID -> フラグ名
+
+    def __len__(self):
+        return len(self.names)
+
+    def intern(self, name):
+        """
+        フラグ名のIDを取得（未登録なら登録する）
+
+        Args:
+            name: フラグ名
+
+        Returns:
+            int: フラグID
+        """
+        flag_id = self.ids.get(name)
+        if flag_id is None:
+            flag_id = len(self.names)
+            self.ids[name] = flag_id
+            self.names.append(name)
+        return flag_id
+
+
+_flag_registry = None
+
+
+def load_flag_registry(reload=False):
+    """
+    イベント・クエストのフラグ名を登録した対応表を取得（2回目以降はキャッシュを返す）
+
+    Args:
+        reload: Trueの場合はファイルから読み直す（登録済みのIDは変えない）
+
+    Returns:
+        FlagRegistry: フラグの対応表
+    """
+    global _flag_registry
+    if _flag_registry is not None and not reload:
+        return _flag_registry
+
+    if _flag_registry is None:
+        _flag_registry = FlagRegistry()
+
+    content = []
+    for path in FLAG_CONTENT_FILES:
+        try:
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    content.append(json.load(f))
+            else:
+                content.append({})
+        except Exception as e:
+            print(f"フラグ名の読み込みエラー: {path}: {e}")
+            content.append({})
+
+    for name in collect_flag_names(*content):
+        _flag_registry.intern(name)
+    return _flag_registry
+
+
+def iter_bits(mask):
+    """
+    整数のビット集合で立っているビットの番号を小さい順に返す
+
+    Args:
+        mask: ビット集合
+
+    Yields:
+        int: ビット番号
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def diff_flags(snapshot_a, snapshot_b):
+    """
+    2つのフラグのスナップショットで値が違うフラグIDを取得（ビット集合はXOR1回）
+
+    Args:
+        snapshot_a: FlagStore.snapshot()の結果
+        snapshot_b: FlagStore.snapshot()の結果
+
+    Returns:
+        list: フラグID（昇順）
+    """
+    bits_a, values_a = snapshot_a
+    bits_b, values_b = snapshot_b
+    changed = int.from_bytes(bits_a, 'little') ^ int.from_bytes(bits_b, 'little')
+    if values_a or values_b:
+        values_a = dict(values_a)
+        values_b = dict(values_b)
+        for flag_id in values_a.keys() | values_b.keys():
+            if values_a.get(flag_id) != values_b.get(flag_id):
+                changed |= 1 << flag_id
+    return list(iter_bits(changed))
+
+
+def flags_to_dict(snapshot, registry=None):
+    """
+    フラグのスナップショットをセーブ用の{フラグ名: 値}に変換
+
+    Args:
+        snapshot: FlagStore.snapshot()の結果
+        registry: フラグの対応表（省略時は共有の対応表）
+
+    Returns:
+        dict: 立っているフラグと真偽値以外の値を持つフラグ
+    """
+    registry = registry if registry is not None else load_flag_registry()
+    bits, values = snapshot
+    flags = {registry.names[flag_id]: True for flag_id in iter_bits(int.from_bytes(bits, 'little'))}
+    for flag_id, value in values:
+        flags[registry.names[flag_id]] = value
+    return flags
+
+
+def flags_from_dict(flags, registry=None):
+    """
+    セーブの{フラグ名: 値}をフラグのスナップショットに変換（知らないフラグ名は登録する）
+
+    Args:
+        flags: フラグの辞書
+        registry: フラグの対応表（省略時は共有の対応表）
+
+    Returns:
+        tuple: FlagStore.snapshot()の形式
+    """
+    store = FlagStore(registry)
+    for name, value in flags.items():
+        store.set(name, value)
+    return store.snapshot()
+
+
+class FlagStore:
+    """
+    フラグの保存先
+
+    真偽値のフラグはIDの位置のビット（bytearray）で持ち、数値・文字列などの値だけ別表に持つ。
+    スナップショットはbytesのコピー1回（と通常は空の別表）で、比較・差分もビット演算で済む。
+    """
+
+    __slots__ = ('registry', 'bits', 'values')
+
+    def __init__(self, registry=None):
+        """
+        Args:
+            registry: フラグの対応表（省略時は共有の対応表）
+        """
+        self.registry = registry if registry is not None else load_flag_registry()
+        self.bits = bytearray((len(self.registry) + 7) // 8)
+        self.values = {}  # フラグID -> 真偽値以外の値
+
+    def get_id(self, name):
+        """フラグ名のIDを取得（未登録なら登録する）"""
+        return self.registry.intern(name)
+
+    def get_by_id(self, flag_id, default=False):
+        """
+        IDでフラグの値を取得
+
+        Args:
+            flag_id: フラグID
+            default: 立っていない場合の値
+
+        Returns:
+            フラグの値
+        """
+        if flag_id in self.values:
+            return self.values[flag_id]
+        byte_index = flag_id >> 3
+        if byte_index < len(self.bits) and self.bits[byte_index] >> (flag_id & 7) & 1:
+            return True
+        return default
+
+    def get(self, name, default=False):
+        """
+        フラグ名でフラグの値を取得
+
+        Args:
+            name: フラグ名
+            default: 立っていない場合の値
+
+        Returns:
+            フラグの値
+        """
+        flag_id = self.registry.ids.get(name)
+        if flag_id is None:
+            return default
+        return self.get_by_id(flag_id, default)
+
+    def set_by_id(self, flag_id, value=True):
+        """
+        IDでフラグを設定
+
+        Args:
+            flag_id: フラグID
+            value: 値（True/Falseはビット、それ以外は別表に入れる）
+
+        Returns:
+            bool: 値が変わった場合True
+        """
+        old_value = self.get_by_id(flag_id)
+        byte_index = flag_id >> 3
+        if byte_index >= len(self.bits):
+            self.bits.extend(bytes(byte_index + 1 - len(self.bits)))
+
+        mask = 1 << (flag_id & 7)
+        if value is True:
+            self.values.pop(flag_id, None)
+            self.bits[byte_index] |= mask
+        else:
+            self.bits[byte_index] &= ~mask
+            if value is False:
+                self.values.pop(flag_id, None)
+            else:
+                self.values[flag_id] = value
+
+        return old_value != value or type(old_value) is not type(value)
+
+    def set(self, name, value=True):
+        """
+        フラグ名でフラグを設定
+
+        Args:
+            name: フラグ名
+            value: 値
+
+        Returns:
+            bool: 値が変わった場合True
+        """
+        return self.set_by_id(self.registry.intern(name), value)
+
+    def snapshot(self):
+        """
+        現在のフラグをイミュータブルな値で取得
+
+        Returns:
+            tuple: (ビット集合のbytes, ((フラグID, 値), ...))
+        """
+        return (bytes(self.bits), tuple(self.values.items()))
+
+    def restore(self, snapshot):
+        """
+        snapshot()の値に戻す
+
+        Args:
+            snapshot: snapshot()の結果
+        """
+        bits, values = snapshot
+        self.bits = bytearray(bits)
+        self.values = dict(values)
+
+    def diff(self, snapshot):
+        """
+        snapshot()の値と違うフラグのIDを取得
+
+        Args:
+            snapshot: snapshot()の結果
+
+        Returns:
+            list: フラグID（昇順）
+        """
+        return diff_flags(self.snapshot(), snapshot)
+
+    def to_dict(self):
+        """
+        {フラグ名: 値}に変換（セーブ・表示用）
+
+        Returns:
+            dict: 立っているフラグと真偽値以外の値を持つフラグ
+        """
+        return flags_to_dict(self.snapshot(), self.registry)
@@ -0,0 +1,51 @@
+"""
+JID×QUEST - ゲームデータ読み込み
+"""
+
+import json
+from config import *
+
+
+_character_data = None
+
+
+def load_character_data(reload=False):
+    """
+    キャラクターデータを読み込み（2回目以降はキャッシュを返す）
+
+    Args:
+        reload: Trueの場合はファイルから読み直す
+
+    Returns:
+        dict: characters.jsonの内容
+    """
+    global _character_data
+    if _character_data is None or reload:
+        with open(CHARACTERS_DATA, 'r', encoding='utf-8') as f:
+            _character_data = json.load(f)
+    return _character_data
+
+
+def get_enemy_level_data(enemy_type, level, character_data=None):
+    """
+    敵タイプとレベルから最も近いレベルのステータスを取得
+
+    Args:
+        enemy_type: 敵タイプ
+        level: 敵のレベル
+        character_data: キャラクターデータ（省略時はキャッシュを使用）
+
+    Returns:
+        dict: 敵ステータス
+    """
+    if character_data is None:
+        character_data = load_character_data()
+
+    enemies = character_data['enemies'].get(enemy_type, {})
+    levels = enemies.get('levels', {})
+
+    # レベルに最も近いデータを取得
+    available_levels = sorted([int(k) for k in levels.keys()])
+    closest_level = min(available_levels, key=lambda x: abs(x - level))
+
+    return levels[str(closest_level)]
@@ -0,0 +1,104 @@
+"""
+JID×QUEST - マップゾーン
+マップのゾーン（エリアレベル・エンカウント・BGM・ライティング）をタイルごとのゾーン番号にコンパイルする
+"""
+
+from config import *
+from src.battle_system.encounter_table import load_encounter_tables
+
+
+# ゾーンの設定項目と、マップにも書かれていない場合の値
+ZONE_DEFAULTS = {
+    'rate': 0.0,  # 1歩ごとの遭遇率
+    'area_level': 1,  # エリアレベル（出現する敵のレベルの目安）
+    'table': None,  # 出現テーブルID（Noneならエリアレベルから敵を決める）
+    'bgm': None,  # BGMの名前
+    'lighting': None,  # 画面に重ねる色 [R, G, B, 不透明度]
+}
+
+# ゾーン0（どのゾーンにも入っていないタイル）の名前
+BASE_ZONE_NAME = 'base'
+
+
+class MapZone:
+    """マップのゾーン（遭遇率・エリアレベル・出現テーブル・BGM・ライティング）"""
+
+    __slots__ = ('name', 'rate', 'area_level', 'table', 'bgm', 'lighting')
+
+    def __init__(self, name, rate, area_level, table, bgm=None, lighting=None):
+        """
+        Args:
+            name: ゾーン名
+            rate: 1歩ごとの遭遇率
+            area_level: エリアレベル
+            table: EncounterTable（Noneならエリアレベルから敵を決める）
+            bgm: BGMの名前
+            lighting: 画面に重ねる色 (R, G, B, 不透明度)、Noneなら重ねない
+        """
+        self.name = name
+        self.rate = rate
+        self.area_level = area_level
+        self.table = table
+        self.bgm = bgm
+        self.lighting = lighting
+
+
+def create_zone(name, settings):
+    """
+    ゾーンの設定からMapZoneを作る
+
+    Args:
+        name: ゾーン名
+        settings: ZONE_DEFAULTSの項目を全て持つ辞書
+
+    Returns:
+        MapZone: ゾーン
+    """
+    table_id = settings['table']
+    table = load_encounter_tables().get(table_id) if table_id else None
+    if table_id and table is None:
+        print(f"警告: 出現テーブルが見つかりません: {table_id}")
+    lighting = tuple(settings['lighting']) if settings['lighting'] else None
+    return MapZone(name, settings['rate'], settings['area_level'], table, settings['bgm'], lighting)
+
+
+def compile_map_zones(zone_data, width, height):
+    """
+    マップのゾーン定義をタイルごとのゾーン番号にコンパイル
+
+    書かれていない項目はマップ全体の設定（'base'）を引き継ぐ
+
+    Args:
+        zone_data: マップJSONの'zones'
+                   {'base': {...}, 'zones': {名前: {...}}, 'legend': {文字: 名前}, 'grid': [文字列, ...]}
+        width: マップの幅
+        height: マップの高さ
+
+    Returns:
+        tuple: (ゾーンリスト（0番はゾーン外のタイル用のbase）, タイルごとのゾーン番号 bytearray)
+    """
+    zone_data = zone_data or {}
+    base_settings = dict(ZONE_DEFAULTS)
+    base_settings.update(zone_data.get('base', {}))
+
+    zones = [create_zone(BASE_ZONE_NAME, base_settings)]
+    grid = bytearray(width * height)
+
+    zone_numbers = {}
+    for name, zone in zone_data.get('zones', {}).items():
+        if len(zones) > 255:
+            print(f"警告: ゾーンが多すぎます（255個まで）: {name}")
+            break
+        settings = dict(base_settings)
+        settings.update(zone)
+        zone_numbers[name] = len(zones)
+        zones.append(create_zone(name, settings))
+
+    legend = {char: zone_numbers[name]
+              for char, name in zone_data.get('legend', {}).items() if name in zone_numbers}
+
+    for y, row in enumerate(zone_data.get('grid', [])[:height]):
+        for x, char in enumerate(row[:width]):
+            grid[y * width + x] = legend.get(char, 0)
+
+    return zones, grid
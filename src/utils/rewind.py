@@ -0,0 +1,199 @@
+"""
+JID×QUEST - 巻き戻しバッファ
+状態のタプルをキーフレーム＋差分でリングバッファに記録し、任意の時点まで巻き戻す
+"""
+
+import sys
+from collections import deque
+from config import *
+
+
+class RewindBuffer:
+    """
+    巻き戻し用のリングバッファ
+
+    記録する状態は値の並び（タプル）で、各要素はイミュータブルな値にする。
+    一定間隔でキーフレーム（状態そのもの）を置き、それ以外はキーフレームとの差分
+    ((要素番号, 値), ...)だけを持つので、任意の時点をキーフレーム1つ＋差分1つで復元できる。
+    前回と等しい値は前回のオブジェクトを使い回すので、変化のない要素はメモリを食わない。
+    """
+
+    # エントリの種類
+    KEYFRAME = 0
+    DELTA = 1
+
+    def __init__(self, capacity, keyframe_interval=REWIND_KEYFRAME_INTERVAL):
+        """
+        バッファの初期化
+
+        Args:
+            capacity: 記録できる最大ステップ数（これを超えると古いものから上書き）
+            keyframe_interval: キーフレームを置く間隔（ステップ数）
+        """
+        self.capacity = max(1, capacity)
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.entries = [None] * self.capacity
+        self.clear()
+
+    def clear(self):
+        """記録を全て破棄"""
+        for index in range(self.capacity):
+            self.entries[index] = None
+        self.count = 0  # これまでに記録したステップ数（通し番号の次）
+        self.keyframes = deque()  # バッファに残っているキーフレームの通し番号
+        self.keyframe_state = None
+        self.last_state = None
+
+    def record(self, state):
+        """
+        1ステップ分の状態を記録
+
+        Args:
+            state: 状態のタプル（要素数は毎回同じ）
+        """
+        last_state = self.last_state
+        if last_state is not None:
+            # 前回と等しい値は前回のオブジェクトに置き換える（同じ値を何度も保持しない）
+            state = tuple(old if old is new or old == new else new
+                          for old, new in zip(last_state, state))
+
+        # 上書きされるキーフレームを一覧から外す
+        oldest = self.count - self.capacity
+        while self.keyframes and self.keyframes[0] <= oldest:
+            self.keyframes.popleft()
+
+        keyframe_state = self.keyframe_state
+        delta = None
+        if self.keyframes and self.count - self.keyframes[-1] < self.keyframe_interval:
+            delta = tuple((index, value) for index, value in enumerate(state)
+                          if value is not keyframe_state[index])
+            # 差分が大きくなったらキーフレームにする
+            if len(delta) * 2 > len(state):
+                delta = None
+
+        if delta is None:
+            self.entries[self.count % self.capacity] = (self.KEYFRAME, state)
+            self.keyframes.append(self.count)
+            self.keyframe_state = state
+        else:
+            self.entries[self.count % self.capacity] = (self.DELTA, self.keyframes[-1], delta)
+
+        self.last_state = state
+        self.count += 1
+
+    def get_available(self):
+        """
+        さかのぼれるステップ数
+
+        Returns:
+            int: 最新の状態から何ステップ前まで復元できるか
+        """
+        if not self.keyframes:
+            return 0
+        return self.count - 1 - self.keyframes[0]
+
+    def get_state(self, position):
+        """
+        通し番号の時点の状態を復元
+
+        Args:
+            position: 記録の通し番号
+
+        Returns:
+            tuple: 状態、バッファに残っていない場合None
+        """
+        if not self.keyframes or position < self.keyframes[0] or position >= self.count:
+            return None
+
+        entry = self.entries[position % self.capacity]
+        if entry[0] == self.KEYFRAME:
+            return entry[1]
+
+        _, keyframe_position, delta = entry
+        state = list(self.entries[keyframe_position % self.capacity][1])
+        for index, value in delta:
+            state[index] = value
+        return tuple(state)
+
+    def seek(self, steps_back):
+        """
+        最新からさかのぼった時点の状態を取得（記録は変えない）
+
+        Args:
+            steps_back: さかのぼるステップ数
+
+        Returns:
+            tuple: 状態、さかのぼれない場合None
+        """
+        return self.get_state(self.count - 1 - steps_back)
+
+    def rewind(self, steps_back):
+        """
+        さかのぼった時点まで巻き戻し、それより新しい記録を捨てる
+
+        Args:
+            steps_back: さかのぼるステップ数（さかのぼれる分だけに切り詰める）
+
+        Returns:
+            tuple: 巻き戻した時点の状態、記録がない場合None
+        """
+        steps_back = min(steps_back, self.get_available())
+        position = self.count - 1 - steps_back
+        state = self.get_state(position)
+        if state is None:
+            return None
+
+        # 捨てた範囲のキーフレームを外して、続きをその時点から記録する
+        while self.keyframes and self.keyframes[-1] > position:
+            self.keyframes.pop()
+        for discarded in range(position + 1, self.count):
+            self.entries[discarded % self.capacity] = None
+        self.count = position + 1
+        self.keyframe_state = self.entries[self.keyframes[-1] % self.capacity][1]
+        self.last_state = state
+        return state
+
+    def get_memory_usage(self):
+        """
+        バッファが使っているメモリ量を概算（共有している値は1回だけ数える）
+
+        Returns:
+            dict: {'bytes': int, 'steps': int, 'keyframes': int, 'bytes_per_step': float}
+        """
+        seen = set()
+        total = sys.getsizeof(self.entries)
+
+        def measure(value):
+            nonlocal total
+            if id(value) in seen:
+                return
+            seen.add(id(value))
+            total += sys.getsizeof(value)
+            if isinstance(value, tuple):
+                for item in value:
+                    measure(item)
+
+        steps = 0
+        for entry in self.entries:
+            if entry is not None:
+                measure(entry)
+                steps += 1
+
+        return {
+            'bytes': total,
+            'steps': steps,
+            'keyframes': len(self.keyframes),
+            'bytes_per_step': total / steps if steps else 0.0
+        }
+
+    def report(self, label):
+        """
+        メモリ使用量を表示
+
+        Args:
+            label: 表示名
+        """
+        usage = self.get_memory_usage()
+        print(f"巻き戻しバッファ({label}): {usage['steps']}ステップ "
+              f"キーフレーム{usage['keyframes']}個 {usage['bytes'] / 1024:.1f}KB "
+              f"({usage['bytes_per_step']:.0f}バイト/ステップ)")
@@ -0,0 +1,255 @@
+"""
+JID×QUEST - セーブデータ形式
+バイナリセーブ（ヘッダ・スキーマバージョン・セクション表・CRC・zlib圧縮）の読み書きと、旧形式からの移行
+"""
+
+import json
+import struct
+import zlib
+from config import *
+
+
+# ===== バイナリ形式 =====
+# [ヘッダ] マジック, 形式バージョン, スキーマバージョン, フラグ, セクション数
+# [セクション表] (名前, 開始位置, 長さ, CRC32) × セクション数
+# [ヘッダCRC] ヘッダとセクション表のCRC32
+# [セクション本体] コンパクトなJSON（フラグが立っていればzlib圧縮）
+SAVE_MAGIC = b'JIDQ'
+FORMAT_VERSION = 1
+HEADER_STRUCT = struct.Struct('<4sHHHH')
+SECTION_NAME_SIZE = 16
+SECTION_STRUCT = struct.Struct(f'<{SECTION_NAME_SIZE}sIII')
+CRC_STRUCT = struct.Struct('<I')
+
+# ヘッダのフラグ
+FLAG_COMPRESSED = 0x0001
+
+# 現在のスキーマバージョン（セーブ辞書の'version'は'2.0'のような文字列）
+SAVE_SCHEMA_VERSION = 4
+
+
+class SaveFormatError(ValueError):
+    """セーブファイルが壊れている・対応していない形式"""
+
+
+def is_binary_save(data):
+    """
+    バイナリセーブかどうか
+
+    Args:
+        data: ファイルの中身（バイト列）
+
+    Returns:
+        bool: 先頭がマジックならTrue
+    """
+    return data[:len(SAVE_MAGIC)] == SAVE_MAGIC
+
+
+def get_schema_version(save_data):
+    """
+    セーブ辞書のスキーマバージョンを取得
+
+    Args:
+        save_data: セーブデータ
+
+    Returns:
+        int: スキーマバージョン（'version'がない最初期のセーブは1）
+    """
+    try:
+        return int(float(save_data.get('version', '1.0')))
+    except (TypeError, ValueError):
+        raise SaveFormatError(f"不正なバージョン: {save_data.get('version')}")
+
+
+def encode_save(save_data, compress=SAVE_COMPRESS):
+    """
+    セーブ辞書をバイナリに変換
+
+    'version'以外のトップレベルのキーをそれぞれ1セクションにする
+
+    Args:
+        save_data: セーブデータ（GameSnapshot.to_dict()の形式）
+        compress: Trueなら各セクションをzlib圧縮
+
+    Returns:
+        bytes: バイナリセーブ
+    """
+    schema_version = get_schema_version(save_data)
+    flags = FLAG_COMPRESSED if compress else 0
+
+    names = []
+    payloads = []
+    for name, value in save_data.items():
+        if name == 'version':
+            continue
+        encoded_name = name.encode('ascii')
+        if len(encoded_name) > SECTION_NAME_SIZE:
+            raise SaveFormatError(f"セクション名が長すぎます: {name}")
+        payload = json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        if compress:
+            payload = zlib.compress(payload, 6)
+        names.append(encoded_name)
+        payloads.append(payload)
+
+    # セクション本体はヘッダ・セクション表・ヘッダCRCの直後から並べる
+    offset = HEADER_STRUCT.size + SECTION_STRUCT.size * len(payloads) + CRC_STRUCT.size
+    header = bytearray(HEADER_STRUCT.pack(SAVE_MAGIC, FORMAT_VERSION, schema_version,
+                                          flags, len(payloads)))
+    for name, payload in zip(names, payloads):
+        header += SECTION_STRUCT.pack(name, offset, len(payload), zlib.crc32(payload))
+        offset += len(payload)
+    header += CRC_STRUCT.pack(zlib.crc32(header))
+
+    return bytes(header) + b''.join(payloads)
+
+
+def read_header(data):
+    """
+    ヘッダとセクション表を読み込んで検証
+
+    Args:
+        data: バイナリセーブ
+
+    Returns:
+        dict: {'schema_version': int, 'flags': int,
+               'sections': {名前: (開始位置, 長さ, CRC32)}}
+    """
+    if len(data) < HEADER_STRUCT.size + CRC_STRUCT.size:
+        raise SaveFormatError("ファイルが短すぎます")
+
+    magic, format_version, schema_version, flags, count = HEADER_STRUCT.unpack_from(data, 0)
+    if magic != SAVE_MAGIC:
+        raise SaveFormatError("セーブファイルではありません")
+    if format_version > FORMAT_VERSION:
+        raise SaveFormatError(f"新しすぎる形式です: {format_version}")
+
+    table_end = HEADER_STRUCT.size + SECTION_STRUCT.size * count
+    if len(data) < table_end + CRC_STRUCT.size:
+        raise SaveFormatError("セクション表が途中で切れています")
+    (header_crc,) = CRC_STRUCT.unpack_from(data, table_end)
+    if zlib.crc32(data[:table_end]) != header_crc:
+        raise SaveFormatError("ヘッダのチェックサムが一致しません")
+
+    sections = {}
+    for index in range(count):
+        name, offset, length, crc = SECTION_STRUCT.unpack_from(
+            data, HEADER_STRUCT.size + SECTION_STRUCT.size * index)
+        if offset + length > len(data):
+            raise SaveFormatError("セクションが途中で切れています")
+        sections[name.rstrip(b'\0').decode('ascii')] = (offset, length, crc)
+
+    return {'schema_version': schema_version, 'flags': flags, 'sections': sections}
+
+
+def decode_save(data, sections=None):
+    """
+    バイナリセーブを辞書に変換
+
+    Args:
+        data: バイナリセーブ
+        sections: 読み込むセクション名（省略時は全て）。一部だけならその分しか展開しない
+
+    Returns:
+        dict: セーブデータ（'version'はヘッダのスキーマバージョン）
+    """
+    header = read_header(data)
+    compressed = header['flags'] & FLAG_COMPRESSED
+    view = memoryview(data)
+
+    save_data = {'version': f"{header['schema_version']}.0"}
+    for name, (offset, length, crc) in header['sections'].items():
+        if sections is not None and name not in sections:
+            continue
+        payload = view[offset:offset + length]
+        if zlib.crc32(payload) != crc:
+            raise SaveFormatError(f"セクションのチェックサムが一致しません: {name}")
+        if compressed:
+            payload = zlib.decompress(payload)
+        save_data[name] = json.loads(bytes(payload).decode('utf-8'))
+
+    return save_data
+
+
+# ===== スキーマの移行 =====
+# 移行関数は1つ前のバージョンの辞書を受け取り、次のバージョンの辞書を返す
+
+def migrate_v1_to_v2(save_data):
+    """
+    1.0 → 2.0: スキル・イベント・クエスト・乱数を追加
+
+    1.0は所持品を保存していなかったので、inventoryはNone（復元しない）にする
+    """
+    save_data.setdefault('skills', [])
+    save_data['inventory'] = None
+    save_data.setdefault('event', {
+        'current_event': None,
+        'event_step': 0,
+        'initial_event_triggered': True
+    })
+    save_data.setdefault('quests', {
+        'active_quests': [],
+        'completed_quests': [],
+        'quest_progress': {}
+    })
+    save_data.setdefault('rng', None)
+    return save_data
+
+
+def migrate_v2_to_v3(save_data):
+    """
+    2.0 → 3.0: 実行中のイベントスクリプトの状態を追加
+
+    2.0は実行中のイベントとステップ番号だけを持っていたので、カットシーン1本として再開する
+    """
+    event_data = save_data.setdefault('event', {})
+    current_event = event_data.get('current_event')
+    event_step = event_data.pop('event_step', 0)  # 3.0以降は保存しない
+    if current_event:
+        event_data['scripts'] = [[current_event, event_step, 0, True]]
+    else:
+        event_data['scripts'] = []
+    return save_data
+
+
+def migrate_v3_to_v4(save_data):
+    """
+    3.0 → 4.0: マップごとの探索記録を追加
+
+    3.0には探索記録がないので、どのマップもまだ見ていないことにする
+    """
+    save_data.setdefault('exploration', {})
+    return save_data
+
+
+# 移行元のスキーマバージョン -> 移行関数
+MIGRATIONS = {
+    1: migrate_v1_to_v2,
+    2: migrate_v2_to_v3,
+    3: migrate_v3_to_v4,
+}
+
+
+def migrate_save(save_data):
+    """
+    セーブデータを現在のスキーマまで順に移行
+
+    Args:
+        save_data: セーブデータ（任意の旧バージョン）
+
+    Returns:
+        dict: 現在のスキーマのセーブデータ
+    """
+    version = get_schema_version(save_data)
+    if version > SAVE_SCHEMA_VERSION:
+        raise SaveFormatError(f"新しすぎるセーブデータです: {save_data.get('version')}")
+
+    while version < SAVE_SCHEMA_VERSION:
+        migration = MIGRATIONS.get(version)
+        if migration is None:
+            raise SaveFormatError(f"移行できないバージョンです: {version}")
+        save_data = migration(save_data)
+        version += 1
+        save_data['version'] = f"{version}.0"
+        print(f"セーブデータを移行: {version - 1}.0 → {version}.0")
+
+    return save_data
@@ -4,7 +4,88 @@ JID×QUEST - セーブ/ロードシステム
 
 import json
 import os
+import re
+import threading
 from datetime import datetime
+from config import *
+from src.utils.save_format import decode_save, encode_save, is_binary_save, migrate_save
+
+
+# セーブ形式 -> 拡張子
+SAVE_EXTENSIONS = {
+    'binary': '.sav',
+    'json': '.json',
+}
+
+# スロット一覧のインデックスファイル（各スロットの表示用情報だけを持つ）
+SAVE_INDEX_FILE = 'index.json'
+SAVE_INDEX_VERSION = 1
+
+# セーブファイル名（save_<スロット>.sav / .json）
+SAVE_FILE_PATTERN = re.compile(r'^save_(\w+)\.(sav|json)$')
+
+
+def atomic_write(path, data):
+    """
+    ファイルを原子的に書き込む（一時ファイルに書いてfsyncしてから置き換える）
+
+    書き込み途中で落ちても、元のファイルか新しいファイルのどちらかが必ず残る
+
+    Args:
+        path: 書き込み先のパス
+        data: 書き込むバイト列
+    """
+    temp_path = f"{path}.tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    # リネーム自体をディスクに反映（ディレクトリをfsyncできる環境のみ）
+    if hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(os.path.dirname(path) or '.', os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def serialize_save(save_data, save_format):
+    """
+    セーブ辞書をファイルの中身に変換
+
+    Args:
+        save_data: セーブデータ
+        save_format: 'binary' or 'json'
+
+    Returns:
+        bytes: ファイルの中身
+    """
+    if save_format == 'binary':
+        return encode_save(save_data)
+    return json.dumps(save_data, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def deserialize_save(data, sections=None):
+    """
+    ファイルの中身をセーブ辞書に変換（形式は先頭のマジックで判定）
+
+    Args:
+        data: ファイルの中身
+        sections: バイナリの場合に展開するセクション名（省略時は全て）
+
+    Returns:
+        dict: セーブデータ（移行前）
+    """
+    if is_binary_save(data):
+        return decode_save(data, sections)
+    return json.loads(data.decode('utf-8'))
 
 
 class SaveLoadManager:
@@ -23,48 +104,65 @@ class SaveLoadManager:
         if not os.path.exists(save_dir):
             os.makedirs(save_dir)
 
-    def save_game(self, player, map_path, slot=1):
+        # スロット一覧のインデックス（初回参照時に読み込む）
+        # セーブはSaveWriterのワーカースレッドから行われるのでロックで守る
+        self.index = None
+        self.index_lock = threading.Lock()
+
+    def get_save_path(self, slot, extension=None):
         """
-        ゲームをセーブ
+        セーブファイルのパスを取得
 
         Args:
-            player: プレイヤーオブジェクト
-            map_path: 現在のマップパス
+            slot: セーブスロット番号
+            extension: 拡張子（省略時は設定の形式）
+
+        Returns:
+            str: セーブファイルのパス
+        """
+        if extension is None:
+            extension = SAVE_EXTENSIONS[SAVE_FORMAT]
+        return os.path.join(self.save_dir, f'save_{slot}{extension}')
+
+    def find_save_path(self, slot):
+        """
+        存在するセーブファイルのパスを取得（バイナリ優先、なければ旧形式のJSON）
+
+        Args:
+            slot: セーブスロット番号
+
+        Returns:
+            str: セーブファイルのパス、存在しない場合None
+        """
+        for extension in (SAVE_EXTENSIONS['binary'], SAVE_EXTENSIONS['json']):
+            save_path = self.get_save_path(slot, extension)
+            if os.path.exists(save_path):
+                return save_path
+        return None
+
+    def save_game(self, snapshot, slot=1):
+        """
+        ゲームをセーブ（SaveWriterのワーカースレッドから呼ばれる）
+
+        Args:
+            snapshot: GameSnapshot（capture_snapshot()で取得したもの）
             slot: セーブスロット番号 (1-3)
 
         Returns:
             bool: セーブ成功時True
         """
         try:
-            save_data = {
-                'version': '1.0',
-                'timestamp': datetime.now().isoformat(),
-                'player': {
-                    'name': player.name,
-                    'level': player.level,
-                    'exp': player.exp,
-                    'hp': player.hp,
-                    'max_hp': player.max_hp,
-                    'mp': player.mp,
-                    'max_mp': player.max_mp,
-                    'atk': player.atk,
-                    'defense': player.defense,
-                    'spd': player.spd,
-                    'tile_x': player.tile_x,
-                    'tile_y': player.tile_y,
-                    'direction': player.direction
-                },
-                'map': {
-                    'path': map_path
-                },
-                'flags': {},  # 今後のイベントフラグ用
-                'inventory': []  # 今後のアイテム用
-            }
-
-            save_path = os.path.join(self.save_dir, f'save_{slot}.json')
-
-            with open(save_path, 'w', encoding='utf-8') as f:
-                json.dump(save_data, f, ensure_ascii=False, indent=2)
+            save_data = snapshot.to_dict()
+            save_path = self.get_save_path(slot)
+            atomic_write(save_path, serialize_save(save_data, SAVE_FORMAT))
+
+            # 形式を切り替えた場合は古い形式のファイルを消す（ロード時にどちらを読むか迷わない）
+            for extension in SAVE_EXTENSIONS.values():
+                other_path = self.get_save_path(slot, extension)
+                if other_path != save_path and os.path.exists(other_path):
+                    os.remove(other_path)
+
+            self.update_index(slot, save_data, save_path)
 
             print(f"セーブ完了: スロット{slot}")
             return True
@@ -75,7 +173,7 @@ class SaveLoadManager:
 
     def load_game(self, slot=1):
         """
-        ゲームをロード
+        ゲームをロード（旧バージョンのセーブは現在のスキーマに移行する）
 
         Args:
             slot: セーブスロット番号 (1-3)
@@ -84,14 +182,14 @@ class SaveLoadManager:
             dict: セーブデータ、失敗時はNone
         """
         try:
-            save_path = os.path.join(self.save_dir, f'save_{slot}.json')
+            save_path = self.find_save_path(slot)
 
-            if not os.path.exists(save_path):
+            if save_path is None:
                 print(f"セーブデータが見つかりません: スロット{slot}")
                 return None
 
-            with open(save_path, 'r', encoding='utf-8') as f:
-                save_data = json.load(f)
+            with open(save_path, 'rb') as f:
+                save_data = migrate_save(deserialize_save(f.read()))
 
             print(f"ロード完了: スロット{slot}")
             return save_data
@@ -102,7 +200,7 @@ class SaveLoadManager:
 
     def get_save_info(self, slot=1):
         """
-        セーブスロットの情報を取得
+        セーブスロットの情報を取得（インデックスから読むのでセーブファイルは開かない）
 
         Args:
             slot: セーブスロット番号 (1-3)
@@ -111,30 +209,166 @@ class SaveLoadManager:
             dict: セーブ情報、データがない場合はNone
         """
         try:
-            save_path = os.path.join(self.save_dir, f'save_{slot}.json')
+            with self.index_lock:
+                entry = self.get_index().get(str(slot))
 
-            if not os.path.exists(save_path):
+            if entry is None:
                 return None
 
-            with open(save_path, 'r', encoding='utf-8') as f:
-                save_data = json.load(f)
-
-            # 表示用の情報を返す
-            player_data = save_data['player']
-            timestamp = datetime.fromisoformat(save_data['timestamp'])
-
-            return {
-                'slot': slot,
-                'name': player_data['name'],
-                'level': player_data['level'],
-                'timestamp': timestamp.strftime('%Y/%m/%d %H:%M'),
-                'exists': True
-            }
+            return self.format_save_info(entry)
 
         except Exception as e:
             print(f"セーブ情報取得エラー: {e}")
             return None
 
+    def list_saves(self):
+        """
+        全スロットの情報を取得（ロード画面用）
+
+        Returns:
+            list: get_save_info()と同じ形式の辞書のリスト（新しい順）
+        """
+        with self.index_lock:
+            entries = list(self.get_index().values())
+        entries.sort(key=lambda entry: entry['timestamp'], reverse=True)
+        return [self.format_save_info(entry) for entry in entries]
+
+    def format_save_info(self, entry):
+        """
+        インデックスの1件を表示用の情報に変換
+
+        Args:
+            entry: インデックスのエントリ
+
+        Returns:
+            dict: セーブ情報
+        """
+        timestamp = datetime.fromisoformat(entry['timestamp'])
+        return {
+            'slot': entry['slot'],
+            'name': entry['name'],
+            'level': entry['level'],
+            'map': entry['map'],
+            'timestamp': timestamp.strftime('%Y/%m/%d %H:%M'),
+            'exists': True
+        }
+
+    # ===== スロットインデックス =====
+
+    def get_index_path(self):
+        """インデックスファイルのパス"""
+        return os.path.join(self.save_dir, SAVE_INDEX_FILE)
+
+    def get_index(self):
+        """
+        インデックスを取得（未読込ならファイルから読み、なければセーブファイルから作り直す）
+
+        index_lockを取った状態で呼ぶこと
+
+        Returns:
+            dict: スロット（文字列） -> エントリ
+        """
+        if self.index is not None:
+            return self.index
+
+        try:
+            with open(self.get_index_path(), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != SAVE_INDEX_VERSION:
+                raise ValueError(f"インデックスのバージョンが違います: {data.get('version')}")
+            self.index = data['slots']
+        except FileNotFoundError:
+            self.rebuild_index()
+        except Exception as e:
+            print(f"セーブインデックス読み込みエラー: {e}")
+            self.rebuild_index()
+
+        return self.index
+
+    def make_index_entry(self, slot, save_data, save_path):
+        """
+        セーブデータからインデックスのエントリを作成
+
+        Args:
+            slot: セーブスロット番号
+            save_data: セーブデータ（player・timestamp・mapがあればよい）
+            save_path: セーブファイルのパス
+
+        Returns:
+            dict: エントリ
+        """
+        player_data = save_data['player']
+        return {
+            'slot': slot,
+            'name': player_data['name'],
+            'level': player_data['level'],
+            'timestamp': save_data['timestamp'],
+            'map': save_data['map']['path'],
+            'file': os.path.basename(save_path)
+        }
+
+    def update_index(self, slot, save_data, save_path):
+        """
+        セーブしたスロットのエントリを更新してインデックスを書き出す
+
+        Args:
+            slot: セーブスロット番号
+            save_data: セーブデータ
+            save_path: セーブファイルのパス
+        """
+        with self.index_lock:
+            index = self.get_index()
+            index[str(slot)] = self.make_index_entry(slot, save_data, save_path)
+            self.write_index()
+
+    def remove_from_index(self, slot):
+        """
+        スロットのエントリを削除してインデックスを書き出す
+
+        Args:
+            slot: セーブスロット番号
+        """
+        with self.index_lock:
+            index = self.get_index()
+            if index.pop(str(slot), None) is not None:
+                self.write_index()
+
+    def write_index(self):
+        """インデックスを原子的に書き出す（index_lockを取った状態で呼ぶこと）"""
+        data = {'version': SAVE_INDEX_VERSION, 'slots': self.index}
+        atomic_write(self.get_index_path(),
+                     json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+    def rebuild_index(self):
+        """
+        セーブファイルを走査してインデックスを作り直す（index_lockを取った状態で呼ぶこと）
+
+        バイナリセーブはプレイヤー・日時・マップのセクションだけ展開する
+        """
+        self.index = {}
+        for file_name in sorted(os.listdir(self.save_dir)):
+            match = SAVE_FILE_PATTERN.match(file_name)
+            if not match:
+                continue
+            slot = match.group(1)
+            slot = int(slot) if slot.isdigit() else slot
+            save_path = self.find_save_path(slot)
+            if save_path != os.path.join(self.save_dir, file_name):
+                continue  # 同じスロットにバイナリとJSONがある場合はバイナリだけ使う
+
+            try:
+                with open(save_path, 'rb') as f:
+                    save_data = deserialize_save(f.read(), sections=('player', 'timestamp', 'map'))
+                self.index[str(slot)] = self.make_index_entry(slot, save_data, save_path)
+            except Exception as e:
+                print(f"セーブインデックス作成エラー: {file_name}: {e}")
+
+        print(f"セーブインデックスを作成: {len(self.index)}件")
+        try:
+            self.write_index()
+        except OSError as e:
+            print(f"セーブインデックス書き込みエラー: {e}")
+
     def delete_save(self, slot=1):
         """
         セーブデータを削除
@@ -146,14 +380,17 @@ class SaveLoadManager:
             bool: 削除成功時True
         """
         try:
-            save_path = os.path.join(self.save_dir, f'save_{slot}.json')
-
-            if os.path.exists(save_path):
-                os.remove(save_path)
+            deleted = False
+            for extension in SAVE_EXTENSIONS.values():
+                save_path = self.get_save_path(slot, extension)
+                if os.path.exists(save_path):
+                    os.remove(save_path)
+                    deleted = True
+
+            if deleted:
+                self.remove_from_index(slot)
                 print(f"セーブデータ削除: スロット{slot}")
-                return True
-
-            return False
+            return deleted
 
         except Exception as e:
             print(f"削除エラー: {e}")
@@ -0,0 +1,99 @@
+"""
+JID×QUEST - バックグラウンドセーブ
+スナップショットの書き出しをワーカースレッドで行い、完了をpygameのイベントで通知する
+"""
+
+import queue
+import threading
+import time
+import pygame
+from config import *
+
+
+# セーブ完了イベント（属性: slot, success, elapsed_ms）
+SAVE_COMPLETE_EVENT = pygame.USEREVENT + 1
+
+
+class SaveWriter:
+    """
+    セーブの書き出し担当
+
+    メインスレッドはsubmit()でスナップショットを渡すだけで、
+    辞書への変換・シリアライズ・ディスクへの書き込みはワーカースレッドが行う。
+    スナップショットはタプルとコピーだけでできているので、渡した後にゲームが進んでも内容は変わらない。
+    """
+
+    def __init__(self, save_manager):
+        """
+        ワーカースレッドを起動
+
+        Args:
+            save_manager: SaveLoadManager（ワーカースレッドからsave_gameを呼ぶ）
+        """
+        self.save_manager = save_manager
+        self.requests = queue.Queue()
+        self.pending = 0  # 書き込み待ち・書き込み中の件数（メインスレッドからのみ更新）
+        self.thread = threading.Thread(target=self.run, name='SaveWriter', daemon=True)
+        self.thread.start()
+
+    def submit(self, snapshot, slot):
+        """
+        セーブを依頼（すぐに戻る）
+
+        Args:
+            snapshot: GameSnapshot
+            slot: セーブスロット番号
+
+        Returns:
+            bool: 依頼を受け付けた場合True
+        """
+        if not self.thread.is_alive():
+            print("セーブエラー: 書き込みスレッドが停止しています")
+            return False
+        self.pending += 1
+        self.requests.put((snapshot, slot))
+        return True
+
+    def on_complete(self, event):
+        """
+        セーブ完了イベントを受け取ったときの処理（メインスレッド）
+
+        Args:
+            event: SAVE_COMPLETE_EVENT
+        """
+        self.pending = max(0, self.pending - 1)
+        print(f"セーブ書き込み: スロット{event.slot} {event.elapsed_ms:.1f}ms")
+
+    def is_busy(self):
+        """書き込み待ちのセーブがあるか"""
+        return self.pending > 0
+
+    def run(self):
+        """ワーカースレッドの本体"""
+        while True:
+            request = self.requests.get()
+            if request is None:
+                self.requests.task_done()
+                break
+
+            snapshot, slot = request
+            start = time.perf_counter()
+            try:
+                success = self.save_manager.save_game(snapshot, slot)
+            except Exception as e:
+                print(f"セーブエラー: {e}")
+                success = False
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            try:
+                pygame.event.post(pygame.event.Event(
+                    SAVE_COMPLETE_EVENT, slot=slot, success=success, elapsed_ms=elapsed_ms))
+            except pygame.error:
+                pass  # 終了処理中などでイベントキューが使えない
+            self.requests.task_done()
+
+    def close(self):
+        """書き込み待ちのセーブを全て書き終えてからスレッドを止める（終了時）"""
+        if self.thread.is_alive():
+            self.requests.put(None)
+            self.thread.join()
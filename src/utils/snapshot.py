@@ -0,0 +1,348 @@
+"""
+JID×QUEST - ゲーム状態スナップショット
+実行中の状態（プレイヤー・所持品・フラグ・イベント・クエスト・マップ・探索記録・乱数）をメモリ上に丸ごと保存・復元する
+"""
+
+import random
+import time
+from datetime import datetime
+from config import *
+from src.battle_system.effects import get_skill
+from src.systems.exploration import pack_exploration, unpack_exploration
+from src.utils.flag_store import flags_from_dict, flags_to_dict
+from src.utils.save_format import SAVE_SCHEMA_VERSION
+
+
+# セーブデータの形式バージョン
+SAVE_VERSION = f'{SAVE_SCHEMA_VERSION}.0'
+
+# スナップショットに含めるプレイヤーの属性（この順でタプルに詰める）
+PLAYER_FIELDS = (
+    'name', 'player_class', 'level', 'exp', 'next_level_exp',
+    'hp', 'max_hp', 'mp', 'max_mp', 'atk', 'defense', 'spd',
+    'tile_x', 'tile_y', 'direction'
+)
+
+
+class GameSnapshot:
+    """
+    ゲーム状態のスナップショット
+
+    中身はタプルと浅いコピーだけで構成し、取得・復元ともにメモリコピーで済ませる。
+    ディスクへの書き出しはto_dict()で別途行う。
+    """
+
+    __slots__ = ('timestamp', 'map_path', 'player', 'skills', 'inventory', 'flags',
+                 'current_event', 'scripts', 'quests', 'exploration', 'rng_state', 'initial_event_triggered')
+
+    def __init__(self):
+        self.timestamp = 0.0
+        self.map_path = ''
+        self.player = ()  # PLAYER_FIELDSの順の値
+        self.skills = ()  # スキル名
+        self.inventory = ()  # ((アイテム名, 個数), ...)、Noneなら復元しない
+        self.flags = (b'', ())  # FlagStore.snapshot()
+        self.current_event = None  # 実行中のイベントID
+        self.scripts = ()  # ScriptVM.get_state()
+        self.quests = ((), (), ())  # (進行中, 完了, 進捗)
+        self.exploration = ()  # ExplorationTracker.get_state()
+        self.rng_state = None
+        self.initial_event_triggered = False
+
+    def to_dict(self):
+        """
+        セーブファイル用の辞書に変換
+
+        Returns:
+            dict: JSONに書き出せる辞書
+        """
+        player = dict(zip(PLAYER_FIELDS, self.player))
+        active_quests, completed_quests, progress = self.quests
+        rng = None
+        if self.rng_state is not None:
+            version, internal_state, gauss_next = self.rng_state
+            rng = [version, list(internal_state), gauss_next]
+
+        return {
+            'version': SAVE_VERSION,
+            'timestamp': datetime.fromtimestamp(self.timestamp).isoformat(),
+            'player': player,
+            'skills': list(self.skills),
+            'map': {
+                'path': self.map_path
+            },
+            'flags': flags_to_dict(self.flags),
+            'inventory': [{'name': name, 'count': count} for name, count in self.inventory or ()],
+            'event': {
+                'current_event': self.current_event,
+                'scripts': [list(script) for script in self.scripts],
+                'initial_event_triggered': self.initial_event_triggered
+            },
+            'quests': {
+                'active_quests': list(active_quests),
+                'completed_quests': list(completed_quests),
+                'quest_progress': unpack_quest_progress(progress)
+            },
+            'exploration': pack_exploration(self.exploration),
+            'rng': rng
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        セーブファイルの辞書から復元
+
+        Args:
+            data: セーブデータ（migrate_save()で現在のスキーマに移行済みのもの）
+
+        Returns:
+            GameSnapshot: スナップショット
+        """
+        snapshot = cls()
+        try:
+            snapshot.timestamp = datetime.fromisoformat(data['timestamp']).timestamp()
+        except (KeyError, ValueError):
+            snapshot.timestamp = time.time()
+
+        snapshot.map_path = data['map']['path']
+
+        # セーブにない属性はNoneにして復元時に読み飛ばす
+        player_data = data['player']
+        snapshot.player = tuple(player_data.get(field) for field in PLAYER_FIELDS)
+        snapshot.skills = tuple(data.get('skills', ()))
+        inventory = data.get('inventory', [])
+        if inventory is not None:
+            snapshot.inventory = tuple((item['name'], item['count']) for item in inventory)
+        else:
+            snapshot.inventory = None  # 所持品を保存していない旧形式から移行したデータ
+        snapshot.flags = flags_from_dict(data.get('flags', {}))
+
+        event_data = data.get('event', {})
+        snapshot.current_event = event_data.get('current_event')
+        snapshot.scripts = tuple(tuple(script) for script in event_data.get('scripts', ()))
+        snapshot.initial_event_triggered = event_data.get('initial_event_triggered', True)
+
+        quest_data = data.get('quests', {})
+        snapshot.quests = (
+            tuple(quest_data.get('active_quests', ())),
+            tuple(quest_data.get('completed_quests', ())),
+            pack_quest_progress(quest_data.get('quest_progress', {}))
+        )
+        snapshot.exploration = unpack_exploration(data.get('exploration', {}))
+
+        rng = data.get('rng')
+        if rng:
+            snapshot.rng_state = (rng[0], tuple(rng[1]), rng[2])
+        return snapshot
+
+
+def pack_quest_progress(quest_progress):
+    """
+    クエスト進捗をタプルに詰める
+
+    Args:
+        quest_progress: QuestSystem.quest_progress
+
+    Returns:
+        tuple: ((クエストID, 完了, ((目標ID, 現在値, 目標値, 完了), ...)), ...)
+    """
+    return tuple(
+        (quest_id, progress.get('completed', False),
+         tuple((objective_id, objective['current'], objective['target'], objective['completed'])
+               for objective_id, objective in progress.get('objectives', {}).items()))
+        for quest_id, progress in quest_progress.items()
+    )
+
+
+def unpack_quest_progress(packed):
+    """
+    タプルに詰めたクエスト進捗を辞書に戻す
+
+    Args:
+        packed: pack_quest_progress()の結果
+
+    Returns:
+        dict: QuestSystem.quest_progressの形式
+    """
+    return {
+        quest_id: {
+            'objectives': {
+                objective_id: {'current': current, 'target': target, 'completed': done}
+                for objective_id, current, target, done in objectives
+            },
+            'started': True,
+            'completed': completed
+        }
+        for quest_id, completed, objectives in packed
+    }
+
+
+def capture_snapshot(field_state):
+    """
+    フィールドの状態からスナップショットを取得
+
+    Args:
+        field_state: FieldMapState
+
+    Returns:
+        GameSnapshot: スナップショット
+    """
+    player = field_state.player
+    event_manager = field_state.event_manager
+    quest_system = field_state.quest_system
+
+    snapshot = GameSnapshot()
+    snapshot.timestamp = time.time()
+    snapshot.map_path = field_state.map_path
+    snapshot.player = tuple(getattr(player, field) for field in PLAYER_FIELDS)
+    snapshot.skills = tuple(skill.name for skill in player.skills)
+    snapshot.inventory = tuple((item['name'], item['count']) for item in player.items)
+    snapshot.flags = event_manager.event_flags.snapshot()
+    snapshot.current_event = event_manager.current_event
+    snapshot.scripts = field_state.script_vm.get_state()
+    snapshot.quests = (
+        tuple(quest_system.active_quests),
+        tuple(quest_system.completed_quests),
+        pack_quest_progress(quest_system.quest_progress)
+    )
+    snapshot.exploration = field_state.exploration.get_state()
+    snapshot.rng_state = random.getstate()
+    snapshot.initial_event_triggered = field_state.initial_event_triggered
+    return snapshot
+
+
+def restore_snapshot(field_state, snapshot):
+    """
+    スナップショットをフィールドの状態に復元
+
+    マップが異なる場合だけマップを読み込み直す（同じマップなら純粋なメモリコピー）
+
+    Args:
+        field_state: FieldMapState
+        snapshot: GameSnapshot
+    """
+    if snapshot.map_path != field_state.map_path:
+        field_state.load_map(snapshot.map_path)
+
+    # プレイヤー
+    player = field_state.player
+    for field, value in zip(PLAYER_FIELDS, snapshot.player):
+        if value is not None:
+            setattr(player, field, value)
+    player.x = player.tile_x * TILE_SIZE
+    player.y = player.tile_y * TILE_SIZE
+    player.target_tile_x = player.tile_x
+    player.target_tile_y = player.tile_y
+    player.moving = False
+    player.move_progress = 0
+
+    if snapshot.skills:
+        player.skills = [skill for skill in map(get_skill, snapshot.skills) if skill]
+    if snapshot.inventory is not None:
+        player.items = [{'name': name, 'count': count} for name, count in snapshot.inventory]
+    player.statuses.clear()
+
+    # イベント
+    event_manager = field_state.event_manager
+    event_manager.replace_flags(snapshot.flags)
+    event_manager.current_event = snapshot.current_event
+    field_state.script_vm.load_state(snapshot.scripts, field_state.get_script_program)
+    field_state.initial_event_triggered = snapshot.initial_event_triggered
+
+    # クエスト
+    active_quests, completed_quests, progress = snapshot.quests
+    field_state.quest_system.load_state({
+        'active_quests': active_quests,
+        'completed_quests': completed_quests,
+        'quest_progress': unpack_quest_progress(progress)
+    })
+
+    # 探索記録（探索率の目標も保存した記録に合わせる）
+    field_state.exploration.load_state(snapshot.exploration)
+    field_state.explore_around()
+    field_state.triggers.reset(field_state.tilemap, player.tile_x, player.tile_y)
+    field_state.update_zone()
+
+    # 乱数（エンカウント・ダメージの乱数列も元に戻す）
+    if snapshot.rng_state is not None:
+        random.setstate(snapshot.rng_state)
+
+    field_state.update_camera()
+
+
+# ===== 巻き戻し用の状態 =====
+# 毎フレーム記録するので、セーブ用のスナップショットより軽い平たいタプルにする
+
+# 巻き戻しで記録するプレイヤーの属性（移動中の途中経過も含む）
+REWIND_PLAYER_FIELDS = (
+    'tile_x', 'tile_y', 'x', 'y', 'direction', 'moving', 'move_progress',
+    'target_tile_x', 'target_tile_y',
+    'hp', 'max_hp', 'mp', 'max_mp', 'atk', 'defense', 'spd',
+    'level', 'exp', 'next_level_exp'
+)
+
+
+def capture_rewind_state(field_state):
+    """
+    フィールドの状態を巻き戻し用のタプルで取得
+
+    Args:
+        field_state: FieldMapState
+
+    Returns:
+        tuple: REWIND_PLAYER_FIELDSの値に続けて
+               (マップ, フラグ, イベント, 進行中クエスト, 完了クエスト, クエスト進捗, 乱数)
+    """
+    player = field_state.player
+    event_manager = field_state.event_manager
+    quest_system = field_state.quest_system
+    return tuple(getattr(player, field, None) for field in REWIND_PLAYER_FIELDS) + (
+        field_state.map_path,
+        event_manager.event_flags.snapshot(),
+        event_manager.current_event,
+        tuple(quest_system.active_quests),
+        tuple(quest_system.completed_quests),
+        pack_quest_progress(quest_system.quest_progress),
+        random.getstate()
+    )
+
+
+def restore_rewind_state(field_state, state):
+    """
+    巻き戻し用のタプルからフィールドの状態を復元
+
+    Args:
+        field_state: FieldMapState
+        state: capture_rewind_state()の結果
+    """
+    player = field_state.player
+    player_count = len(REWIND_PLAYER_FIELDS)
+    for field, value in zip(REWIND_PLAYER_FIELDS, state):
+        if value is not None:
+            setattr(player, field, value)
+
+    (map_path, flags, current_event, active_quests, completed_quests,
+     progress, rng_state) = state[player_count:]
+
+    if map_path != field_state.map_path:
+        field_state.load_map(map_path)
+
+    event_manager = field_state.event_manager
+    event_manager.replace_flags(flags)
+    event_manager.current_event = current_event
+
+    # クエストは変わっていたときだけ置き換える（受注可能な集合の作り直しを避ける）
+    quest_system = field_state.quest_system
+    if (active_quests != tuple(quest_system.active_quests)
+            or completed_quests != tuple(quest_system.completed_quests)
+            or progress != pack_quest_progress(quest_system.quest_progress)):
+        quest_system.load_state({
+            'active_quests': active_quests,
+            'completed_quests': completed_quests,
+            'quest_progress': unpack_quest_progress(progress)
+        })
+
+    random.setstate(rng_state)
+    field_state.triggers.reset(field_state.tilemap, player.tile_x, player.tile_y)
+    field_state.update_zone()
+    field_state.update_camera()
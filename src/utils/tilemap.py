@@ -6,6 +6,8 @@ import pygame
 import json
 from config import *
 from src.utils.tile_renderer import TileRenderer
+from src.utils.map_zones import compile_map_zones
+from src.utils.triggers import compile_triggers
 
 
 class TileMap:
@@ -40,6 +42,13 @@ class TileMap:
         self.npcs = data.get('npcs', [])
         self.spawn_point = data.get('spawn_point', {'x': 0, 'y': 0})
 
+        # ゾーン（エリアレベル・エンカウント・BGM・ライティング。タイルごとのゾーン番号に事前コンパイル）
+        self.zones, self.zone_grid = compile_map_zones(data.get('zones'), self.width, self.height)
+
+        # トリガー領域（タイルごとのトリガー集合番号に事前コンパイル）
+        self.trigger_sets, self.trigger_grid = compile_triggers(
+            data.get('triggers'), self.width, self.height)
+
     def create_tile_surfaces(self):
         """タイルの描画サーフェスを作成（仮：色分け）"""
         self.tile_colors = {
@@ -99,6 +108,36 @@ class TileMap:
         # 衝突判定
         return self.collision[tile_y][tile_x] == 0
 
+    def get_zone(self, tile_x, tile_y):
+        """
+        指定座標のゾーンを取得
+
+        Args:
+            tile_x: X座標（タイル単位）
+            tile_y: Y座標（タイル単位）
+
+        Returns:
+            MapZone: ゾーン（どのゾーンにも入っていない・範囲外ならマップ全体のbaseゾーン）
+        """
+        if tile_x < 0 or tile_x >= self.width or tile_y < 0 or tile_y >= self.height:
+            return self.zones[0]
+        return self.zones[self.zone_grid[tile_y * self.width + tile_x]]
+
+    def get_triggers_at(self, tile_x, tile_y):
+        """
+        指定座標のトリガー集合を取得
+
+        Args:
+            tile_x: X座標（タイル単位）
+            tile_y: Y座標（タイル単位）
+
+        Returns:
+            frozenset: Triggerの集合（同じ組み合わせのタイルは同じオブジェクト）
+        """
+        if tile_x < 0 or tile_x >= self.width or tile_y < 0 or tile_y >= self.height:
+            return self.trigger_sets[0]
+        return self.trigger_sets[self.trigger_grid[tile_y * self.width + tile_x]]
+
     def get_event_at(self, tile_x, tile_y):
         """
         指定座標のイベントを取得
@@ -0,0 +1,174 @@
+"""
+JID×QUEST - トリガー領域
+マップの位置トリガー（矩形・タイルの集合）をタイルごとのトリガー集合番号にコンパイルし、
+1歩ごとの判定をグリッド1回の参照と集合の差で済ませる
+"""
+
+from config import *
+
+
+# トリガーが反応するタイミング
+TRIGGER_ENTER = 'enter'  # 領域に入ったとき
+TRIGGER_EXIT = 'exit'  # 領域から出たとき
+TRIGGER_STAY = 'stay'  # 領域の中で1歩進んだとき
+TRIGGER_TIMINGS = (TRIGGER_ENTER, TRIGGER_EXIT, TRIGGER_STAY)
+
+
+class Trigger:
+    """
+    トリガー1つ分
+
+    マップJSONの'triggers'の要素
+    {"id": "名前", "rect": [x, y, 幅, 高さ] or "tiles": [[x, y], ...],
+     "on": "enter" or ["enter", "exit", "stay"], "actions": [{"type": ..., ...}, ...]}
+    """
+
+    __slots__ = ('order', 'trigger_id', 'on_enter', 'on_exit', 'on_stay', 'actions')
+
+    def __init__(self, order, trigger_id, timings, actions):
+        """
+        Args:
+            order: マップJSONでの並び順（同時に反応したトリガーはこの順に実行する）
+            trigger_id: トリガーの名前
+            timings: 反応するタイミングの集まり（TRIGGER_TIMINGSの値）
+            actions: 反応したときに実行するアクションのタプル
+        """
+        self.order = order
+        self.trigger_id = trigger_id
+        self.on_enter = TRIGGER_ENTER in timings
+        self.on_exit = TRIGGER_EXIT in timings
+        self.on_stay = TRIGGER_STAY in timings
+        self.actions = actions
+
+
+def get_trigger_tiles(trigger_data, width, height):
+    """
+    トリガーの領域に含まれるタイルを列挙（マップ外は除く）
+
+    Args:
+        trigger_data: マップJSONのトリガー1つ分
+        width: マップの幅
+        height: マップの高さ
+
+    Returns:
+        set: (x, y)の集合
+    """
+    tiles = set()
+    rect = trigger_data.get('rect')
+    if rect:
+        rect_x, rect_y, rect_width, rect_height = rect
+        for y in range(max(0, rect_y), min(height, rect_y + rect_height)):
+            for x in range(max(0, rect_x), min(width, rect_x + rect_width)):
+                tiles.add((x, y))
+    for x, y in trigger_data.get('tiles', []):
+        if 0 <= x < width and 0 <= y < height:
+            tiles.add((x, y))
+    return tiles
+
+
+def compile_triggers(trigger_data_list, width, height):
+    """
+    マップのトリガー定義をタイルごとのトリガー集合番号にコンパイル
+
+    トリガーが重なるタイルもあるので、タイルには「そこにあるトリガーの集合」の番号を入れる。
+    同じ組み合わせの集合は1つにまとめるので、集合の種類はトリガーの数よりずっと少ない。
+
+    Args:
+        trigger_data_list: マップJSONの'triggers'
+        width: マップの幅
+        height: マップの高さ
+
+    Returns:
+        tuple: (トリガー集合のリスト（0番は空集合）, タイルごとの集合番号 list)
+    """
+    empty = frozenset()
+    trigger_sets = [empty]
+    grid = [0] * (width * height)
+    if not trigger_data_list:
+        return trigger_sets, grid
+
+    # タイル -> そこにあるトリガーのリスト
+    tile_triggers = {}
+    for index, trigger_data in enumerate(trigger_data_list):
+        trigger_id = trigger_data.get('id', f"trigger_{index}")
+        timings = trigger_data.get('on', TRIGGER_ENTER)
+        if isinstance(timings, str):
+            timings = [timings]
+        unknown = [timing for timing in timings if timing not in TRIGGER_TIMINGS]
+        if unknown:
+            print(f"警告: トリガー {trigger_id} のタイミングが不正です: {unknown}")
+        trigger = Trigger(index, trigger_id, set(timings), tuple(trigger_data.get('actions', [])))
+
+        tiles = get_trigger_tiles(trigger_data, width, height)
+        if not tiles:
+            print(f"警告: トリガー {trigger_id} の領域がマップ内にありません")
+        for tile in tiles:
+            tile_triggers.setdefault(tile, []).append(trigger)
+
+    set_numbers = {empty: 0}
+    for (x, y), triggers in tile_triggers.items():
+        trigger_set = frozenset(triggers)
+        number = set_numbers.get(trigger_set)
+        if number is None:
+            number = len(trigger_sets)
+            set_numbers[trigger_set] = number
+            trigger_sets.append(trigger_set)
+        grid[y * width + x] = number
+
+    return trigger_sets, grid
+
+
+class TriggerTracker:
+    """
+    プレイヤーがいるトリガー集合を覚えておき、1歩ごとに入った・出た・留まったトリガーを求める
+    """
+
+    def __init__(self):
+        self.current = frozenset()  # 今いるタイルのトリガー集合
+
+    def reset(self, tilemap, tile_x, tile_y):
+        """
+        今いる位置のトリガー集合を覚え直す（マップ移動・ロード時。入ったことにはしない）
+
+        Args:
+            tilemap: TileMap
+            tile_x: X座標（タイル単位）
+            tile_y: Y座標（タイル単位）
+        """
+        self.current = tilemap.get_triggers_at(tile_x, tile_y)
+
+    def step(self, tilemap, tile_x, tile_y):
+        """
+        1歩進んだ後の位置で反応するトリガーを求める
+
+        Args:
+            tilemap: TileMap
+            tile_x: X座標（タイル単位）
+            tile_y: Y座標（タイル単位）
+
+        Returns:
+            list: (タイミング, Trigger)のリスト（出た → 入った → 留まったの順）
+        """
+        old = self.current
+        new = tilemap.get_triggers_at(tile_x, tile_y)
+        self.current = new
+        if not old and not new:
+            return []
+
+        fired = []
+        if new is old:
+            stayed = new
+        else:
+            fired.extend(sorted(((TRIGGER_EXIT, trigger) for trigger in old - new if trigger.on_exit),
+                                key=get_fired_order))
+            fired.extend(sorted(((TRIGGER_ENTER, trigger) for trigger in new - old if trigger.on_enter),
+                                key=get_fired_order))
+            stayed = old & new
+        fired.extend(sorted(((TRIGGER_STAY, trigger) for trigger in stayed if trigger.on_stay),
+                            key=get_fired_order))
+        return fired
+
+
+def get_fired_order(fired):
+    """反応したトリガーの並び替えキー（集合の順序は実行ごとに変わるので宣言順に揃える）"""
+    return fired[1].order
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+敵ステータスの自動バランス調整ツール
+
+characters.jsonの敵ステータス（HP・攻撃・防御・素早さ）を座標探索で調整し、
+エリアレベルごとの目標勝率・目標ターン数に近づける。
+候補点の評価はプロセスプールで並列に行い、評価済みの点はキャッシュする。
+結果は提案版のcharacters.jsonと差分として出力する（元ファイルは変更しない）。
+
+使い方:
+    python tools/balance_tuner.py [--simulations 300] [--workers 4]
+                                  [--output data/game_data/characters.proposed.json]
+"""
+
+import argparse
+import difflib
+import json
+import os
+import random
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import CHARACTERS_DATA
+from src.battle_system.battle_engine import Combatant, simulate_battle
+from src.battle_system.enemy_ai import AI_POLICIES, BasicAI
+
+
+# 調整対象のステータス（characters.jsonのキー）
+TUNED_STATS = ('hp', 'atk', 'def', 'spd')
+
+# 敵のデータレベルごとの目標（get_enemy_for_areaはエリアレベル±1の敵を出す）
+DEFAULT_TARGETS = {
+    '1': {'win_rate': 0.95, 'turns': 3.0},
+    '5': {'win_rate': 0.90, 'turns': 4.0},
+    '10': {'win_rate': 0.80, 'turns': 5.0},
+}
+
+# 評価プロセス内でAIを使い回す（同じステータスなら評価メモが効く）
+_ai_cache = {}
+
+
+def get_ai(ai_name, ai_depth):
+    """評価用のAIを取得（決定的にするため時間予算なし・深さ固定）"""
+    key = (ai_name, ai_depth)
+    ai = _ai_cache.get(key)
+    if ai is None:
+        policy_class = AI_POLICIES.get(ai_name, BasicAI)
+        if policy_class is BasicAI:
+            ai = BasicAI()
+        else:
+            ai = policy_class(time_budget=None, max_depth=ai_depth)
+        _ai_cache[key] = ai
+    return ai
+
+
+def evaluate_point(task):
+    """
+    ステータス1点を評価（プロセスプールから呼ばれる）
+
+    Args:
+        task: (敵名, ステータスのタプル, プレイヤークラス, プレイヤーレベル,
+               シミュレーション回数, 乱数シード, AI名, AI深さ)
+
+    Returns:
+        tuple: (勝率, 平均ターン数)
+    """
+    name, params, player_class, player_level, simulations, seed, ai_name, ai_depth = task
+    stats = dict(zip(TUNED_STATS, params))
+
+    # 共通乱数法: 同じシードで比較するので候補間の差が乱数に埋もれにくい
+    random.seed(seed)
+    ai = get_ai(ai_name, ai_depth)
+    player = Combatant.from_player_class(player_class, player_level)
+    enemy = Combatant(name, stats['hp'], 0, stats['atk'], stats['def'], stats['spd'], ai=ai)
+
+    wins = 0
+    total_turns = 0
+    for _ in range(simulations):
+        player.reset()
+        enemy.reset()
+        result = simulate_battle([player], [enemy])
+        if result['result'] == 'victory':
+            wins += 1
+        total_turns += result['elapsed']  # 行動したラウンド数
+
+    return wins / simulations, total_turns / simulations
+
+
+def loss(win_rate, turns, target):
+    """目標との二乗誤差（ターン数は相対誤差）"""
+    turn_error = (turns - target['turns']) / target['turns']
+    return (win_rate - target['win_rate']) ** 2 * 4.0 + turn_error ** 2
+
+
+class Tuner:
+    """1体分の敵ステータスを座標探索で調整する"""
+
+    def __init__(self, executor, args, cache):
+        """
+        Args:
+            executor: ProcessPoolExecutor
+            args: コマンドライン引数
+            cache: 評価キャッシュ {(敵名, ステータス, レベル): (勝率, ターン数)}
+        """
+        self.executor = executor
+        self.args = args
+        self.cache = cache
+        self.evaluations = 0
+        self.cache_hits = 0
+
+    def evaluate_many(self, name, points, player_level, ai_name):
+        """複数の点をまとめて評価（キャッシュにない点だけ並列実行）"""
+        seed = zlib.crc32(name.encode('utf-8')) + self.args.seed
+        pending = []
+        for point in points:
+            key = (name, point, player_level)
+            if key in self.cache:
+                self.cache_hits += 1
+            elif point not in pending:
+                pending.append(point)
+
+        tasks = [(name, point, self.args.player_class, player_level, self.args.simulations,
+                  seed, ai_name, self.args.ai_depth) for point in pending]
+        for point, result in zip(pending, self.executor.map(evaluate_point, tasks)):
+            self.cache[(name, point, player_level)] = result
+            self.evaluations += 1
+
+        return [self.cache[(name, point, player_level)] for point in points]
+
+    def tune(self, name, enemy_data, target, player_level):
+        """
+        座標探索で1体分を調整
+
+        Returns:
+            tuple: (最良ステータスのタプル, (勝率, ターン数), 損失)
+        """
+        ai_name = enemy_data.get('ai', 'basic')
+        best = tuple(enemy_data[key] for key in TUNED_STATS)
+        best_result = self.evaluate_many(name, [best], player_level, ai_name)[0]
+        best_loss = loss(*best_result, target)
+
+        # ステップ幅はステータスの割合で開始し、改善がなければ半分にする
+        step_rate = self.args.initial_step
+        stale_rounds = 0
+        for iteration in range(self.args.max_iterations):
+            if best_loss <= self.args.tolerance:
+                break  # 早期終了: 目標に十分近い
+
+            candidates = []
+            for index, value in enumerate(best):
+                step = max(1, int(round(value * step_rate)))
+                for direction in (-1, 1):
+                    new_value = max(1, value + direction * step)
+                    if new_value != value:
+                        point = list(best)
+                        point[index] = new_value
+                        candidates.append(tuple(point))
+
+            results = self.evaluate_many(name, candidates, player_level, ai_name)
+            improved = False
+            for point, result in zip(candidates, results):
+                candidate_loss = loss(*result, target)
+                if candidate_loss < best_loss - 1e-9:
+                    best, best_result, best_loss = point, result, candidate_loss
+                    improved = True
+
+            if improved:
+                stale_rounds = 0
+            else:
+                stale_rounds += 1
+                step_rate /= 2
+                if stale_rounds >= self.args.patience or step_rate < 0.01:
+                    break  # 早期終了: 改善が止まった
+
+        return best, best_result, best_loss
+
+
+def main():
+    parser = argparse.ArgumentParser(description='敵ステータスの自動バランス調整')
+    parser.add_argument('--input', default=CHARACTERS_DATA, help='入力するcharacters.json')
+    parser.add_argument('--output', default='data/game_data/characters.proposed.json',
+                        help='提案版characters.jsonの出力先')
+    parser.add_argument('--diff', default=None, help='差分の出力先（省略時は標準出力）')
+    parser.add_argument('--targets', default=None,
+                        help='目標値JSON {"敵レベル": {"win_rate": 0.9, "turns": 4}}')
+    parser.add_argument('--player-class', default='男性営業', help='基準プレイヤークラス')
+    parser.add_argument('--player-level-offset', type=int, default=0,
+                        help='敵レベルに対する基準プレイヤーレベルの差')
+    parser.add_argument('--simulations', type=int, default=300, help='1点あたりのバトル回数')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='並列プロセス数')
+    parser.add_argument('--initial-step', type=float, default=0.2, help='初期ステップ幅（割合）')
+    parser.add_argument('--max-iterations', type=int, default=30, help='1体あたりの最大反復回数')
+    parser.add_argument('--patience', type=int, default=4, help='改善なしで打ち切る回数')
+    parser.add_argument('--tolerance', type=float, default=0.002, help='この損失以下で打ち切る')
+    parser.add_argument('--ai-depth', type=int, default=4, help='評価時の敵AI探索深さ')
+    parser.add_argument('--seed', type=int, default=0, help='乱数シード')
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        original_text = f.read()
+    data = json.loads(original_text)
+
+    targets = DEFAULT_TARGETS
+    if args.targets:
+        with open(args.targets, 'r', encoding='utf-8') as f:
+            targets = json.load(f)
+
+    cache = {}
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        tuner = Tuner(executor, args, cache)
+        for enemy_type, enemy_info in data['enemies'].items():
+            for level_key, enemy_data in enemy_info['levels'].items():
+                target = targets.get(level_key)
+                if target is None:
+                    continue
+
+                player_level = max(1, int(level_key) + args.player_level_offset)
+                before = tuple(enemy_data[key] for key in TUNED_STATS)
+                best, (win_rate, turns), best_loss = tuner.tune(
+                    enemy_data['name'], enemy_data, target, player_level)
+
+                for key, value in zip(TUNED_STATS, best):
+                    enemy_data[key] = value
+
+                print(f"{enemy_type} Lv.{level_key} {enemy_data['name']}: "
+                      f"{dict(zip(TUNED_STATS, before))} -> {dict(zip(TUNED_STATS, best))} "
+                      f"勝率 {win_rate:.2f}/{target['win_rate']:.2f} "
+                      f"ターン {turns:.1f}/{target['turns']:.1f} 損失 {best_loss:.4f}")
+
+        print(f"評価回数: {tuner.evaluations} キャッシュヒット: {tuner.cache_hits}")
+
+    proposed_text = json.dumps(data, ensure_ascii=False, indent=2) + '\n'
+    with open(args.output, 'w', encoding='utf-8') as f:
+        f.write(proposed_text)
+    print(f"提案版を出力しました: {args.output}")
+
+    diff = ''.join(difflib.unified_diff(
+        original_text.splitlines(keepends=True), proposed_text.splitlines(keepends=True),
+        fromfile=args.input, tofile=args.output))
+    if args.diff:
+        with open(args.diff, 'w', encoding='utf-8') as f:
+            f.write(diff)
+        print(f"差分を出力しました: {args.diff}")
+    else:
+        print(diff)
+
+
+if __name__ == '__main__':
+    main()
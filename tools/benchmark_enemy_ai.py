@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+敵AIの思考速度を計測するベンチマーク
+
+探索深さごとの1秒あたりの行動決定数と、時間予算モードで到達した深さを表示する。
+
+使い方:
+    python tools/benchmark_enemy_ai.py [--max-depth 8] [--seconds 0.5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import CHARACTERS_DATA, ENEMY_AI_TIME_BUDGET
+from src.battle_system.enemy_ai import BattleSnapshot, ExpectimaxAI
+
+
+class Combatant:
+    """ベンチマーク用のステータスだけを持つ戦闘者"""
+
+    def __init__(self, hp, atk, defense):
+        self.hp = hp
+        self.max_hp = hp
+        self.atk = atk
+        self.defense = defense
+
+
+def load_boss():
+    """characters.jsonから最も強い敵のステータスを取得"""
+    with open(CHARACTERS_DATA, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    enemy_data = data['enemies']['不動産会社']['levels']['10']
+    return Combatant(enemy_data['hp'], enemy_data['atk'], enemy_data['def'])
+
+
+def measure(ai, snapshots, seconds, max_depth=None):
+    """
+    一定時間、行動決定を繰り返して計測
+
+    Returns:
+        tuple: (1秒あたりの決定数, 平均到達深さ, 平均ノード数)
+    """
+    decisions = 0
+    depth_total = 0
+    node_total = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for snapshot in snapshots:
+            # メモの効果を含めない素の思考速度を測るため毎回破棄
+            ai.memo_stats_key = None
+            ai.plan(snapshot, max_depth)
+            decisions += 1
+            depth_total += ai.last_depth
+            node_total += ai.nodes
+    elapsed = time.perf_counter() - start
+    return decisions / elapsed, depth_total / decisions, node_total / decisions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='敵AIベンチマーク')
+    parser.add_argument('--max-depth', type=int, default=8, help='計測する最大深さ')
+    parser.add_argument('--seconds', type=float, default=0.5, help='深さごとの計測時間（秒）')
+    args = parser.parse_args()
+
+    boss = load_boss()
+    player = Combatant(60, 14, 10)
+
+    # HPの異なる局面を用意
+    snapshots = []
+    for enemy_ratio, player_ratio in [(1.0, 1.0), (0.6, 0.8), (0.3, 0.4), (0.8, 0.2)]:
+        boss.hp = max(1, int(boss.max_hp * enemy_ratio))
+        player.hp = max(1, int(player.max_hp * player_ratio))
+        snapshots.append(BattleSnapshot(boss, player))
+
+    print(f"{'深さ':>4} {'決定/秒':>12} {'ノード/決定':>12} {'ms/決定':>10}")
+    unlimited = ExpectimaxAI(time_budget=None)
+    for depth in range(1, args.max_depth + 1):
+        rate, _, nodes = measure(unlimited, snapshots, args.seconds, depth)
+        print(f"{depth:>4} {rate:>12.1f} {nodes:>12.1f} {1000.0 / rate:>10.3f}")
+
+    budget = ExpectimaxAI(time_budget=ENEMY_AI_TIME_BUDGET)
+    rate, depth, nodes = measure(budget, snapshots, args.seconds)
+    print()
+    print(f"時間予算 {ENEMY_AI_TIME_BUDGET * 1000:.1f}ms: "
+          f"{rate:.1f} 決定/秒, 平均到達深さ {depth:.2f}, 平均ノード数 {nodes:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+セーブデータ変換ツール
+
+JSONセーブとバイナリセーブを相互に変換する。入力の形式は先頭のマジックで自動判定し、
+旧バージョンのセーブは現在のスキーマに移行してから書き出す。
+
+使い方:
+    python tools/convert_save.py data/saves/save_1.json data/saves/save_1.sav
+    python tools/convert_save.py data/saves/save_1.sav save_1.json [--no-migrate]
+    python tools/convert_save.py data/saves/save_1.sav --info
+    python tools/convert_save.py data/saves/save_1.sav --diff data/saves/save_2.sav
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.flag_store import diff_flags, flags_from_dict, load_flag_registry
+from src.utils.save_format import FLAG_COMPRESSED, encode_save, is_binary_save, migrate_save, read_header
+from src.utils.save_load import SAVE_EXTENSIONS, atomic_write, deserialize_save, serialize_save
+
+
+def guess_format(path):
+    """出力パスの拡張子から形式を決める（不明ならバイナリ）"""
+    if os.path.splitext(path)[1] == SAVE_EXTENSIONS['json']:
+        return 'json'
+    return 'binary'
+
+
+def print_info(path, data):
+    """セーブファイルのヘッダ・セクションの情報を表示"""
+    print(f"{path}: {len(data)}バイト")
+    if not is_binary_save(data):
+        save_data = deserialize_save(data)
+        print(f"  形式: JSON  バージョン: {save_data.get('version', '1.0')}")
+        return
+
+    header = read_header(data)
+    compressed = 'あり' if header['flags'] & FLAG_COMPRESSED else 'なし'
+    print(f"  形式: バイナリ  スキーマ: {header['schema_version']}.0  圧縮: {compressed}")
+    for name, (offset, length, crc) in header['sections'].items():
+        print(f"  {name:<16} offset={offset:>6} size={length:>6} crc={crc:08x}")
+
+
+def print_flag_diff(path_a, save_a, path_b, save_b):
+    """2つのセーブでフラグの違いを表示（ビット集合のXORで求める）"""
+    flags_a = flags_from_dict(save_a.get('flags', {}))
+    flags_b = flags_from_dict(save_b.get('flags', {}))
+    names = load_flag_registry().names
+    changed = diff_flags(flags_a, flags_b)
+    print(f"フラグの違い: {len(changed)}件 ({path_a} → {path_b})")
+    for flag_id in changed:
+        name = names[flag_id]
+        print(f"  {name}: {save_a.get('flags', {}).get(name)} → {save_b.get('flags', {}).get(name)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='セーブデータ変換')
+    parser.add_argument('input', help='入力セーブファイル（JSONまたはバイナリ）')
+    parser.add_argument('output', nargs='?', help='出力ファイル（拡張子.jsonならJSON、それ以外はバイナリ）')
+    parser.add_argument('--format', choices=sorted(SAVE_EXTENSIONS), help='出力形式（省略時は拡張子で判定）')
+    parser.add_argument('--no-compress', action='store_true', help='バイナリをzlib圧縮しない')
+    parser.add_argument('--no-migrate', action='store_true', help='スキーマを移行しない')
+    parser.add_argument('--info', action='store_true', help='入力ファイルの情報を表示するだけ')
+    parser.add_argument('--diff', metavar='OTHER', help='もう1つのセーブとフラグを比較するだけ')
+    args = parser.parse_args()
+
+    with open(args.input, 'rb') as f:
+        data = f.read()
+
+    if args.diff:
+        with open(args.diff, 'rb') as f:
+            other = f.read()
+        print_flag_diff(args.input, migrate_save(deserialize_save(data)),
+                        args.diff, migrate_save(deserialize_save(other)))
+        return
+
+    if args.info or not args.output:
+        print_info(args.input, data)
+        return
+
+    save_data = deserialize_save(data)
+    if not args.no_migrate:
+        save_data = migrate_save(save_data)
+
+    save_format = args.format or guess_format(args.output)
+    if save_format == 'binary':
+        output = encode_save(save_data, compress=not args.no_compress)
+    else:
+        output = serialize_save(save_data, 'json')
+    atomic_write(args.output, output)
+
+    print(f"{args.input} ({len(data)}バイト) → {args.output} ({len(output)}バイト, {save_format})")
+
+
+if __name__ == '__main__':
+    main()
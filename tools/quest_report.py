@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+クエスト依存関係レポート
+
+main_quests.jsonの前提クエスト・必要フラグからDAGを作って検証し、解放順を表示する。
+循環・存在しない前提クエストはエラー、到達できないクエスト・目標の対象の誤りは警告にする。
+エラーがあれば終了コード1で終わるので、ビルド時のチェックに使える。
+
+使い方:
+    python tools/quest_report.py
+    python tools/quest_report.py --quests data/quests/main_quests.json --strict
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.systems.quest_graph import QuestGraph, collect_flag_sources
+
+
+# 対象がマップ名・NPCのIDである目標タイプ
+MAP_OBJECTIVES = ('visit', 'explore')
+NPC_OBJECTIVES = ('talk',)
+
+
+def load_json(path):
+    """JSONファイルを読み込む"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_map_targets(maps_dir):
+    """
+    マップ名とNPCのIDを集める
+
+    Args:
+        maps_dir: マップデータのディレクトリ
+
+    Returns:
+        tuple: (マップ名の集合, NPCのIDの集合)
+    """
+    map_names = set()
+    npc_ids = set()
+    for path in glob.glob(os.path.join(maps_dir, '*.json')):
+        map_names.add(os.path.splitext(os.path.basename(path))[0])
+        for npc in load_json(path).get('npcs', []):
+            if 'id' in npc:
+                npc_ids.add(npc['id'])
+    return map_names, npc_ids
+
+
+def check_objectives(quests, map_names, npc_ids):
+    """
+    目標の対象（マップ名・NPCのID）が存在するか検証
+
+    Returns:
+        list: 警告メッセージ
+    """
+    warnings = []
+    for quest_id, quest_data in quests.items():
+        for objective in quest_data.get('objectives', []):
+            subject = objective.get('subject')
+            if subject is None:
+                continue
+            objective_type = objective.get('type')
+            if objective_type in MAP_OBJECTIVES and subject not in map_names:
+                warnings.append(f"{quest_id}/{objective.get('id')}: 存在しないマップ {subject}")
+            elif objective_type in NPC_OBJECTIVES and subject not in npc_ids:
+                warnings.append(f"{quest_id}/{objective.get('id')}: 存在しないNPC {subject}")
+    return warnings
+
+
+def print_schedule(graph, quests, flag_sources):
+    """解放順（段ごと）を表示"""
+    print(f"解放順（{len(graph.schedule)}/{len(quests)}件）")
+    print(f"  {'段':>2} {'クエスト':<12} {'Lv':>3} {'前提':>4}  名前")
+    for quest_id in graph.schedule:
+        quest_data = quests[quest_id]
+        transitive = graph.get_quest_ids(graph.transitive_masks[quest_id])
+        print(f"  {graph.tiers[quest_id]:>2} {quest_id:<12} "
+              f"{quest_data.get('required_level', 1):>3} {len(transitive):>4}  "
+              f"{quest_data.get('name', '')}")
+        if transitive:
+            print(f"        前提: {', '.join(transitive)}")
+        for flag_name in quest_data.get('required_flags', []):
+            print(f"        フラグ: {flag_name} ← {', '.join(flag_sources.get(flag_name, ['なし']))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='クエスト依存関係レポート')
+    parser.add_argument('--quests', default='data/quests/main_quests.json', help='クエストデータ')
+    parser.add_argument('--events', default='data/events/story_events.json',
+                        help='イベントデータ（フラグを立てるものの検証用）')
+    parser.add_argument('--maps', default='data/maps', help='マップデータのディレクトリ')
+    parser.add_argument('--strict', action='store_true', help='警告もエラーとして扱う')
+    args = parser.parse_args()
+
+    quests = load_json(args.quests)
+    events = load_json(args.events) if os.path.exists(args.events) else {}
+    flag_sources = collect_flag_sources(quests, events)
+
+    graph = QuestGraph(quests, flag_sources)
+    map_names, npc_ids = load_map_targets(args.maps)
+    warnings = graph.warnings + check_objectives(quests, map_names, npc_ids)
+
+    print_schedule(graph, quests, flag_sources)
+
+    for message in graph.errors:
+        print(f"エラー: {message}")
+    for message in warnings:
+        print(f"警告: {message}")
+    print(f"エラー{len(graph.errors)}件 警告{len(warnings)}件")
+
+    if graph.errors or (args.strict and warnings):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()